@@ -0,0 +1,33 @@
+import gc
+import os
+
+# Configuración de gunicorn; se carga automáticamente al ejecutar `gunicorn src.app:server` desde la raíz.
+
+# Modo de memoria compartida (activo por defecto, se desactiva con MEMORIA_COMPARTIDA=0):
+# el proceso maestro importa src.app, construye una sola vez los datos compartidos de la versión
+# vigente (el cubo, la geografía, las causas; ver src.app.calentar) y luego crea los workers con fork.
+# Los arreglos mapeados desde el almacén columnar y los construidos antes del fork quedan compartidos
+# en solo lectura, así que cada worker adicional casi no suma memoria. Las páginas se siguen
+# construyendo en cada worker al visitarlas (PRECALENTAR_PAGINAS=1 las construye también en el maestro).
+preload_app = os.environ.get('MEMORIA_COMPARTIDA', '1') != '0'
+
+if preload_app:
+    # Sin recolector durante la carga, para que no reescriba los encabezados de los objetos del maestro
+    gc.disable()
+
+
+# Construye en el maestro los datos compartidos, que src.app solo declara al importarse, y congela
+# los objetos ya cargados: el recolector de los workers no los recorrerá y no tocará sus páginas, que
+# siguen compartidas tras el fork.
+def when_ready(server):
+    if preload_app:
+        from src import app
+        app.calentar()
+        gc.collect()
+        gc.freeze()
+
+
+# Cada worker vuelve a activar el recolector solo para sus propios objetos nuevos.
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
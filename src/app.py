@@ -4,63 +4,232 @@ import json
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 # Importamos las clases y funciones necesarias del framework Dash para construir la app web
 from dash import Dash, dcc, html, Input, Output,dash_table
+from dash.dash_table.Format import Format, Group
 
 # Importamos nuestros módulos personalizados para manejar los datos y gráficos
 # 'cargar_datos' para cargar los datos desde archivos o fuentes externas
 # 'procesar_datos' para realizar el procesamiento y análisis de los datos
 # 'generar_graficos' para crear visualizaciones con plotly u otras librerías
-from src.modulos import cargar_datos, procesar_datos, generar_graficos
+from src.modulos import cargar_datos, procesar_datos, generar_graficos, agregados, causas, consultas, estaticos, explorador, figuras, instantanea, paginas, refresco
 
 # Creamos la instancia de la aplicación Dash, que será la base de nuestra app web.
 # Obtenemos el objeto Flask para poder integrarlo con servidores web
 app = Dash(__name__, suppress_callback_exceptions=True)
 server = app.server
+# Archivos estáticos con hash en el nombre (la geometría del mapa), servidos con caché inmutable
+estaticos.registrar(server, cargar_datos.ESTATICOS_DIR)
 
-# Cargar datos de los archivos de mortalidad,division politico-administrativa, codigos de muerte y geojson para el mapa
-df_mortalidad = cargar_datos.cargar_datos_mortalidad()
-df_division = cargar_datos.cargar_division_politico_administrativa()
-df_codigos = cargar_datos.cargar_codigos_de_muerte()
-counties = cargar_datos.cargar_geojson_colombia()
-# procesamos solo los datos del año 2019
-df_2019 = procesar_datos.filtrar_año(df_mortalidad, 2019)
-
-# Procesar datos para mapa: Visualización de la distribución total de muertes por departamento en Colombia para el año 2019.
-muertes = procesar_datos.agrupar_muertes_por_departamento(df_2019)
-departamentos = procesar_datos.obtener_departamentos_mas_frecuentes(df_division)
-vista_mapa = procesar_datos.merge_muertes_departamentos(muertes, departamentos)
-# Procesar datos para gráfico de líneas: Representación del total de muertes por mes en Colombia, mostrando variaciones a lo largo del año.
-muertes_mensuales = procesar_datos.agrupar_muertes_por_mes(df_2019)
-# Procesar datos para gráfico de barras: Visualización de las 5 ciudades más violentas de Colombia, considerando homicidios (códigos X95)
-ciudades_mas_violentas = procesar_datos.ciudades_mas_violentas(df_2019, df_division)
-# Procesar datos para gráfico circular: Muestra las 10 ciudades con menor índice de mortalidad.
-ciudades_menos_mortalidad = procesar_datos.ciudades_menos_mortalidad(df_2019, df_division)
-# Procesar datos para tabla: Listado de las 10 principales causas de muerte en Colombia, incluyendo su código, nombre y total de casos
-top_causas_muerte = procesar_datos.causas_principales_muerte(df_2019, df_codigos)
-# Procesar datos para histograma: Distribución de muertes según rangos de edad quinquenales 
-distribucion_de_muertes = procesar_datos.conteo_muertes_por_rango_edad(df_2019)
-# Procesar datos para gráfico de barras apiladas: Comparación del total de muertes por sexo en cada departamento, para analizar diferencias significativas entre géneros.
-total_muertes_sexo_departamento = procesar_datos.conteo_muertes_por_departamento_y_sexo(df_2019,df_division)
-
-
-# Generar grafico para mapa: Visualización de la distribución total de muertes por departamento en Colombia para el año 2019.
-fig_mapa_colombia = generar_graficos.crear_mapa(
-    counties_geojson=counties,
-    locs=vista_mapa['COD_DEPARTAMENTO'],
-    valores=vista_mapa['TotalMuertes'],
-    textos=vista_mapa['DEPARTAMENTO']
+# Año que muestra el dashboard
+AÑO = 2019
+# Filas por página del explorador de causas
+FILAS_EXPLORADOR = 15
+# Zoom inicial del mapa; también decide qué variante simplificada de la geometría se carga
+ZOOM_MAPA = 3.4
+# Con INGESTA_POR_BLOQUES=1 el registro se lee por bloques y solo se guarda su cubo de conteos, para archivos que no caben en memoria
+POR_BLOQUES = os.environ.get('INGESTA_POR_BLOQUES') == '1'
+# Con AGREGACION_PARALELA=1 el cubo se agrega en varios procesos, por año y rango de filas
+AGREGACION_PARALELA = os.environ.get('AGREGACION_PARALELA') == '1'
+
+
+# Cubo de conteos del año (ver agregados.CuboMortalidad), del que salen todas las vistas. Se construye
+# en una pasada sobre los registros del año o, con POR_BLOQUES, en una pasada por bloques sobre el archivo;
+# con AGREGACION_PARALELA, las filas del año se reparten entre varios procesos.
+def _cubo(recursos):
+    if POR_BLOQUES:
+        return cargar_datos.agregar_mortalidad_por_bloques(año=AÑO, diccionario=recursos['causas'])
+    if AGREGACION_PARALELA:
+        return cargar_datos.agregar_mortalidad_en_paralelo([AÑO], diccionario=recursos['causas'])
+    return agregados.construir_cubo([recursos['mortalidad']])
+
+# Geometría del mapa como URL de un archivo estático: la figura solo lleva la URL y el navegador
+# descarga el GeoJSON una vez y lo guarda. Si no se puede publicar, va dentro de la figura.
+def _geojson():
+    nombre = cargar_datos.publicar_geojson_colombia(ZOOM_MAPA)
+    if nombre is None:
+        return cargar_datos.cargar_geojson_colombia(zoom=ZOOM_MAPA)
+    return app.get_relative_path(estaticos.url(nombre))
+
+# Datos que comparten las páginas, como una instantánea de solo lectura (ver instantanea.py); hay una
+# por versión de DATA_DIR (ver refresco.VigilanteDatos) y cada dato se carga la primera vez que una
+# página lo necesita.
+def crear_recursos():
+    constructores = {
+        'division': lambda r: cargar_datos.cargar_division_politico_administrativa(),
+        'codigos': lambda r: cargar_datos.cargar_codigos_de_muerte(),
+        # Municipios y departamentos con identificadores enteros y nombres ya normalizados
+        'geografia': lambda r: cargar_datos.cargar_geografia(r['division']),
+        'geojson': lambda r: _geojson(),
+        # Plantilla del mapa armada una vez; cada mapa solo cambia los valores
+        'mapa': lambda r: generar_graficos.FabricaMapa(r['geojson'], zoom=ZOOM_MAPA),
+        # Códigos CIE-10 -> identificadores enteros; las causas se codifican una sola vez al cargar
+        'causas': lambda r: cargar_datos.cargar_diccionario_causas(r['codigos']),
+        # Solo los datos de mortalidad del año (su partición anual, si existe)
+        'mortalidad': lambda r: causas.codificar_registros(cargar_datos.cargar_mortalidad_año(AÑO), r['causas']),
+        'cubo': _cubo,
+        # Consultas declarativas sobre el cubo, de las que salen los conteos de todas las vistas; guardan
+        # sus resultados mientras dure esta versión
+        'consultas': lambda r: consultas.MotorConsultas(r),
+        # Población del año por municipio, sexo y edad para las tasas; None si no hay poblacion.csv
+        'denominadores': lambda r: cargar_datos.cargar_denominadores(AÑO, r['geografia']),
+        # Todas las causas del catálogo con su total, indexadas para el explorador de la página de tabla
+        'explorador': lambda r: explorador.TablaIndexada(procesar_datos.tabla_causas(r['consultas'], r['causas'])),
+    }
+    return instantanea.Instantanea(paginas.Perezosos(constructores))
+
+
+# Página 1 - Mapa: Visualización de la distribución total de muertes por departamento en Colombia para el año 2019.
+def pagina_mapa(r):
+    vista_mapa = procesar_datos.agrupar_muertes_por_departamento(r['consultas'], r['geografia'])
+    fig_mapa_colombia = figuras.tipar(r['mapa'].mapa(
+        locs=vista_mapa['COD_DEPARTAMENTO'],
+        valores=vista_mapa['TotalMuertes'],
+        textos=vista_mapa['DEPARTAMENTO'],
+    ))
+    return html.Div([
+        html.H2("Mapa de Muertes Totales por Departamento en Colombia (2019)", style={'textAlign': 'center'}),
+        dcc.Graph(id='mapa-mortalidad', figure=fig_mapa_colombia, style={'width': '100%', 'height': '750px'})
+    ])
+
+# Página 2 - Gráfico de líneas: Representación del total de muertes por mes en Colombia, mostrando variaciones a lo largo del año.
+def pagina_lineas(r):
+    fig_grafico_lineas = generar_graficos.grafico_linea_muertes_mensuales(
+        procesar_datos.agrupar_muertes_por_mes(r['consultas']))
+    return html.Div([
+        html.H2("Variación Mensual del Total de Muertes en Colombia (2019)", style={'textAlign': 'center'}),
+        dcc.Graph(id='grafico-lineas', figure=fig_grafico_lineas, style={'width': '100%', 'height': '750px'})
+    ])
+
+# Página 3 - Gráfico de barras: Visualización de las 5 ciudades más violentas de Colombia, considerando homicidios (códigos X95)
+def pagina_barras(r):
+    fig_grafico_barras = generar_graficos.grafico_barras_ciudades_mas_violentas(
+        procesar_datos.ciudades_mas_violentas(r['consultas'], top_n=5))
+    return html.Div([
+        html.H2("Top 5 Ciudades Más Violentas en Colombia por Homicidios (2019)", style={'textAlign': 'center'}),
+        dcc.Graph(id='grafico-barras', figure=fig_grafico_barras, style={'width': '100%', 'height': '750px'})
+    ])
+
+# Página 4 - Gráfico circular: Muestra las 10 ciudades con menor índice de mortalidad. Con población
+# publicada el índice es la tasa ajustada por edad por 100.000 habitantes; sin ella, el total de muertes.
+def pagina_circular(r):
+    denominadores = r['denominadores']
+    if denominadores is None:
+        fig_grafico_circular = generar_graficos.grafico_circular_ciudades_menos_mortalidad(
+            procesar_datos.ciudades_menos_mortalidad(r['consultas'], top_n=10))
+        titulo = "Top 10 Ciudades con Menor Índice de Mortalidad"
+    else:
+        fig_grafico_circular = generar_graficos.grafico_circular_ciudades_menos_mortalidad(
+            procesar_datos.ciudades_menor_tasa(r['cubo'], denominadores, top_n=10), valor_col='TASA_AJUSTADA')
+        titulo = "Top 10 Ciudades con Menor Tasa de Mortalidad Ajustada por Edad (por 100.000 habitantes)"
+    return html.Div([
+        html.H2(titulo, style={'textAlign': 'center'}),
+       dcc.Graph(id='grafico-circular', figure=fig_grafico_circular, style={'width': '100%', 'height': '750px'})
+    ])
+
+# Página 5 - Tabla: Listado de las 10 principales causas de muerte en Colombia, incluyendo su código, nombre y total de casos
+def pagina_tabla(r):
+    fig_tabla_causas = generar_graficos.grafico_tabla_causas_muerte(
+        procesar_datos.causas_principales_muerte(r['consultas'], r['causas']))
+    filas, paginas_totales = r['explorador'].pagina(0, FILAS_EXPLORADOR)
+    return html.Div([
+        html.H2("Top 10 Principales Causas de Muerte en Colombia", style={'textAlign': 'center'}),
+        dcc.Graph(id='grafico-tabla', figure=fig_tabla_causas, style={'width': '100%', 'height': '750px'}),
+        html.H2("Explorador de Causas de Muerte (CIE-10)", style={'textAlign': 'center'}),
+        # Paginación, orden y filtros se resuelven en el servidor (ver actualizar_explorador)
+        dash_table.DataTable(
+            id='tabla-causas',
+            columns=[
+                {'name': 'Ranking', 'id': 'RANK', 'type': 'numeric'},
+                {'name': 'Código de Muerte', 'id': 'COD_MUERTE'},
+                {'name': 'Descripción', 'id': 'DESCRIPCION'},
+                {'name': 'Capítulo', 'id': 'CAPITULO'},
+                {'name': 'Total Casos', 'id': 'TOTAL_CASOS', 'type': 'numeric', 'format': Format().group(Group.yes)},
+            ],
+            data=filas,
+            page_current=0,
+            page_size=FILAS_EXPLORADOR,
+            page_count=paginas_totales,
+            page_action='custom',
+            sort_action='custom',
+            sort_mode='multi',
+            sort_by=[],
+            filter_action='custom',
+            filter_query='',
+            style_header={'backgroundColor': '#118dff', 'color': 'white', 'fontWeight': 'bold'},
+            style_cell={'fontFamily': 'Work Sans, sans-serif', 'textAlign': 'left', 'whiteSpace': 'normal', 'height': 'auto'},
+            style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': '#e9f0ff'}],
+        )
+    ])
+
+# Página 6 - Histograma: Distribución de muertes según rangos de edad quinquenales
+def pagina_histograma(r):
+    fig_histograma_edad = generar_graficos.grafico_histograma_edad(
+        procesar_datos.conteo_muertes_por_rango_edad(r['consultas']))
+    return html.Div([
+        html.H2("Distribución de Muertes Según Rangos de Edad", style={'textAlign': 'center'}),
+        dcc.Graph(id='grafico-histograma', figure=fig_histograma_edad, style={'width': '100%', 'height': '750px'})
+    ])
+
+# Página 7 - Barras apiladas: Comparación del total de muertes por sexo en cada departamento, para analizar diferencias significativas entre géneros.
+def pagina_barras_apiladas(r):
+    fig_barras_apiladas = generar_graficos.grafico_barras_apiladas_sexo_departamento(
+        procesar_datos.conteo_muertes_por_departamento_y_sexo(r['consultas'], r['geografia']))
+    return html.Div([
+        html.H2("Comparación del Total de Muertes por Sexo en Cada Departamento", style={'textAlign': 'center'}),
+        dcc.Graph(id='grafico-apiladas', figure=fig_barras_apiladas, style={'width': '100%', 'height': '750px'})
+    ])
+
+
+PAGINAS = {
+    '/mapa': pagina_mapa,
+    '/lineas': pagina_lineas,
+    '/barras': pagina_barras,
+    '/circular': pagina_circular,
+    '/tabla': pagina_tabla,
+    '/histograma': pagina_histograma,
+    '/apiladas': pagina_barras_apiladas,
+}
+
+# Página ya codificada (ver figuras.precodificar): la página y sus figuras se serializan una sola vez
+# por versión (cada versión tiene su propio paginas.Perezosos) y cada respuesta del enrutamiento
+# devuelve ese resultado sin volver a recorrer figuras ni componentes.
+def _precodificada(pagina):
+    return lambda r: figuras.precodificar(pagina(r))
+
+# Crea una versión del dashboard sin calcular nada todavía: cada página (y los datos que usa) se
+# construye la primera vez que alguien la visita.
+def construir_paginas():
+    return paginas.Perezosos({ruta: _precodificada(pagina) for ruta, pagina in PAGINAS.items()}, contexto=crear_recursos())
+
+# Datos y páginas vigentes; se revisa DATA_DIR cada INTERVALO_REFRESCO segundos (0 lo desactiva).
+# Al refrescar, la versión nueva se calienta completa en segundo plano antes de reemplazar a la anterior.
+vigilante = refresco.VigilanteDatos(
+    cargar_datos.DATA_DIR,
+    construir_paginas,
+    intervalo=int(os.environ.get('INTERVALO_REFRESCO', 60)),
+    preparar=paginas.Perezosos.calentar,
 )
-# Generar gráfico de líneas: Representación del total de muertes por mes en Colombia, mostrando variaciones a lo largo del año.
-fig_grafico_lineas = generar_graficos.grafico_linea_muertes_mensuales(muertes_mensuales)
-# Generar gráfico de barras: Visualización de las 5 ciudades más violentas de Colombia, considerando homicidios (códigos X95)
-fig_grafico_barras = generar_graficos.grafico_barras_ciudades_mas_violentas(ciudades_mas_violentas)
-# Generar gráfico circular: Muestra las 10 ciudades con menor índice de mortalidad.
-fig_grafico_circular = generar_graficos.grafico_circular_ciudades_menos_mortalidad(ciudades_menos_mortalidad)
-# Generar tabla: Listado de las 10 principales causas de muerte en Colombia, incluyendo su código, nombre y total de casos
-fig_tabla_causas = generar_graficos.grafico_tabla_causas_muerte(top_causas_muerte)
-# Generar gráfico histograma: Distribución de muertes según rangos de edad quinquenales 
-fig_histograma_edad = generar_graficos.grafico_histograma_edad(distribucion_de_muertes)
-# Generar gráfico de barras apiladas: Comparación del total de muertes por sexo en cada departamento, para analizar diferencias significativas entre géneros.
-fig_barras_apiladas = generar_graficos.grafico_barras_apiladas_sexo_departamento(total_muertes_sexo_departamento)
+
+# Datos compartidos por todas las páginas y por el explorador; son los que el maestro de gunicorn
+# construye antes del fork (ver gunicorn.conf.py) para que los workers los compartan
+DATOS_COMPARTIDOS = ('geografia', 'causas', 'cubo', 'mapa', 'explorador')
+# Con PRECALENTAR_PAGINAS=1 el maestro construye además todas las páginas antes del fork: los workers
+# las heredan hechas, pero ninguno atiende hasta que estén todas
+PRECALENTAR_PAGINAS = os.environ.get('PRECALENTAR_PAGINAS') == '1'
+
+# Construye en este proceso los datos compartidos de la versión vigente y carga los módulos de plotly
+# que usan las figuras (y, con PRECALENTAR_PAGINAS, construye también las páginas). Las páginas siguen
+# construyéndose al visitarlas, ya en cada worker.
+def calentar():
+    version = vigilante.vigente().contenido
+    if PRECALENTAR_PAGINAS:
+        version.calentar()
+        return
+    for clave in DATOS_COMPARTIDOS:
+        version.contexto[clave]
+    generar_graficos.precargar_plotly()
+
+# Con CALENTAR_PAGINAS=1 (por defecto), tras la primera visita se construye el resto de páginas en segundo plano
+CALENTAR_PAGINAS = os.environ.get('CALENTAR_PAGINAS', '1') == '1'
 
 
 # Definiendo el estilo html y las paginas para cada una de las figuras
@@ -96,67 +265,32 @@ app.layout = html.Div([
     ''')
 ])
 
-# Página 1 - Mapa
-layout_mapa = html.Div([
-    html.H2("Mapa de Muertes Totales por Departamento en Colombia (2019)", style={'textAlign': 'center'}),
-    dcc.Graph(id='mapa-mortalidad', figure=fig_mapa_colombia, style={'width': '100%', 'height': '750px'})
-])
-
-# Página 2 - Gráfico de líneas
-layout_lineas = html.Div([
-    html.H2("Variación Mensual del Total de Muertes en Colombia (2019)", style={'textAlign': 'center'}),
-    dcc.Graph(id='grafico-lineas', figure=fig_grafico_lineas, style={'width': '100%', 'height': '750px'})
-])
-# Página 3 - Gráfico de barras
-layout_barras = html.Div([
-    html.H2("Top 5 Ciudades Más Violentas en Colombia por Homicidios (2019)", style={'textAlign': 'center'}),
-    dcc.Graph(id='grafico-barras', figure=fig_grafico_barras, style={'width': '100%', 'height': '750px'})
-])
-# Página 4 - Gráfico circular
-layout_circular = html.Div([
-    html.H2("Top 10 Ciudades con Menor Índice de Mortalidad", style={'textAlign': 'center'}),
-   dcc.Graph(id='grafico-circular', figure=fig_grafico_circular, style={'width': '100%', 'height': '750px'})
-])
-
-# Página 5 - Tabla de causas
-layout_tabla = html.Div([
-    html.H2("Top 10 Principales Causas de Muerte en Colombia", style={'textAlign': 'center'}),
-    dcc.Graph(id='grafico-tabla', figure=fig_tabla_causas, style={'width': '100%', 'height': '750px'})
-])
-
-# Página 6 - Histograma por edad
-layout_histograma = html.Div([
-    html.H2("Distribución de Muertes Según Rangos de Edad", style={'textAlign': 'center'}),
-    dcc.Graph(id='grafico-histograma', figure=fig_histograma_edad, style={'width': '100%', 'height': '750px'}) 
-])
 
-# Página 7 - Barras apiladas por sexo y departamento
-layout_barras_apiladas = html.Div([
-    html.H2("Comparación del Total de Muertes por Sexo en Cada Departamento", style={'textAlign': 'center'}),
-    dcc.Graph(id='grafico-apiladas', figure=fig_barras_apiladas, style={'width': '100%', 'height': '750px'})
-])
+# Callback del explorador de causas: responde solo la página pedida, con el orden y los filtros de la
+# tabla, desde la tabla indexada de la versión vigente.
+@app.callback(Output('tabla-causas', 'data'),
+              Output('tabla-causas', 'page_count'),
+              Input('tabla-causas', 'page_current'),
+              Input('tabla-causas', 'page_size'),
+              Input('tabla-causas', 'sort_by'),
+              Input('tabla-causas', 'filter_query'))
+def actualizar_explorador(page_current, page_size, sort_by, filter_query):
+    tabla = vigilante.actual().contenido.contexto['explorador']
+    return tabla.pagina(page_current, page_size or FILAS_EXPLORADOR, sort_by, filter_query)
 
 
 # Callback de enrutamiento
 @app.callback(Output('page-content', 'children'),
               Input('url', 'pathname'))
 def mostrar_contenido(pathname):
-    if pathname == "/mapa":
-        return layout_mapa
-    elif pathname == "/lineas":
-        return layout_lineas
-    elif pathname == "/barras":
-        return layout_barras
-    elif pathname == "/circular":
-        return layout_circular
-    elif pathname == "/tabla":
-        return layout_tabla
-    elif pathname == "/histograma":
-        return layout_histograma
-    elif pathname == "/apiladas":
-        return layout_barras_apiladas
-    else:
-        return layout_mapa  # Pagina inicial mapa
+    # Se toma la versión vigente una sola vez: si los datos se refrescan durante la petición, esta termina con la anterior
+    paginas_vigentes = vigilante.actual().contenido
+    if pathname not in paginas_vigentes:
+        pathname = '/mapa'  # Pagina inicial mapa
+    pagina = paginas_vigentes[pathname]
+    if CALENTAR_PAGINAS:
+        paginas_vigentes.calentar_en_segundo_plano()
+    return pagina
 
 # Esto permite correr localmente
 if __name__ == "__main__":
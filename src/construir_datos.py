@@ -0,0 +1,39 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.modulos import cargar_datos, construccion, geometria
+
+# Compila los archivos fuente en artefactos de servicio, para que el proceso web nunca tenga que
+# leer ni limpiar CSV. Uso: python src/construir_datos.py [--origen data] [--mortalidad DIR] [--destino DIR]
+
+RAIZ = Path(__file__).parent.parent
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construye los artefactos de servicio del dashboard a partir de los archivos fuente.")
+    parser.add_argument('--origen', type=Path, default=RAIZ / 'data',
+                        help="directorio con la DIVIPOLA y el catálogo CIE-10 crudos (por defecto: data/)")
+    parser.add_argument('--mortalidad', type=Path, default=cargar_datos.DATA_DIR,
+                        help="directorio con datosmortalidad.csv o sus particiones datosmortalidad_YYYY.csv (por defecto: DATA_DIR)")
+    parser.add_argument('--destino', type=Path, default=cargar_datos.ARTEFACTOS_DIR,
+                        help="directorio donde se publican los artefactos (por defecto: DATA_DIR/artefactos)")
+    args = parser.parse_args(argv)
+
+    manifiesto = construccion.construir_artefactos(args.origen, args.mortalidad, args.destino)
+    for nombre, info in manifiesto['artefactos'].items():
+        print(f"{nombre}: {info['filas']} filas -> {info['directorio']}")
+    if not any(nombre.startswith('mortalidad_') for nombre in manifiesto['artefactos']):
+        print(f"Aviso: no se encontraron registros de mortalidad en {args.mortalidad}; el dashboard los leerá del CSV")
+    print(f"Versión {manifiesto['version']} publicada en {args.destino}")
+
+    # Variantes simplificadas del mapa, para que el primer arranque no tenga que generarlas
+    for zoom in geometria.ZOOMS:
+        cargar_datos.cargar_geojson_colombia(zoom=zoom)
+    print(f"Variantes del mapa para los zoom {', '.join(map(str, geometria.ZOOMS))} en {cargar_datos.CACHE_DIR / 'geometria'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.modulos import agregados, causas
+
+
+# Procesos para la agregación en paralelo; PROCESOS_AGREGACION=1 la hace en un solo proceso
+PROCESOS = int(os.environ.get('PROCESOS_AGREGACION', os.cpu_count() or 1))
+
+# Columnas que se envían a cada proceso: las dimensiones del cubo, salvo la causa, que sale del código de muerte
+COLUMNAS = [columna for columna in agregados.DIMENSIONES_CUBO if columna != 'ID_CAUSA'] + ['COD_MUERTE']
+
+# Diccionario de causas de cada proceso; se recibe una vez al arrancarlo y no con cada fragmento
+_diccionario = None
+
+
+def _iniciar(diccionario):
+    global _diccionario
+    _diccionario = diccionario
+
+# Fragmentos de trabajo de un año ya cargado: `partes` rangos contiguos de filas, cada uno con solo las
+# columnas que necesita el conteo. Cada registro cae en exactamente un fragmento, y el año se carga y
+# valida una sola vez en este proceso: los procesos de trabajo solo reciben sus filas.
+def fragmentos(df, partes):
+    limites = np.linspace(0, len(df), partes + 1).astype(np.int64)
+    columnas = {columna: df[columna].array for columna in COLUMNAS}
+    return [{columna: valores[inicio:fin] for columna, valores in columnas.items()}
+            for inicio, fin in zip(limites[:-1], limites[1:]) if fin > inicio]
+
+# Trabajo de cada proceso: codifica las causas de su fragmento y devuelve el conteo parcial por las
+# dimensiones del cubo.
+def _contar_fragmento(columnas):
+    acumulador = agregados.ConteoIncremental(agregados.DIMENSIONES_CUBO)
+    acumulador.actualizar(causas.codificar_registros(pd.DataFrame(columnas, copy=False), _diccionario))
+    return acumulador.conteo
+
+# Reduce los conteos parciales sumándolos por clave en una sola pasada, ordenado por clave.
+def combinar(parciales):
+    parciales = [parcial for parcial in parciales if parcial is not None]
+    if not parciales:
+        return agregados.CuboMortalidad(pd.DataFrame(columns=agregados.DIMENSIONES_CUBO + ['MUERTES']))
+    conteo = pd.concat(parciales).groupby(level=list(range(len(agregados.DIMENSIONES_CUBO)))).sum()
+    return agregados.CuboMortalidad(conteo.astype('int64').sort_index().reset_index(name='MUERTES'))
+
+# Construye el cubo de mortalidad de `años` repartiendo rangos de filas de cada año entre varios
+# procesos (map) y sumando sus conteos parciales (reduce). El resultado es el mismo que el de
+# agregados.construir_cubo sobre todos los registros. `cargar(año)` devuelve los registros de un año
+# (como cargar_datos.cargar_mortalidad_año) y se llama una sola vez por año, en este proceso.
+# Por defecto cada año se parte en tantas partes como haga falta para ocupar todos los procesos.
+def construir_cubo(años, cargar, diccionario, procesos=PROCESOS, partes=None):
+    años = list(años)
+    if partes is None:
+        partes = max(1, -(-procesos // max(len(años), 1)))
+    trabajo = [fragmento for año in años for fragmento in fragmentos(cargar(año), partes)]
+    if procesos <= 1 or len(trabajo) <= 1:
+        _iniciar(diccionario)
+        return combinar([_contar_fragmento(fragmento) for fragmento in trabajo])
+    # spawn y no fork, como en ingesta_paralela: el proceso web puede tener hilos al momento de agregar
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(procesos, len(trabajo)), mp_context=contexto,
+                             initializer=_iniciar, initargs=(diccionario,)) as ejecutor:
+        parciales = list(ejecutor.map(_contar_fragmento, trabajo))
+    return combinar(parciales)
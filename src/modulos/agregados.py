@@ -0,0 +1,90 @@
+import pandas as pd
+
+
+# Conteo de registros por una o varias columnas que se acumula bloque por bloque.
+# La memoria que ocupa depende del número de claves distintas y no del número de filas leídas.
+class ConteoIncremental:
+    def __init__(self, columnas, filtro=None):
+        self.columnas = list(columnas)
+        self.filtro = filtro
+        self.conteo = None
+
+    # Cuenta las filas del bloque y las suma a lo acumulado.
+    def actualizar(self, bloque):
+        if self.filtro is not None:
+            bloque = bloque[self.filtro(bloque)]
+        clave = self.columnas[0] if len(self.columnas) == 1 else self.columnas
+        parcial = bloque.groupby(clave, observed=True).size()
+        parcial.index = _sin_categorias(parcial.index)
+        self._sumar(parcial)
+
+    # Suma los conteos de otro acumulador sobre las mismas columnas.
+    def combinar(self, otro):
+        if otro.conteo is not None:
+            self._sumar(otro.conteo)
+
+    def _sumar(self, parcial):
+        if self.conteo is None:
+            self.conteo = parcial.astype('int64')
+        else:
+            self.conteo = self.conteo.add(parcial, fill_value=0).astype('int64')
+
+    # Devuelve el conteo acumulado, ordenado por clave.
+    def resultado(self):
+        if self.conteo is None:
+            return pd.Series(dtype='int64')
+        return self.conteo.sort_index()
+
+
+# Cada bloque puede traer categorías distintas; se pasan a sus valores para poder sumar los bloques.
+def _sin_categorias(indice):
+    if isinstance(indice, pd.MultiIndex):
+        niveles = [_sin_categorias(indice.get_level_values(i)) for i in range(indice.nlevels)]
+        return pd.MultiIndex.from_arrays(niveles, names=indice.names)
+    if isinstance(indice, pd.CategoricalIndex):
+        return pd.Index(indice.astype(indice.categories.dtype), name=indice.name)
+    return indice
+
+
+# Dimensiones del cubo de mortalidad. El departamento y el año dependen del municipio y del archivo,
+# así que no agregan celdas; están para poder sumar por ellos directamente.
+DIMENSIONES_CUBO = ['AÑO', 'COD_DEPARTAMENTO', 'COD_DANE', 'MES', 'SEXO', 'GRUPO_EDAD1', 'ID_CAUSA']
+
+
+# Cubo de conteos de mortalidad: una fila por combinación de dimensiones presente en los registros
+# (solo las celdas no vacías) con su número de muertes en MUERTES. Todas las vistas de procesar_datos
+# se calculan sumando sobre él en lugar de recorrer los registros.
+class CuboMortalidad:
+    def __init__(self, celdas):
+        self.celdas = celdas
+
+    def __len__(self):
+        return len(self.celdas)
+
+    # Total de muertes, opcionalmente solo de las celdas donde `mascara` es True.
+    def total(self, mascara=None):
+        muertes = self.celdas['MUERTES'] if mascara is None else self.celdas['MUERTES'][mascara]
+        return int(muertes.sum())
+
+    # Suma las muertes (u otra `medida` de las celdas) por las dimensiones de `por`, opcionalmente solo
+    # de las celdas donde `mascara` es True (por ejemplo, DiccionarioCausas.mascara sobre la
+    # columna ID_CAUSA). Resultado ordenado por clave.
+    def sumar(self, por, mascara=None, medida='MUERTES'):
+        celdas = self.celdas if mascara is None else self.celdas[mascara]
+        clave = por[0] if len(por) == 1 else list(por)
+        return celdas.groupby(clave)[medida].sum()
+
+    # Cubo con solo las celdas donde `mascara` es True, para calcular variantes filtradas de las vistas.
+    def filtrar(self, mascara):
+        return CuboMortalidad(self.celdas[mascara].reset_index(drop=True))
+
+
+# Construye el cubo en una sola pasada por los registros, que pueden llegar en uno o varios bloques
+# (ver cargar_datos.agregar_mortalidad_por_bloques). Los bloques deben traer ID_CAUSA (ver causas.py).
+def construir_cubo(bloques):
+    acumulador = ConteoIncremental(DIMENSIONES_CUBO)
+    for bloque in bloques:
+        acumulador.actualizar(bloque)
+    if acumulador.conteo is None:
+        return CuboMortalidad(pd.DataFrame(columns=DIMENSIONES_CUBO + ['MUERTES']))
+    return CuboMortalidad(acumulador.resultado().reset_index(name='MUERTES'))
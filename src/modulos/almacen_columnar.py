@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# Versión del formato en disco; al cambiarla se invalidan todos los almacenes existentes
+VERSION_FORMATO = 1
+# Tamaño de los bloques con que se lee el archivo fuente para calcular su hash
+TAMAÑO_BLOQUE_HASH = 1 << 20
+NOMBRE_MANIFIESTO = 'manifiesto.json'
+
+
+# Calcula el hash SHA-256 del contenido de un archivo leyéndolo por bloques.
+# `firma` permite mezclar en el hash cómo se interpreta el archivo (por ejemplo, su esquema).
+def huella_archivo(ruta, firma=''):
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(TAMAÑO_BLOQUE_HASH), b''):
+            h.update(bloque)
+    h.update(firma.encode('utf-8'))
+    return h.hexdigest()
+
+# Escribe cada columna del DataFrame en su propio archivo .npy y deja el manifiesto para el final.
+# Las columnas de texto se guardan como códigos enteros y sus valores únicos van en el manifiesto.
+def guardar_columnas(df, destino, huella):
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    columnas = []
+    for i, nombre in enumerate(df.columns):
+        serie = df[nombre]
+        entrada = {'nombre': nombre, 'archivo': f'col_{i:03d}.npy'}
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            entrada['tipo'] = 'categoria'
+            entrada['categorias'] = serie.cat.categories.tolist()
+            valores = serie.cat.codes.to_numpy()
+        elif isinstance(serie.dtype, np.dtype) and serie.dtype.kind in 'biufc':
+            entrada['tipo'] = 'numerico'
+            valores = serie.to_numpy()
+        else:
+            codigos, categorias = pd.factorize(serie)
+            entrada['tipo'] = 'objeto'
+            entrada['categorias'] = categorias.tolist()
+            valores = codigos
+        np.save(destino / entrada['archivo'], valores, allow_pickle=False)
+        columnas.append(entrada)
+
+    manifiesto = {
+        'version': VERSION_FORMATO,
+        'huella': huella,
+        'filas': len(df),
+        'columnas': columnas,
+    }
+    (destino / NOMBRE_MANIFIESTO).write_text(json.dumps(manifiesto, ensure_ascii=False), encoding='utf-8')
+
+# Lee el manifiesto de un almacén; devuelve None si no existe o pertenece a otra versión del formato.
+def leer_manifiesto(destino):
+    ruta = Path(destino) / NOMBRE_MANIFIESTO
+    try:
+        manifiesto = json.loads(ruta.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    if manifiesto.get('version') != VERSION_FORMATO:
+        return None
+    return manifiesto
+
+# Reconstruye el DataFrame mapeando en memoria (solo lectura) los archivos de cada columna.
+def leer_columnas(destino, manifiesto=None):
+    destino = Path(destino)
+    manifiesto = manifiesto or leer_manifiesto(destino)
+    datos = {}
+    for entrada in manifiesto['columnas']:
+        valores = np.load(destino / entrada['archivo'], mmap_mode='r')
+        if entrada['tipo'] == 'categoria':
+            datos[entrada['nombre']] = pd.Categorical.from_codes(valores, categories=entrada['categorias'])
+        elif entrada['tipo'] == 'objeto':
+            # El código -1 marca valores faltantes: apunta al NaN añadido al final de las categorías
+            categorias = np.array(entrada['categorias'] + [np.nan], dtype=object)
+            datos[entrada['nombre']] = categorias[valores]
+        else:
+            datos[entrada['nombre']] = valores
+    # copy=False conserva los arreglos mapeados en lugar de copiarlos a memoria propia del proceso
+    return pd.DataFrame(datos, copy=False)
+
+# Escribe el almacén en un directorio temporal y lo renombra al destino final de forma atómica,
+# para que otro proceso nunca vea un almacén a medio escribir.
+def publicar(df, directorio_cache, destino, huella):
+    temporal = Path(tempfile.mkdtemp(prefix=f'.{destino.name}-', dir=directorio_cache))
+    try:
+        guardar_columnas(df, temporal, huella)
+        os.rename(temporal, destino)
+    except OSError:
+        # Otro proceso publicó el mismo almacén primero, o el disco no permite escribir
+        shutil.rmtree(temporal, ignore_errors=True)
+
+# Elimina los almacenes de versiones anteriores del mismo archivo fuente.
+def _limpiar_anteriores(directorio_cache, nombre, vigente):
+    for ruta in directorio_cache.glob(f'{nombre}-*'):
+        if ruta.is_dir() and ruta != vigente:
+            shutil.rmtree(ruta, ignore_errors=True)
+
+# Devuelve el contenido de `ruta` desde su almacén columnar. Si el almacén no existe o el hash
+# del archivo fuente (o la firma del lector) cambió, lo reconstruye leyendo el archivo con `lector`.
+def cargar_con_cache(ruta, lector, directorio_cache, firma=''):
+    ruta = Path(ruta)
+    directorio_cache = Path(directorio_cache)
+    huella = huella_archivo(ruta, firma)
+    destino = directorio_cache / f'{ruta.stem}-{huella[:16]}'
+
+    manifiesto = leer_manifiesto(destino)
+    if manifiesto is not None and manifiesto['huella'] == huella:
+        return leer_columnas(destino, manifiesto)
+
+    df = lector(ruta)
+    try:
+        directorio_cache.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return df
+    publicar(df, directorio_cache, destino, huella)
+    manifiesto = leer_manifiesto(destino)
+    if manifiesto is None or manifiesto['huella'] != huella:
+        return df
+    _limpiar_anteriores(directorio_cache, ruta.stem, destino)
+    return leer_columnas(destino, manifiesto)
@@ -1,25 +1,126 @@
 import json
+import os
+from functools import partial
 from pathlib import Path
-import pandas as pd
 
+from src.modulos import agregacion_paralela, agregados, almacen_columnar, catalogo, causas, esquemas, estaticos, geografia, geometria, ingesta_paralela, procesar_datos, tasas
 
-# Obtener la ruta base del proyecto (2 niveles arriba desde este archivo)
-DATA_DIR = Path(__file__).parent.parent / 'data'
+
+# Obtener la ruta base del proyecto (2 niveles arriba desde este archivo); se puede cambiar con DATA_DIR
+DATA_DIR = Path(os.environ.get('DATA_DIR', Path(__file__).parent.parent / 'data'))
+# Directorio donde se guardan los almacenes columnares construidos a partir de los CSV
+CACHE_DIR = DATA_DIR / '.cache'
+# Artefactos de servicio generados por src/construir_datos.py; cuando existen se usan en lugar de los CSV
+ARTEFACTOS_DIR = DATA_DIR / 'artefactos'
+# Directorio de los archivos que se sirven al navegador con un nombre con hash (ver estaticos.py)
+ESTATICOS_DIR = CACHE_DIR / 'estaticos'
+# Filas por bloque en la ingesta por bloques; acota la memoria máxima independientemente del tamaño del archivo
+FILAS_POR_BLOQUE = 250_000
+
+# Carga un archivo según su esquema declarado, pasando por el almacén columnar
+def _cargar_con_esquema(esquema, ruta=None):
+    ruta = ruta or DATA_DIR / esquema['archivo']
+    lector = partial(ingesta_paralela.leer_csv, esquema=esquema)
+    return almacen_columnar.cargar_con_cache(ruta, lector, CACHE_DIR, firma=esquemas.firma(esquema))
+
+# Carga un artefacto de servicio ya normalizado (mapeado en memoria), o None si no se ha construido o
+# si sus fuentes cambiaron desde entonces; `fuentes` son los archivos que se leerían sin artefacto.
+def _cargar_artefacto(nombre, fuentes=()):
+    ruta = catalogo.ruta_artefacto(ARTEFACTOS_DIR, nombre, fuentes)
+    if ruta is None or almacen_columnar.leer_manifiesto(ruta) is None:
+        return None
+    return almacen_columnar.leer_columnas(ruta)
 
 def cargar_datos_mortalidad():
-    ruta = DATA_DIR / 'datosmortalidad.csv'
-    return pd.read_csv(ruta, encoding='latin1')
+    return _cargar_con_esquema(esquemas.MORTALIDAD)
+
+# Años disponibles: los de las particiones anuales más los que traiga el archivo único, si existe.
+def años_disponibles():
+    años = set(catalogo.descubrir_particiones(DATA_DIR)) | set(catalogo.años_artefactos(ARTEFACTOS_DIR))
+    if (DATA_DIR / esquemas.MORTALIDAD['archivo']).exists():
+        años.update(int(año) for año in cargar_datos_mortalidad()['AÑO'].unique())
+    return sorted(años)
+
+# Carga los registros de un solo año. Se usa su artefacto de servicio si existe y se construyó a partir
+# del archivo que se leería hoy, sin cambios; si no, y existe su partición datosmortalidad_YYYY, se
+# abre solo esa, de modo que el tiempo de carga y la memoria no crecen con la cantidad de años
+# disponibles; si no, se filtra el año en el archivo único.
+def cargar_mortalidad_año(año):
+    ruta = catalogo.ruta_particion(DATA_DIR, año)
+    unico = DATA_DIR / esquemas.MORTALIDAD['archivo']
+    fuentes = [ruta] if ruta is not None else [unico] if unico.exists() else []
+    df = _cargar_artefacto(f'{catalogo.PREFIJO_ARTEFACTO_MORTALIDAD}{año}', fuentes)
+    if df is not None:
+        return df
+    df = cargar_datos_mortalidad() if ruta is None else _cargar_con_esquema(esquemas.MORTALIDAD, ruta)
+    return procesar_datos.filtrar_año(df, año)
+
+# Lee el archivo de mortalidad por bloques y va sumando cada bloque al cubo de conteos del dashboard
+# (ver agregados.construir_cubo), sin cargar nunca el archivo completo. Las causas de cada bloque
+# se codifican contra `diccionario` (por defecto, el del catálogo CIE-10).
+def agregar_mortalidad_por_bloques(año=None, filas_por_bloque=FILAS_POR_BLOQUE, diccionario=None):
+    ruta = catalogo.ruta_particion(DATA_DIR, año) or DATA_DIR / esquemas.MORTALIDAD['archivo']
+    diccionario = diccionario or cargar_diccionario_causas()
+
+    def bloques():
+        for bloque in esquemas.leer_csv_por_bloques(ruta, esquemas.MORTALIDAD, filas_por_bloque):
+            if año is not None:
+                bloque = bloque[bloque['AÑO'] == año]
+            yield causas.codificar_registros(bloque, diccionario)
+
+    return agregados.construir_cubo(bloques())
+
+# Cubo de conteos de varios años (por defecto, todos los disponibles) agregado en paralelo por año y
+# rango de filas (ver agregacion_paralela.py); igual al que sale de agregar los registros en un proceso.
+def agregar_mortalidad_en_paralelo(años=None, diccionario=None, procesos=agregacion_paralela.PROCESOS):
+    años = años_disponibles() if años is None else años
+    diccionario = diccionario or cargar_diccionario_causas()
+    return agregacion_paralela.construir_cubo(años, cargar_mortalidad_año, diccionario, procesos=procesos)
 
 def cargar_division_politico_administrativa():
-    ruta = DATA_DIR / 'divipola.csv'
-    return pd.read_csv(ruta, encoding='latin1')
+    df = _cargar_artefacto('divipola')
+    return _cargar_con_esquema(esquemas.DIVIPOLA) if df is None else df
 
 def cargar_codigos_de_muerte():
-    ruta = DATA_DIR / 'Codigosmuerte.csv'
-    return pd.read_csv(ruta, encoding='latin1')
+    df = _cargar_artefacto('codigos_muerte')
+    return _cargar_con_esquema(esquemas.CODIGOS_MUERTE) if df is None else df
+
+# Dimensión geográfica (ver geografia.py) construida a partir de la DIVIPOLA
+def cargar_geografia(df_division=None):
+    return geografia.Geografia(cargar_division_politico_administrativa() if df_division is None else df_division)
+
+# Diccionario de códigos CIE-10 contra el que se codifican las causas de los registros (ver causas.py)
+def cargar_diccionario_causas(df_codigos=None):
+    return causas.DiccionarioCausas(cargar_codigos_de_muerte() if df_codigos is None else df_codigos)
 
-def cargar_geojson_colombia():
+# Proyecciones de población (ver esquemas.POBLACION), o None si no se publicó poblacion.csv
+def cargar_poblacion():
+    if not (DATA_DIR / esquemas.POBLACION['archivo']).exists():
+        return None
+    return _cargar_con_esquema(esquemas.POBLACION)
+
+# Denominadores de población del año para las tasas (ver tasas.py), o None si no hay población
+def cargar_denominadores(año, dimension_geografica=None):
+    df_poblacion = cargar_poblacion()
+    if df_poblacion is None:
+        return None
+    return tasas.Denominadores(df_poblacion, dimension_geografica or cargar_geografia(), año)
+
+# Sin zoom devuelve el GeoJSON original; con zoom, su variante simplificada y cuantizada para ese
+# nivel (ver geometria.py), que se genera una vez y queda guardada en el almacén. En ambos casos cada
+# feature trae como `id` el código de su departamento.
+def cargar_geojson_colombia(zoom=None):
     ruta = DATA_DIR / 'Colombia.geo.json'
+    if zoom is not None:
+        return geometria.cargar_variante(ruta, CACHE_DIR / 'geometria', zoom)
     with open(ruta, 'r', encoding='utf-8') as f:
         geojson = json.load(f)
-    return geojson
+    return geometria.con_ids(geojson)
+
+# Publica la variante del GeoJSON para el zoom como archivo estático (ver estaticos.py) y devuelve su
+# nombre, o None si no se puede escribir en el directorio de datos.
+def publicar_geojson_colombia(zoom):
+    try:
+        return estaticos.publicar(geometria.ruta_variante(DATA_DIR / 'Colombia.geo.json', CACHE_DIR / 'geometria', zoom), ESTATICOS_DIR)
+    except OSError:
+        return None
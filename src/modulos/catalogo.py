@@ -0,0 +1,71 @@
+import json
+import re
+from pathlib import Path
+
+
+# Particiones anuales del registro de mortalidad: datosmortalidad_YYYY.csv (opcionalmente comprimido)
+PATRON_PARTICION = re.compile(r'^datosmortalidad_(\d{4})\.csv(?:\.gz|\.bz2|\.zip|\.xz)?$')
+# Manifiesto de los artefactos de servicio y prefijo de los artefactos anuales de mortalidad (mortalidad_YYYY)
+NOMBRE_MANIFIESTO_ARTEFACTOS = 'manifiesto.json'
+PREFIJO_ARTEFACTO_MORTALIDAD = 'mortalidad_'
+
+
+# Busca en el directorio las particiones anuales y devuelve {año: ruta}, ordenado por año.
+# Solo se listan nombres de archivo: ninguna partición se abre hasta que se pide su año.
+def descubrir_particiones(directorio):
+    particiones = {}
+    for ruta in Path(directorio).iterdir():
+        coincidencia = PATRON_PARTICION.match(ruta.name)
+        if coincidencia and ruta.is_file():
+            particiones[int(coincidencia.group(1))] = ruta
+    return dict(sorted(particiones.items()))
+
+# Devuelve la ruta de la partición de un año, o None si ese año no tiene partición propia.
+def ruta_particion(directorio, año):
+    return descubrir_particiones(directorio).get(año)
+
+# Lee el manifiesto de artefactos de servicio generado por construir_datos.py; None si no existe.
+def leer_manifiesto_artefactos(directorio):
+    ruta = Path(directorio) / NOMBRE_MANIFIESTO_ARTEFACTOS
+    try:
+        return json.loads(ruta.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+# Estado de un archivo fuente tal como queda en el manifiesto de artefactos: ruta absoluta, tamaño y
+# fecha de modificación (la misma huella barata de refresco.huella_directorio).
+def estado_fuente(ruta):
+    ruta = Path(ruta).resolve()
+    estado = ruta.stat()
+    return {'ruta': str(ruta), 'tamaño': estado.st_size, 'modificado': estado.st_mtime_ns}
+
+# Un artefacto está al día si cada archivo del que se construyó sigue igual (o ya no existe, porque se
+# publicó solo el artefacto) y si `fuentes`, los archivos que se leerían hoy sin artefacto, están
+# entre ellos. Los artefactos sin estado de sus fuentes (de versiones anteriores) no se dan por buenos.
+def artefacto_al_dia(info, fuentes=()):
+    if 'estado_fuentes' not in info:
+        return False
+    registradas = {estado['ruta']: estado for estado in info['estado_fuentes']}
+    if any(str(Path(ruta).resolve()) not in registradas for ruta in fuentes):
+        return False
+    for ruta, estado in registradas.items():
+        if Path(ruta).exists() and estado_fuente(ruta) != estado:
+            return False
+    return True
+
+# Devuelve el directorio (almacén columnar) del artefacto `nombre`, o None si no se ha construido o
+# sus fuentes cambiaron desde que se construyó (ver artefacto_al_dia).
+def ruta_artefacto(directorio, nombre, fuentes=()):
+    manifiesto = leer_manifiesto_artefactos(directorio)
+    if manifiesto is None or nombre not in manifiesto['artefactos']:
+        return None
+    info = manifiesto['artefactos'][nombre]
+    if not artefacto_al_dia(info, fuentes):
+        return None
+    return Path(directorio) / info['directorio']
+
+# Años con artefacto de mortalidad ya construido y al día.
+def años_artefactos(directorio):
+    manifiesto = leer_manifiesto_artefactos(directorio) or {'artefactos': {}}
+    return sorted(int(nombre.rsplit('_', 1)[1]) for nombre, info in manifiesto['artefactos'].items()
+                  if nombre.startswith(PREFIJO_ARTEFACTO_MORTALIDAD) and artefacto_al_dia(info))
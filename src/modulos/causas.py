@@ -0,0 +1,149 @@
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.modulos import esquemas
+
+
+# Identificador de las causas que no están en el catálogo CIE-10 (o que faltan en el registro)
+SIN_CAUSA = -1
+
+# Columnas del catálogo CIE-10 (ver esquemas.CODIGOS_MUERTE) y su nombre en la tabla del diccionario
+_COLUMNAS_CATALOGO = dict(zip(
+    esquemas.CODIGOS_MUERTE['columnas'],
+    ['CAPITULO', 'COD_3', 'DESCRIPCION_3', 'COD_MUERTE', 'DESCRIPCION'],
+))
+
+# Grupos de causas con nombre. Cada definición es una lista separada por comas de prefijos ('X95',
+# 'I2'), rangos de códigos o bloques ('X85-Y09', incluye todos los códigos que empiezan con Y09) o
+# capítulos ('capitulo:20', por su número en el catálogo, o 'capitulo:X95', el que contiene ese código).
+GRUPOS_CAUSAS = {
+    'homicidios': 'X95',
+    'agresiones': 'X85-Y09',
+    'suicidios': 'X60-X84',
+    'accidentes_transporte': 'V01-V99',
+    'causas_externas': 'capitulo:V01',
+}
+# Rango de códigos que abarca cada capítulo, tal como aparece al final de su nombre: "(A00-B99)"
+_PATRON_RANGO_CAPITULO = re.compile(r'\(([A-Z][0-9]{2})-([A-Z][0-9]{2})\)\s*$')
+
+
+# Normaliza códigos CIE-10 (sin espacios y en mayúsculas) una vez por valor distinto.
+def normalizar_codigos(valores):
+    return pd.Index(valores).astype(str).str.strip().str.upper()
+
+
+# Diccionario de causas de muerte: asigna a cada código CIE-10 de cuatro caracteres del catálogo
+# un entero (su posición en el catálogo ordenado por código) y guarda aparte, en `tabla`, el código,
+# su descripción y su agrupación. Los registros de mortalidad se codifican contra él una sola vez al
+# cargarlos, y a partir de ahí filtrar, agrupar y unir por causa son operaciones sobre enteros.
+class DiccionarioCausas:
+    def __init__(self, df_codigos):
+        tabla = df_codigos[list(_COLUMNAS_CATALOGO)].rename(columns=_COLUMNAS_CATALOGO)
+        tabla = tabla.assign(COD_MUERTE=normalizar_codigos(tabla['COD_MUERTE']).to_numpy())
+        tabla = tabla.drop_duplicates('COD_MUERTE').sort_values('COD_MUERTE', kind='stable')
+        self.tabla = tabla.reset_index(drop=True).rename_axis('ID_CAUSA')
+        self.codigos = pd.Index(self.tabla['COD_MUERTE'])
+        # Capítulos del catálogo, resueltos una sola vez (ver _capitulos)
+        self.capitulos = self._capitulos()
+        # Grupos ya resueltos: definición -> tabla de pertenencia por identificador
+        self._grupos = {}
+        self._candado = threading.Lock()
+
+    def __len__(self):
+        return len(self.codigos)
+
+    # Para enviarlo a otros procesos (ver agregacion_paralela.py): viajan la tabla y los grupos ya
+    # resueltos, y el candado se crea de nuevo al llegar.
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        del estado['_candado']
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._candado = threading.Lock()
+
+    # Traduce una columna de códigos a identificadores enteros. Con una columna categórica el código
+    # se normaliza y se busca una vez por categoría; cada fila solo se traduce con un índice de arreglo.
+    def codificar(self, serie):
+        if not isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype('category')
+        ids = self.codigos.get_indexer(normalizar_codigos(serie.cat.categories))
+        # El código -1 (faltante) toma el último elemento del traductor
+        traductor = np.append(ids, SIN_CAUSA).astype(np.int32)
+        return traductor[serie.cat.codes.to_numpy()]
+
+    # Rango [inicio, fin) de identificadores de los códigos entre `desde` y `hasta`, ambos incluidos
+    # como prefijos: como el catálogo está ordenado, basta con dos búsquedas binarias.
+    def _rango(self, desde, hasta):
+        inicio = self.codigos.searchsorted(desde, side='left')
+        fin = self.codigos.searchsorted(hasta + '\uffff', side='left')
+        return inicio, max(inicio, fin)
+
+    # Capítulos del catálogo en orden de código, con el rango de identificadores que ocupa cada uno.
+    def _capitulos(self):
+        filas = []
+        for nombre in self.tabla['CAPITULO'].dropna().unique():
+            encontrado = _PATRON_RANGO_CAPITULO.search(str(nombre))
+            if encontrado is None:
+                continue
+            desde, hasta = encontrado.groups()
+            inicio, fin = self._rango(desde, hasta)
+            filas.append({'CAPITULO': nombre, 'DESDE': desde, 'HASTA': hasta, 'INICIO': inicio, 'FIN': fin})
+        capitulos = pd.DataFrame(filas, columns=['CAPITULO', 'DESDE', 'HASTA', 'INICIO', 'FIN'])
+        capitulos = capitulos.sort_values('DESDE').reset_index(drop=True)
+        capitulos.index = capitulos.index + 1
+        return capitulos.rename_axis('NUMERO')
+
+    # Rango de identificadores de una parte de una definición de grupo.
+    def _rango_parte(self, parte):
+        if parte.startswith('CAPITULO:'):
+            referencia = parte.split(':', 1)[1].strip()
+            capitulos = self.capitulos
+            if referencia.isdigit():
+                if int(referencia) not in capitulos.index:
+                    raise ValueError(f"No existe el capítulo {referencia} del catálogo CIE-10")
+                capitulo = capitulos.loc[int(referencia)]
+            else:
+                contiene = capitulos[(capitulos['DESDE'] <= referencia[:3]) & (capitulos['HASTA'] >= referencia[:3])]
+                if contiene.empty:
+                    raise ValueError(f"Ningún capítulo del catálogo CIE-10 contiene {referencia}")
+                capitulo = contiene.iloc[0]
+            return capitulo['INICIO'], capitulo['FIN']
+        if '-' in parte:
+            desde, hasta = (extremo.strip() for extremo in parte.split('-', 1))
+            if not desde or not hasta or desde > hasta:
+                raise ValueError(f"Rango de códigos CIE-10 no válido: {parte}")
+            return self._rango(desde, hasta)
+        if not parte:
+            raise ValueError("Definición de grupo de causas vacía")
+        return self._rango(parte, parte)
+
+    # Resuelve un grupo (un nombre de GRUPOS_CAUSAS o una definición) a su tabla de pertenencia:
+    # un arreglo booleano por identificador, más una posición final en False para SIN_CAUSA.
+    # Cada definición se interpreta una sola vez; las siguientes consultas la toman de la memoria.
+    def _pertenencia(self, grupo):
+        try:
+            return self._grupos[grupo]
+        except KeyError:
+            pass
+        definicion = GRUPOS_CAUSAS.get(grupo, grupo)
+        pertenece = np.zeros(len(self) + 1, dtype=bool)
+        for parte in str(definicion).split(','):
+            inicio, fin = self._rango_parte(parte.strip().upper())
+            pertenece[inicio:fin] = True
+        pertenece.setflags(write=False)
+        with self._candado:
+            return self._grupos.setdefault(grupo, pertenece)
+
+    # Máscara booleana sobre un arreglo de identificadores: True donde la causa pertenece al grupo.
+    def mascara(self, ids_causa, grupo):
+        return self._pertenencia(grupo)[np.asarray(ids_causa)]
+
+
+# Agrega a los registros la columna ID_CAUSA con la causa codificada contra el diccionario.
+def codificar_registros(df, diccionario):
+    return df.assign(ID_CAUSA=diccionario.codificar(df['COD_MUERTE']))
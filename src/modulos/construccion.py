@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+from unidecode import unidecode
+
+from src.modulos import almacen_columnar, catalogo, esquemas, ingesta_paralela
+
+
+# Versión del formato de los artefactos de servicio
+VERSION_ARTEFACTOS = 2
+
+
+# Quita acentos y espacios sobrantes y pasa a mayúsculas. Se calcula una vez por valor distinto.
+def normalizar_nombres(serie, mayusculas=True):
+    mapa = {}
+    for valor in pd.unique(serie.dropna()):
+        texto = unidecode(str(valor)).strip()
+        mapa[valor] = texto.upper() if mayusculas else texto
+    return serie.map(mapa)
+
+# Normaliza códigos CIE-10: sin espacios y en mayúsculas, una vez por código distinto.
+def normalizar_codigos(serie):
+    mapa = {valor: str(valor).strip().upper() for valor in pd.unique(serie.dropna())}
+    return serie.map(mapa)
+
+# DIVIPOLA cruda -> esquema de servicio: nombres sin acentos y en mayúsculas, códigos enteros.
+def normalizar_divipola(df):
+    df = df.assign(
+        DEPARTAMENTO=normalizar_nombres(df['DEPARTAMENTO']),
+        MUNICIPIO=normalizar_nombres(df['MUNICIPIO']),
+    )
+    df = df[list(esquemas.DIVIPOLA['columnas'])].astype(esquemas.DIVIPOLA['columnas'])
+    esquemas.validar(df, esquemas.DIVIPOLA)
+    return df
+
+# Catálogo CIE-10 crudo (ya renombrado) -> esquema de servicio: códigos en mayúsculas y textos sin acentos.
+def normalizar_codigos_muerte(df):
+    capitulo, codigo3, descripcion3, codigo4, descripcion4 = esquemas.CODIGOS_MUERTE['columnas']
+    df = df.assign(**{
+        capitulo: normalizar_nombres(df[capitulo], mayusculas=False),
+        codigo3: normalizar_codigos(df[codigo3]),
+        descripcion3: normalizar_nombres(df[descripcion3], mayusculas=False),
+        codigo4: normalizar_codigos(df[codigo4]),
+        descripcion4: normalizar_nombres(df[descripcion4], mayusculas=False),
+    })
+    df = df[list(esquemas.CODIGOS_MUERTE['columnas'])].astype(esquemas.CODIGOS_MUERTE['columnas'])
+    esquemas.validar(df, esquemas.CODIGOS_MUERTE)
+    return df
+
+# Registros de mortalidad: el código de muerte queda normalizado desde la construcción.
+def normalizar_mortalidad(df):
+    return df.assign(COD_MUERTE=normalizar_codigos(df['COD_MUERTE']).astype('category'))
+
+# Lee los registros de mortalidad de un directorio y los separa por año. Cada año sale de su
+# partición datosmortalidad_YYYY si existe y, si no, del archivo único, igual que en cargar_datos.
+def _mortalidad_por_año(directorio):
+    directorio = Path(directorio)
+    particiones = catalogo.descubrir_particiones(directorio)
+    años = {}
+    for año, ruta in particiones.items():
+        df = ingesta_paralela.leer_csv(ruta, esquemas.MORTALIDAD)
+        años[año] = (df[df['AÑO'] == año], [ruta])
+    unico = directorio / esquemas.MORTALIDAD['archivo']
+    if unico.exists():
+        df = ingesta_paralela.leer_csv(unico, esquemas.MORTALIDAD)
+        for año, registros in df.groupby('AÑO'):
+            if int(año) not in años:
+                años[int(año)] = (registros, [unico])
+    return dict(sorted(años.items()))
+
+# Escribe un artefacto como almacén columnar versionado por el hash de sus fuentes. La entrada del
+# manifiesto guarda además el estado de cada fuente, para que cargar_datos no use el artefacto si
+# la fuente cambia después de construirlo.
+def _escribir_artefacto(destino, nombre, df, fuentes):
+    h = hashlib.sha256(f'{VERSION_ARTEFACTOS}:{nombre}'.encode('utf-8'))
+    for ruta in fuentes:
+        h.update(almacen_columnar.huella_archivo(ruta).encode('utf-8'))
+    huella = h.hexdigest()
+    directorio = destino / f'{nombre}-{huella[:16]}'
+    if almacen_columnar.leer_manifiesto(directorio) is None:
+        almacen_columnar.publicar(df.reset_index(drop=True), destino, directorio, huella)
+    return {
+        'directorio': directorio.name,
+        'fuentes': [Path(ruta).name for ruta in fuentes],
+        'estado_fuentes': [catalogo.estado_fuente(ruta) for ruta in fuentes],
+        'huella': huella,
+        'filas': len(df),
+    }
+
+# Publica el manifiesto de forma atómica y borra los artefactos que ya no referencia.
+def _publicar_manifiesto(destino, manifiesto):
+    descriptor, temporal = tempfile.mkstemp(prefix='.manifiesto-', dir=destino)
+    with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+    os.replace(temporal, destino / catalogo.NOMBRE_MANIFIESTO_ARTEFACTOS)
+    vigentes = {info['directorio'] for info in manifiesto['artefactos'].values()}
+    for ruta in destino.iterdir():
+        if ruta.is_dir() and ruta.name not in vigentes:
+            shutil.rmtree(ruta, ignore_errors=True)
+
+# Compila los archivos fuente en artefactos de servicio: lee la DIVIPOLA y el catálogo CIE-10 crudos
+# de `origen` y los registros de mortalidad de `origen_mortalidad`, normaliza los textos una sola vez
+# y escribe en `destino` un almacén columnar por tabla (uno por año para la mortalidad) más el manifiesto.
+def construir_artefactos(origen, origen_mortalidad, destino):
+    origen, destino = Path(origen), Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    artefactos = {}
+
+    ruta = origen / esquemas.DIVIPOLA_CRUDA['archivo']
+    divipola = normalizar_divipola(esquemas.leer_csv(ruta, esquemas.DIVIPOLA_CRUDA))
+    artefactos['divipola'] = _escribir_artefacto(destino, 'divipola', divipola, [ruta])
+
+    ruta = origen / esquemas.CODIGOS_MUERTE_CRUDOS['archivo']
+    codigos = normalizar_codigos_muerte(esquemas.leer_csv(ruta, esquemas.CODIGOS_MUERTE_CRUDOS))
+    artefactos['codigos_muerte'] = _escribir_artefacto(destino, 'codigos_muerte', codigos, [ruta])
+
+    if origen_mortalidad is not None and Path(origen_mortalidad).is_dir():
+        for año, (registros, fuentes) in _mortalidad_por_año(origen_mortalidad).items():
+            nombre = f'{catalogo.PREFIJO_ARTEFACTO_MORTALIDAD}{año}'
+            artefactos[nombre] = _escribir_artefacto(destino, nombre, normalizar_mortalidad(registros), fuentes)
+
+    manifiesto = {
+        'formato': VERSION_ARTEFACTOS,
+        'version': hashlib.sha256(''.join(info['huella'] for info in artefactos.values()).encode('utf-8')).hexdigest()[:16],
+        'construido': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'artefactos': artefactos,
+    }
+    _publicar_manifiesto(destino, manifiesto)
+    return manifiesto
@@ -0,0 +1,234 @@
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from src.modulos import agregados, edades, ranking
+
+
+# Pregunta al dashboard, declarada y no calculada: filtros, dimensiones por las que agrupar, medida,
+# cuántas filas y en qué orden. Es inmutable y hashable, así que sirve de clave para las memorias.
+#   agrupar_por: nombres de DIMENSIONES ('edad:decenal' elige el esquema de edad) o columnas de los registros
+#   año, sexo, departamento, municipio: valores permitidos (COD_DEPARTAMENTO y COD_DANE para la geografía)
+#   edad: (desde, hasta) en años, hasta exclusivo; se filtra por el grupo de edad del DANE
+#   causa: nombre o definición de un grupo de causas (ver causas.GRUPOS_CAUSAS)
+#   orden: 'clave' (orden natural de las dimensiones), 'desc' o 'asc' por la medida
+Consulta = namedtuple(
+    'Consulta',
+    ['agrupar_por', 'año', 'sexo', 'edad', 'departamento', 'municipio', 'causa', 'medida', 'top_n', 'orden', 'empates'],
+    defaults=((), None, None, None, None, None, None, 'MUERTES', None, 'clave', 'cortar'),
+)
+
+# Plan de una consulta: de dónde se leen los datos ('cubo' o 'registros'), qué filtros se aplican
+# (cada uno es una máscara booleana que se guarda) y qué dimensiones forman la clave de grupo.
+Plan = namedtuple('Plan', ['fuente', 'filtros', 'dimensiones'])
+
+# Columnas de las que depende cada dimensión con nombre
+DIMENSIONES = {
+    'año': 'AÑO',
+    'departamento': 'COD_DEPARTAMENTO',
+    'municipio': 'COD_DANE',
+    'mes': 'MES',
+    'sexo': 'SEXO',
+    'edad': 'GRUPO_EDAD1',
+    'causa': 'ID_CAUSA',
+    'capitulo': 'ID_CAUSA',
+}
+# Filtros que son una lista de valores permitidos de una columna
+_FILTROS_VALORES = {'año': 'AÑO', 'sexo': 'SEXO', 'departamento': 'COD_DEPARTAMENTO', 'municipio': 'COD_DANE'}
+# Nombres legibles del sexo
+_SEXOS = {1: 'Masculino', 2: 'Femenino', 3: 'Otro'}
+# Por encima de este número de combinaciones posibles se agrupa con np.unique en vez de un bincount denso
+_MAXIMO_DENSO = 1 << 20
+
+
+# Crea una Consulta aceptando listas en los filtros y una sola dimensión como texto.
+def consulta(agrupar_por=(), **campos):
+    if isinstance(agrupar_por, str):
+        agrupar_por = (agrupar_por,)
+    for nombre, valor in campos.items():
+        if isinstance(valor, (list, set, np.ndarray)):
+            campos[nombre] = tuple(sorted(np.asarray(list(valor)).tolist()))
+        elif nombre in _FILTROS_VALORES and valor is not None and not isinstance(valor, tuple):
+            campos[nombre] = (valor,)
+    return Consulta(agrupar_por=tuple(agrupar_por), **campos)
+
+
+# Resuelve consultas sobre una versión de los datos. Cada consulta se planifica una sola vez: se
+# elige la fuente más barata que la puede responder (un resultado ya calculado; el cubo de conteos
+# si todo lo que usa está en él; si no, los registros filtrados con máscaras) y se ejecuta con numpy:
+# máscaras booleanas guardadas por filtro, códigos enteros guardados por dimensión y un solo
+# bincount sobre la clave combinada. `recursos` es la instantánea de la versión (ver app.crear_recursos);
+# de ella se toman 'cubo', 'geografia', 'causas' y, solo si un plan lo necesita, 'mortalidad'.
+class MotorConsultas:
+    def __init__(self, recursos):
+        self.recursos = recursos
+        self._planes = {}
+        self._resultados = {}
+        self._mascaras = {}
+        self._codigos = {}
+        self._candado = threading.Lock()
+
+    # Responde la consulta (un resultado ya calculado se reutiliza).
+    def ejecutar(self, pregunta):
+        try:
+            return self._resultados[pregunta].copy(deep=False)
+        except KeyError:
+            pass
+        resultado = self._ejecutar(pregunta, self.planificar(pregunta))
+        with self._candado:
+            resultado = self._resultados.setdefault(pregunta, resultado)
+        return resultado.copy(deep=False)
+
+    # Muertes (u otra `medida`) por las columnas de `por` como una serie indexada por ellas y ordenada
+    # por clave, la misma forma que devuelve CuboMortalidad.sumar, para las funciones *_desde_conteos
+    # de procesar_datos. `filtros` son los demás campos de Consulta (año, sexo, edad, causa...).
+    def conteo(self, por, **filtros):
+        por = [por] if isinstance(por, str) else list(por)
+        resultado = self.ejecutar(consulta(por, **filtros))
+        return resultado.set_index(por[0] if len(por) == 1 else por)[filtros.get('medida', 'MUERTES')]
+
+    # Ranking de las n filas extremas de una dimensión por la `medida` (por defecto, MUERTES), con los
+    # `filtros` de Consulta. La selección es parcial y los empates se resuelven por la clave de la
+    # dimensión (ver ranking.seleccionar); `empates` es 'cortar' o 'incluir'. El resultado trae la
+    # etiqueta de la dimensión, la medida y los rangos de competición (RANGO) y denso (RANGO_DENSO), y
+    # como es una consulta más se guarda por filtro mientras dure esta versión de los datos.
+    def ranking(self, dimension, n, descendente=True, empates='cortar', **filtros):
+        return self.ejecutar(consulta(dimension, top_n=n, orden='desc' if descendente else 'asc', empates=empates, **filtros))
+
+    # Devuelve el plan de la consulta, compilándolo la primera vez.
+    def planificar(self, pregunta):
+        try:
+            return self._planes[pregunta]
+        except KeyError:
+            pass
+        dimensiones = tuple(pregunta.agrupar_por)
+        filtros = []
+        for nombre, columna in _FILTROS_VALORES.items():
+            valores = getattr(pregunta, nombre)
+            if valores is not None:
+                filtros.append(('valores', columna, tuple(valores)))
+        if pregunta.edad is not None:
+            filtros.append(('edad', 'GRUPO_EDAD1', tuple(pregunta.edad)))
+        if pregunta.causa is not None:
+            filtros.append(('causa', 'ID_CAUSA', pregunta.causa))
+
+        columnas = {columna for _, columna, _ in filtros} | {_columna(dimension) for dimension in dimensiones}
+        en_cubo = pregunta.medida == 'MUERTES' and columnas <= set(agregados.DIMENSIONES_CUBO)
+        plan = Plan('cubo' if en_cubo else 'registros', tuple(filtros), dimensiones)
+        with self._candado:
+            return self._planes.setdefault(pregunta, plan)
+
+    def _datos(self, fuente):
+        return self.recursos['cubo'].celdas if fuente == 'cubo' else self.recursos['mortalidad']
+
+    # Máscara de un filtro sobre una fuente; se guarda para que otras consultas la reutilicen.
+    def _mascara(self, fuente, filtro):
+        clave = (fuente, filtro)
+        if clave not in self._mascaras:
+            tipo, columna, valor = filtro
+            datos = self._datos(fuente)[columna].to_numpy()
+            if tipo == 'valores':
+                mascara = np.isin(datos, valor)
+            elif tipo == 'edad':
+                desde, hasta = valor
+                limites = np.append(edades.LIMITES_GRUPO_EDAD1, np.nan)[np.clip(datos, 0, len(edades.LIMITES_GRUPO_EDAD1))]
+                mascara = (limites >= desde) & (limites < hasta)
+            else:
+                mascara = self.recursos['causas'].mascara(datos, valor)
+            mascara.setflags(write=False)
+            self._mascaras[clave] = mascara
+        return self._mascaras[clave]
+
+    # Códigos enteros (desde 0; -1 si no aplica) y etiquetas de una dimensión sobre una fuente.
+    def _codigos_dimension(self, fuente, dimension):
+        clave = (fuente, dimension)
+        if clave not in self._codigos:
+            valores = self._datos(fuente)[_columna(dimension)].to_numpy()
+            nombre, _, esquema = dimension.partition(':')
+            if nombre == 'departamento':
+                geografia = self.recursos['geografia']
+                codigos, etiquetas = geografia.ids_departamento(valores), geografia.departamentos['DEPARTAMENTO'].to_numpy()
+            elif nombre == 'municipio':
+                geografia = self.recursos['geografia']
+                codigos, etiquetas = geografia.ids_municipio(valores), geografia.municipios['ETIQUETA'].to_numpy()
+            elif nombre == 'edad':
+                esquema = esquema or 'quinquenal'
+                codigos, etiquetas = edades.rangos_grupo_edad(valores, esquema), np.array(edades.etiquetas(esquema), dtype=object)
+            elif nombre == 'causa':
+                codigos, etiquetas = np.asarray(valores), self.recursos['causas'].tabla['COD_MUERTE'].to_numpy()
+            elif nombre == 'capitulo':
+                capitulos = self.recursos['causas'].capitulos
+                codigos = np.searchsorted(capitulos['FIN'].to_numpy(), valores, side='right')
+                codigos = np.where(np.asarray(valores) >= 0, codigos, -1)
+                codigos = np.where(codigos < len(capitulos), codigos, -1)
+                etiquetas = capitulos['CAPITULO'].to_numpy()
+            elif nombre == 'sexo':
+                codigos, etiquetas = np.asarray(valores, dtype=np.int64) - 1, np.array(list(_SEXOS.values()), dtype=object)
+                codigos = np.where((codigos >= 0) & (codigos < len(etiquetas)), codigos, -1)
+            else:
+                codigos, etiquetas = pd.factorize(valores, sort=True)
+                etiquetas = np.asarray(etiquetas)
+            self._codigos[clave] = (np.asarray(codigos, dtype=np.int64), etiquetas)
+        return self._codigos[clave]
+
+    def _ejecutar(self, pregunta, plan):
+        datos = self._datos(plan.fuente)
+        # MUERTES en los registros es contar filas; cualquier otra medida tiene que ser una columna de la fuente
+        if pregunta.medida in datos:
+            pesos = datos[pregunta.medida].to_numpy()
+        elif pregunta.medida == 'MUERTES':
+            pesos = None
+        else:
+            raise ValueError(f"Medida no disponible en los datos: {pregunta.medida}")
+        validas = np.ones(len(datos), dtype=bool)
+        for filtro in plan.filtros:
+            validas &= self._mascara(plan.fuente, filtro)
+        dimensiones = [self._codigos_dimension(plan.fuente, dimension) for dimension in plan.dimensiones]
+        for codigos, _ in dimensiones:
+            validas &= codigos >= 0
+
+        forma = tuple(len(etiquetas) for _, etiquetas in dimensiones)
+        pesos = None if pesos is None else pesos[validas]
+        if not dimensiones:
+            total = validas.sum() if pesos is None else pesos.sum()
+            return pd.DataFrame({pregunta.medida: [total]})
+        clave = np.ravel_multi_index([codigos[validas] for codigos, _ in dimensiones], forma)
+        if np.prod(forma, dtype=np.int64) <= _MAXIMO_DENSO:
+            presentes = np.flatnonzero(np.bincount(clave, minlength=int(np.prod(forma))))
+            sumas = np.bincount(clave, weights=pesos, minlength=int(np.prod(forma)))[presentes]
+        else:
+            presentes, inversa = np.unique(clave, return_inverse=True)
+            sumas = np.bincount(inversa, weights=pesos)
+        sumas = sumas.astype(np.int64) if pesos is None or np.issubdtype(pesos.dtype, np.integer) else sumas
+
+        if pregunta.top_n is not None:
+            posiciones, denso, competicion = ranking.seleccionar(
+                sumas, pregunta.top_n, descendente=pregunta.orden != 'asc', claves=presentes, empates=pregunta.empates)
+        elif pregunta.orden in ('desc', 'asc'):
+            posiciones = ranking.seleccionar(sumas, len(sumas), descendente=pregunta.orden == 'desc', claves=presentes)[0]
+            competicion = None
+        else:
+            posiciones, competicion = np.arange(len(sumas)), None
+
+        indices = np.unravel_index(presentes[posiciones], forma)
+        resultado = pd.DataFrame({
+            _salida(dimension): etiquetas[indice]
+            for dimension, (_, etiquetas), indice in zip(plan.dimensiones, dimensiones, indices)
+        })
+        resultado[pregunta.medida] = sumas[posiciones]
+        if competicion is not None:
+            resultado['RANGO'] = competicion
+            resultado['RANGO_DENSO'] = denso
+        return resultado
+
+
+# Columna de la que sale una dimensión: la de DIMENSIONES o, si no tiene nombre, la columna misma.
+def _columna(dimension):
+    return DIMENSIONES.get(dimension.partition(':')[0], dimension)
+
+# Nombre de la columna de una dimensión en el resultado
+def _salida(dimension):
+    nombre = dimension.partition(':')[0]
+    return nombre.upper() if nombre in DIMENSIONES else dimension
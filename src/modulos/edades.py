@@ -0,0 +1,93 @@
+import numpy as np
+
+
+# Límite inferior, en años, de cada código GRUPO_EDAD1 del DANE (la posición es el código):
+# 0 menor de 1 hora, 1 menor de 1 día, 2 de 1 a 6 días, 3 de 7 a 27 días, 4 de 28 a 29 días,
+# 5 de 1 a 5 meses, 6 de 6 a 11 meses, 7 un año, 8 de 2 a 4 años, 9 a 24 quinquenios de 5-9 a 80-84,
+# 25 a 27 de 85-89 a 95-99, 28 de 100 años y más. El 29 (edad desconocida) no tiene límite.
+_HORA = 1 / (365 * 24)
+_DIA = 1 / 365
+LIMITES_GRUPO_EDAD1 = np.array(
+    [0, _HORA, _DIA, 7 * _DIA, 28 * _DIA, 30 * _DIA, 0.5, 1, 2]
+    + [5 * (codigo - 8) for codigo in range(9, 29)]
+    + [np.nan]
+)
+# Código GRUPO_EDAD1 de edad desconocida
+EDAD_DESCONOCIDA = 29
+
+# Esquemas de rangos de edad: límites inferiores en años de cada rango, sus etiquetas y el tope
+# (exclusivo) del esquema; las edades por encima del tope quedan fuera. Cada código GRUPO_EDAD1
+# cae entero dentro de un rango de cualquiera de estos esquemas.
+ESQUEMAS_EDAD = {
+    'quinquenal': {
+        'limites': list(range(0, 90, 5)),
+        'etiquetas': [f'{inicio}-{inicio + 4}' for inicio in range(0, 85, 5)] + ['85+'],
+        'tope': None,
+    },
+    'decenal': {
+        'limites': list(range(0, 100, 10)),
+        'etiquetas': [f'{inicio}-{inicio + 9}' for inicio in range(0, 90, 10)] + ['90+'],
+        'tope': None,
+    },
+    # Grupos amplios de edad de la OMS
+    'oms': {
+        'limites': [0, 5, 15, 30, 50, 70],
+        'etiquetas': ['0-4', '5-14', '15-29', '30-49', '50-69', '70+'],
+        'tope': None,
+    },
+    # Subgrupos de los menores de un año, como los publica el DANE
+    'infantil': {
+        'limites': [0, _HORA, _DIA, 7 * _DIA, 28 * _DIA, 30 * _DIA, 0.5],
+        'etiquetas': ['Menos de 1 hora', 'Menos de 1 día', '1 a 6 días', '7 a 27 días', '28 a 29 días', '1 a 5 meses', '6 a 11 meses'],
+        'tope': 1,
+    },
+}
+
+
+# Rango de cada edad (en años) en el esquema, o -1 si queda fuera de él o es desconocida.
+def _rangos(edades, esquema):
+    edades = np.asarray(edades, dtype=float)
+    rangos = np.searchsorted(esquema['limites'], edades, side='right') - 1
+    fuera = np.isnan(edades) | (edades < 0)
+    if esquema['tope'] is not None:
+        fuera |= edades >= esquema['tope']
+    rangos[fuera] = -1
+    return rangos
+
+
+# Tablas de búsqueda ya calculadas, por esquema
+_TABLAS = {}
+
+# Tabla de búsqueda de un esquema: para cada código GRUPO_EDAD1 (la posición), su rango o -1.
+# Se calcula una vez por esquema; la última posición extra recibe los códigos fuera de la tabla.
+def _tabla(nombre):
+    if nombre not in _TABLAS:
+        _TABLAS[nombre] = np.append(_rangos(LIMITES_GRUPO_EDAD1, ESQUEMAS_EDAD[nombre]), -1)
+    return _TABLAS[nombre]
+
+
+# Etiquetas de los rangos del esquema, en orden natural.
+def etiquetas(esquema='quinquenal'):
+    return list(ESQUEMAS_EDAD[esquema]['etiquetas'])
+
+# Rango (posición en etiquetas(esquema)) de cada código GRUPO_EDAD1, con un índice de arreglo por fila.
+def rangos_grupo_edad(codigos, esquema='quinquenal'):
+    tabla = _tabla(esquema)
+    codigos = np.asarray(codigos, dtype=np.int64)
+    codigos = np.where((codigos >= 0) & (codigos < len(tabla) - 1), codigos, len(tabla) - 1)
+    return tabla[codigos]
+
+# Rango de cada edad en años (por ejemplo, de una tabla de población), o -1 si queda fuera del esquema.
+def rangos_edad(edades, esquema='quinquenal'):
+    return _rangos(edades, ESQUEMAS_EDAD[esquema])
+
+# Cuenta por rango del esquema a partir de códigos GRUPO_EDAD1, opcionalmente pesados (por ejemplo, con
+# los conteos de un cubo indexado por código). Un solo bincount; el resultado sigue el orden natural y
+# los códigos de edad desconocida quedan fuera.
+def contar_grupos_edad(codigos, esquema='quinquenal', pesos=None):
+    rangos = rangos_grupo_edad(codigos, esquema)
+    validos = rangos >= 0
+    if pesos is not None:
+        pesos = np.asarray(pesos)[validos]
+    conteo = np.bincount(rangos[validos], weights=pesos, minlength=len(ESQUEMAS_EDAD[esquema]['etiquetas']))
+    return conteo.astype(np.int64) if pesos is None or np.issubdtype(pesos.dtype, np.integer) else conteo
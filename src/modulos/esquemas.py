@@ -0,0 +1,210 @@
+import hashlib
+import json
+
+import pandas as pd
+
+
+# Esquemas declarados de los archivos fuente. Cada esquema indica el archivo, su codificación,
+# las únicas columnas que se cargan con su tipo compacto y las reglas de validación por columna.
+# Reglas disponibles: 'rango' (mínimo, máximo), 'valores' (permitidos), 'patron' (regex sobre el
+# texto, ignora faltantes), 'no_nulos' y 'unico'. Opcionalmente, 'filas_preambulo' indica cuántas
+# líneas saltar antes del encabezado y 'renombrar' cómo llamar las columnas después de validarlas.
+
+# Registro de defunciones no fetales del DANE
+MORTALIDAD = {
+    'archivo': 'datosmortalidad.csv',
+    'codificacion': 'latin1',
+    'columnas': {
+        'AÑO': 'int16',
+        'MES': 'int8',
+        'COD_DEPARTAMENTO': 'int8',
+        'COD_DANE': 'uint32',
+        'COD_MUERTE': 'category',
+        'SEXO': 'int8',
+        'GRUPO_EDAD1': 'int8',
+    },
+    'reglas': {
+        'AÑO': {'rango': (1900, 2100)},
+        'MES': {'rango': (1, 12)},
+        'COD_DEPARTAMENTO': {'rango': (1, 99)},
+        'COD_DANE': {'rango': (1000, 99999)},
+        'COD_MUERTE': {'patron': r'^\s*[A-Za-z][0-9]{2}'},
+        'SEXO': {'valores': (1, 2, 3)},
+        'GRUPO_EDAD1': {'rango': (0, 29)},
+    },
+}
+
+# División político-administrativa (DIVIPOLA): un registro por municipio
+DIVIPOLA = {
+    'archivo': 'divipola.csv',
+    'codificacion': 'latin1',
+    'columnas': {
+        'COD_DANE': 'uint32',
+        'COD_DEPARTAMENTO': 'int8',
+        'DEPARTAMENTO': 'category',
+        'MUNICIPIO': 'category',
+    },
+    'reglas': {
+        'COD_DANE': {'no_nulos': True, 'unico': True, 'rango': (1000, 99999)},
+        'COD_DEPARTAMENTO': {'rango': (1, 99)},
+        'DEPARTAMENTO': {'no_nulos': True},
+        'MUNICIPIO': {'no_nulos': True},
+    },
+}
+
+# Catálogo CIE-10 de causas de muerte a cuatro caracteres
+CODIGOS_MUERTE = {
+    'archivo': 'Codigosmuerte.csv',
+    'codificacion': 'latin1',
+    'columnas': {
+        'Nombre capi\xadtulo': 'category',
+        'Codigo de la CIE-10 tres caracteres': 'category',
+        'Descripcion  de codigos mortalidad a tres caracteres': 'category',
+        'Codigo de la CIE-10 cuatro caracteres': 'object',
+        'Descripcion  de codigos mortalidad a cuatro caracteres': 'object',
+    },
+    'reglas': {
+        'Codigo de la CIE-10 cuatro caracteres': {'patron': r'^\s*[A-Za-z][0-9]{2}'},
+        'Codigo de la CIE-10 tres caracteres': {'patron': r'^\s*[A-Za-z][0-9]{2}'},
+    },
+}
+
+# Proyecciones de población del DANE por municipio, año, sexo y edad (opcional). EDAD es la edad
+# simple o el límite inferior del grupo quinquenal (0, 5, ..., 85 para 85 y más).
+POBLACION = {
+    'archivo': 'poblacion.csv',
+    'codificacion': 'utf-8',
+    'columnas': {
+        'COD_DANE': 'uint32',
+        'AÑO': 'int16',
+        'SEXO': 'int8',
+        'EDAD': 'int16',
+        'POBLACION': 'int64',
+    },
+    'reglas': {
+        'COD_DANE': {'no_nulos': True, 'rango': (1000, 99999)},
+        'AÑO': {'rango': (1900, 2100)},
+        'SEXO': {'valores': (1, 2)},
+        'EDAD': {'rango': (0, 120)},
+        'POBLACION': {'rango': (0, 100_000_000)},
+    },
+}
+
+# Archivos crudos tal como los publica el DANE / MinSalud; solo los lee la construcción fuera de línea
+# (ver construccion.py), que los normaliza y los convierte a los esquemas de servicio de arriba.
+DIVIPOLA_CRUDA = {
+    'archivo': 'Division_politico_administrativa.csv',
+    'codificacion': 'utf-8',
+    'columnas': {
+        'COD_DANE': 'uint32',
+        'COD_DEPARTAMENTO': 'int8',
+        'DEPARTAMENTO': 'object',
+        'MUNICIPIO': 'object',
+    },
+    'reglas': DIVIPOLA['reglas'],
+}
+
+# Catálogo CIE-10 crudo: cuatro líneas de metadatos antes del encabezado y una columna final vacía
+CODIGOS_MUERTE_CRUDOS = {
+    'archivo': 'Codigos_de_muerte.csv',
+    'codificacion': 'utf-8',
+    'filas_preambulo': 4,
+    'columnas': {
+        'Nombre capítulo': 'object',
+        'Código de la CIE-10 tres caracteres': 'object',
+        'Descripción  de códigos mortalidad a tres caracteres': 'object',
+        'Código de la CIE-10 cuatro caracteres': 'object',
+        'Descripcion  de códigos mortalidad a cuatro caracteres': 'object',
+    },
+    'reglas': {
+        'Código de la CIE-10 cuatro caracteres': {'no_nulos': True, 'unico': True, 'patron': r'^\s*[A-Za-z][0-9]{2}'},
+        'Código de la CIE-10 tres caracteres': {'no_nulos': True, 'patron': r'^\s*[A-Za-z][0-9]{2}'},
+    },
+    'renombrar': dict(zip(
+        ['Nombre capítulo', 'Código de la CIE-10 tres caracteres', 'Descripción  de códigos mortalidad a tres caracteres',
+         'Código de la CIE-10 cuatro caracteres', 'Descripcion  de códigos mortalidad a cuatro caracteres'],
+        CODIGOS_MUERTE['columnas'],
+    )),
+}
+
+ESQUEMAS = {
+    'mortalidad': MORTALIDAD,
+    'divipola': DIVIPOLA,
+    'codigos_muerte': CODIGOS_MUERTE,
+    'poblacion': POBLACION,
+    'divipola_cruda': DIVIPOLA_CRUDA,
+    'codigos_muerte_crudos': CODIGOS_MUERTE_CRUDOS,
+}
+
+
+# Devuelve un hash estable del esquema; cambia cuando cambian columnas, tipos o reglas.
+def firma(esquema):
+    texto = json.dumps(esquema, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+# Lee un CSV cargando solo las columnas declaradas con sus tipos, y lo valida.
+def leer_csv(ruta, esquema):
+    columnas = esquema['columnas']
+    df = pd.read_csv(
+        ruta,
+        encoding=esquema['codificacion'],
+        skiprows=esquema.get('filas_preambulo', 0),
+        usecols=list(columnas),
+        dtype=columnas,
+    )
+    validar(df, esquema)
+    if 'renombrar' in esquema:
+        df = df.rename(columns=esquema['renombrar'])
+    return df
+
+# Lee un CSV por bloques de `filas_por_bloque` filas con el esquema declarado, validando cada bloque.
+# Solo un bloque vive en memoria a la vez.
+def leer_csv_por_bloques(ruta, esquema, filas_por_bloque):
+    columnas = esquema['columnas']
+    lector = pd.read_csv(
+        ruta,
+        encoding=esquema['codificacion'],
+        skiprows=esquema.get('filas_preambulo', 0),
+        usecols=list(columnas),
+        dtype=columnas,
+        chunksize=filas_por_bloque,
+    )
+    with lector:
+        for bloque in lector:
+            validar(bloque, esquema)
+            yield bloque
+
+# Cuenta los valores de una serie de texto que no cumplen la expresión regular.
+def _no_cumplen_patron(serie, patron):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Basta con revisar cada categoría una vez en lugar de cada fila
+        categorias = serie.cat.categories
+        invalidas = categorias[~categorias.astype(str).str.match(patron)]
+        return int(serie.isin(invalidas).sum())
+    valores = serie.dropna().astype(str)
+    return int((~valores.str.match(patron)).sum())
+
+# Aplica las reglas del esquema y lanza ValueError con todas las violaciones encontradas.
+def validar(df, esquema):
+    errores = []
+    for columna, reglas in esquema.get('reglas', {}).items():
+        serie = df[columna]
+        if reglas.get('no_nulos') and serie.isna().any():
+            errores.append(f"{columna}: {int(serie.isna().sum())} valores faltantes")
+        if reglas.get('unico') and serie.duplicated().any():
+            errores.append(f"{columna}: {int(serie.duplicated().sum())} valores duplicados")
+        if 'rango' in reglas:
+            minimo, maximo = reglas['rango']
+            fuera = int(((serie < minimo) | (serie > maximo)).sum())
+            if fuera:
+                errores.append(f"{columna}: {fuera} valores fuera del rango [{minimo}, {maximo}]")
+        if 'valores' in reglas:
+            invalidos = int((~serie.isin(reglas['valores']) & serie.notna()).sum())
+            if invalidos:
+                errores.append(f"{columna}: {invalidos} valores no permitidos")
+        if 'patron' in reglas:
+            invalidos = _no_cumplen_patron(serie, reglas['patron'])
+            if invalidos:
+                errores.append(f"{columna}: {invalidos} valores no cumplen el formato esperado")
+    if errores:
+        raise ValueError(f"{esquema['archivo']}: " + '; '.join(errores))
@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import flask
+
+from src.modulos import almacen_columnar
+
+
+# Ruta bajo la que se sirven los archivos publicados
+PREFIJO = '/estaticos/'
+# El nombre de cada archivo publicado incluye el hash de su contenido, así que nunca cambia: el
+# navegador (y cualquier CDN intermedio) lo guarda un año y no vuelve a preguntar por él.
+MAX_AGE = 365 * 24 * 60 * 60
+CACHE_INMUTABLE = f'public, max-age={MAX_AGE}, immutable'
+
+
+# Publica una copia de `ruta` en `directorio` con el hash de su contenido en el nombre
+# ({nombre}-{hash16}{extensión}) y devuelve ese nombre. Si ya estaba publicada no la vuelve a
+# copiar; la copia es atómica, así que otro proceso nunca sirve un archivo a medio escribir.
+def publicar(ruta, directorio):
+    ruta, directorio = Path(ruta), Path(directorio)
+    nombre = f'{ruta.stem}-{almacen_columnar.huella_archivo(ruta)[:16]}{ruta.suffix}'
+    destino = directorio / nombre
+    if not destino.exists():
+        directorio.mkdir(parents=True, exist_ok=True)
+        descriptor, temporal = tempfile.mkstemp(prefix=f'.{nombre}-', dir=directorio)
+        with os.fdopen(descriptor, 'wb') as f, open(ruta, 'rb') as origen:
+            shutil.copyfileobj(origen, f)
+        # mkstemp crea el archivo solo legible por su dueño; el proxy o CDN que lo sirva puede ser otro usuario
+        os.chmod(temporal, 0o644)
+        os.replace(temporal, destino)
+    return nombre
+
+# URL de un archivo publicado, relativa a la raíz del servidor.
+def url(nombre):
+    return PREFIJO + nombre
+
+# Registra en el servidor Flask la ruta que sirve los archivos publicados en `directorio`. Se sirven
+# desde el disco y no desde una tabla en memoria, así que cualquier worker responde por un archivo
+# publicado por otro.
+def registrar(server, directorio):
+    directorio = Path(directorio)
+
+    def servir(nombre):
+        respuesta = flask.send_from_directory(directorio, nombre, max_age=MAX_AGE)
+        respuesta.headers['Cache-Control'] = CACHE_INMUTABLE
+        return respuesta
+
+    server.add_url_rule(f'{PREFIJO}<path:nombre>', 'estaticos', servir)
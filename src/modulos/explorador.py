@@ -0,0 +1,143 @@
+import math
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+from unidecode import unidecode
+
+
+# Operadores de filtro de dash_table (filter_action='custom') y su forma canónica. Los prefijos 's' e
+# 'i' (sensible o no a mayúsculas) se aceptan, pero el texto siempre se compara sin acentos ni mayúsculas.
+_OPERADORES = {
+    '=': '=', 'eq': '=',
+    '!=': '!=', 'ne': '!=',
+    '>': '>', 'gt': '>',
+    '>=': '>=', 'ge': '>=',
+    '<': '<', 'lt': '<',
+    '<=': '<=', 'le': '<=',
+    'contains': 'contains',
+    'datestartswith': 'startswith',
+}
+_PATRON_CONDICION = re.compile(r'^\{(?P<columna>[^}]+)\}\s*[si]?(?P<operador>>=|<=|!=|=|>|<|[a-z]+)\s*(?P<valor>.*)$')
+# Memorias de órdenes y máscaras: con este tamaño caben las combinaciones que usa una sesión normal
+_MAXIMO_MEMORIA = 256
+
+
+# Sin acentos y en mayúsculas, para comparar texto.
+def _normalizar(texto):
+    return unidecode(str(texto)).strip().upper()
+
+
+# Separa un filter_query de dash_table ("{COL} op valor && {COL} op valor") en condiciones
+# (columna, operador, valor); las que no se entienden se ignoran.
+def condiciones_filtro(consulta):
+    condiciones = []
+    for parte in (consulta or '').split(' && '):
+        encontrado = _PATRON_CONDICION.match(parte.strip())
+        if encontrado is None or encontrado['operador'] not in _OPERADORES:
+            continue
+        valor = encontrado['valor'].strip()
+        if len(valor) >= 2 and valor[0] == valor[-1] and valor[0] in '"\'`':
+            valor = valor[1:-1]
+        condiciones.append((encontrado['columna'], _OPERADORES[encontrado['operador']], valor))
+    return tuple(condiciones)
+
+# Forma inmutable de un sort_by de dash_table: ((columna, descendente), ...)
+def clave_orden(sort_by):
+    return tuple((orden['column_id'], orden['direction'] == 'desc') for orden in (sort_by or []))
+
+
+# Tabla indexada en memoria para paginar, ordenar y filtrar del lado del servidor. Al crearla se
+# calcula, para cada columna, el rango entero de cada fila (su posición entre los valores distintos
+# de la columna; el texto, sin acentos ni mayúsculas), así que ordenar por cualquier combinación de
+# columnas es un lexsort sobre enteros y filtrar es una comparación vectorizada. Los órdenes y las
+# máscaras ya calculados se guardan, y cada página solo toma las filas que va a mostrar: el navegador
+# nunca recibe más que una página.
+class TablaIndexada:
+    def __init__(self, tabla):
+        self.tabla = tabla.reset_index(drop=True)
+        self._numericas = {columna for columna in self.tabla.columns if pd.api.types.is_numeric_dtype(self.tabla[columna])}
+        self._textos = {}
+        self._rangos = {}
+        for columna in self.tabla.columns:
+            valores = self.tabla[columna]
+            if columna not in self._numericas:
+                mapa = {valor: _normalizar(valor) for valor in pd.unique(valores.dropna())}
+                valores = valores.astype(object).map(mapa).fillna('')
+                self._textos[columna] = valores.to_numpy(dtype=object)
+            self._rangos[columna] = pd.factorize(valores, sort=True)[0]
+        self._ordenes = {}
+        self._mascaras = {}
+        self._candado = threading.Lock()
+
+    def __len__(self):
+        return len(self.tabla)
+
+    # Posiciones de las filas en el orden pedido; los empates conservan el orden original de la tabla.
+    def orden(self, clave):
+        orden = self._ordenes.get(clave)
+        if orden is None:
+            claves = [np.arange(len(self.tabla))]
+            for columna, descendente in reversed(clave):
+                if columna in self._rangos:
+                    claves.append(-self._rangos[columna] if descendente else self._rangos[columna])
+            orden = np.lexsort(claves)
+            orden.setflags(write=False)
+            with self._candado:
+                if len(self._ordenes) >= _MAXIMO_MEMORIA:
+                    self._ordenes.clear()
+                self._ordenes[clave] = orden
+        return orden
+
+    # Máscara de las filas que cumplen todas las condiciones, o None si no hay condiciones.
+    def mascara(self, condiciones):
+        if not condiciones:
+            return None
+        mascara = self._mascaras.get(condiciones)
+        if mascara is None:
+            mascara = np.ones(len(self.tabla), dtype=bool)
+            for condicion in condiciones:
+                mascara &= self._mascara_condicion(*condicion)
+            mascara.setflags(write=False)
+            with self._candado:
+                if len(self._mascaras) >= _MAXIMO_MEMORIA:
+                    self._mascaras.clear()
+                self._mascaras[condiciones] = mascara
+        return mascara
+
+    def _mascara_condicion(self, columna, operador, valor):
+        if columna not in self._rangos:
+            return np.ones(len(self.tabla), dtype=bool)
+        if columna in self._numericas:
+            datos = self.tabla[columna].to_numpy()
+            try:
+                numero = float(valor)
+            except ValueError:
+                return np.zeros(len(self.tabla), dtype=bool)
+            if operador in ('contains', 'startswith'):
+                operador = '='
+        else:
+            datos = self._textos[columna]
+            numero = _normalizar(valor)
+            if operador == 'contains':
+                return pd.Series(datos).str.contains(numero, regex=False).to_numpy()
+            if operador == 'startswith':
+                return pd.Series(datos).str.startswith(numero).to_numpy()
+        comparaciones = {
+            '=': np.equal, '!=': np.not_equal,
+            '>': np.greater, '>=': np.greater_equal,
+            '<': np.less, '<=': np.less_equal,
+        }
+        return comparaciones[operador](datos, numero)
+
+    # Una página: filas (como registros para dash_table) y número total de páginas.
+    def pagina(self, numero, tamaño, sort_by=None, filter_query=None):
+        orden = self.orden(clave_orden(sort_by))
+        mascara = self.mascara(condiciones_filtro(filter_query))
+        if mascara is not None:
+            orden = orden[mascara[orden]]
+        paginas = max(1, math.ceil(len(orden) / tamaño))
+        numero = min(max(numero or 0, 0), paginas - 1)
+        filas = self.tabla.iloc[orden[numero * tamaño:(numero + 1) * tamaño]]
+        return filas.to_dict('records'), paginas
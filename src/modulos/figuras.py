@@ -0,0 +1,64 @@
+import base64
+import json
+
+import numpy as np
+import plotly.io as pio
+
+# orjson es opcional: si está instalado, serializa varias veces más rápido que el json de la biblioteca estándar
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Motor de serialización de plotly: el más rápido disponible
+MOTOR = 'orjson' if orjson is not None else 'json'
+# Tipos de arreglo tipado que entiende plotly.js, del más chico al más grande
+_TIPOS_ENTEROS = (np.int8, np.int16, np.int32)
+_TIPOS_NATURALES = (np.uint8, np.uint16, np.uint32)
+
+
+# Arreglo numérico de numpy como arreglo tipado de plotly.js ({'dtype', 'bdata'}), con el tipo entero
+# más chico en el que caben sus valores; cualquier otro valor se devuelve igual. Es lo que ya hace
+# go.Figure con sus arreglos, para las figuras que se arman directamente como diccionario.
+def _arreglo_tipado(valor):
+    if not isinstance(valor, np.ndarray) or valor.dtype.kind not in 'iuf' or valor.ndim != 1:
+        return valor
+    if valor.dtype.kind in 'iu' and len(valor):
+        for tipo in (_TIPOS_NATURALES if valor.dtype.kind == 'u' else _TIPOS_ENTEROS):
+            limites = np.iinfo(tipo)
+            if limites.min <= valor.min() and valor.max() <= limites.max:
+                valor = valor.astype(tipo)
+                break
+        else:
+            valor = valor.astype(np.float64)
+    valor = np.ascontiguousarray(valor, dtype=valor.dtype.newbyteorder('<'))
+    return {'dtype': valor.dtype.str[1:], 'bdata': base64.b64encode(valor.tobytes()).decode('ascii')}
+
+# Recorre una figura en forma de diccionario (como las de generar_graficos.FabricaMapa) y codifica sus
+# arreglos numéricos. Las páginas lo aplican antes de poner la figura en un dcc.Graph, porque al
+# serializar la página completa plotly escribe esos arreglos como listas de números.
+def tipar(valor):
+    if isinstance(valor, dict):
+        return {clave: tipar(v) for clave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [tipar(v) for v in valor]
+    return _arreglo_tipado(valor)
+
+
+# Serializa una figura (go.Figure o diccionario) a texto JSON una sola vez. Plotly codifica los
+# arreglos de numpy como arreglos binarios en base64 ({'dtype', 'bdata'}), que el navegador lee
+# directamente como arreglos tipados, en lugar de listas de números en texto.
+def serializar(figura):
+    if isinstance(figura, dict):
+        figura = tipar(figura)
+    return pio.to_json(figura, validate=False, engine=MOTOR)
+
+# Figura (o componente de Dash, como una página completa) ya serializada y vuelta a leer: solo
+# diccionarios, listas, textos y números. Dash la vuelve a codificar en cada respuesta, pero sin
+# recorrer objetos de plotly o de Dash ni convertir arreglos, así que cuesta una fracción de lo que
+# cuesta codificar el original. Es la única memoria de figuras: app.py precodifica cada página una
+# vez por versión de los datos.
+def precodificar(figura):
+    texto = serializar(figura)
+    return orjson.loads(texto) if orjson is not None else json.loads(texto)
@@ -1,12 +1,13 @@
 import plotly.graph_objs as go # Importa objetos gráficos para crear gráficos personalizados
 import plotly.express as px # Importa la interfaz simple para crear gráficos rápidos y fáciles
+import numpy as np # Para armar la matriz de las barras por categorías
+import pandas as pd # Para ubicar las categorías de cada fila
 
 # Crear mapa con el archivo geojson
-def crear_mapa(counties_geojson, locs, valores, textos):
-     # Asignar el id de cada feature en el GeoJSON al código del departamento
-    for loc in counties_geojson['features']:
-        loc['id'] = loc['properties']['DPTO']
-
+# `counties_geojson` puede ser el GeoJSON o la URL de donde el navegador lo descarga; en ambos casos
+# cada departamento se ubica por el `id` de su feature, que se asigna al cargar la geometría
+# (ver geometria.con_ids), así que el GeoJSON no se recorre ni se modifica aquí.
+def crear_mapa(counties_geojson, locs, valores, textos, zoom=3.4, featureidkey='id'):
     # Definiendo la escala de colores
     escala_personalizada = [
         [0, "#c6e2ff"],    
@@ -18,7 +19,8 @@ def crear_mapa(counties_geojson, locs, valores, textos):
 
     # Crear el mapa coroplético con Plotly usando Mapbox
     fig_mapa = go.Figure(go.Choroplethmapbox(
-        geojson=counties_geojson, # geometría de los departamentos
+        geojson=counties_geojson, # geometría de los departamentos (o su URL)
+        featureidkey=featureidkey, # propiedad de cada feature que se compara con locations
         locations=locs, # códigos de departamentos para ubicar los datos
         z=valores,   # valores numéricos para colorear (ej. total muertes)
         colorscale=escala_personalizada, # escala de colores definida arriba
@@ -30,12 +32,26 @@ def crear_mapa(counties_geojson, locs, valores, textos):
     # Configurar estilo y posición del mapa
     fig_mapa.update_layout(
         mapbox_style="carto-positron", # estilo visual del mapa base
-        mapbox_zoom=3.4,  # nivel de zoom inicial
+        mapbox_zoom=zoom,  # nivel de zoom inicial
         mapbox_center={"lat": 4.570868, "lon": -74.2973328},  # centro del mapa (Colombia)
         margin=dict(l=20, r=20, t=20, b=20) # márgenes alrededor del gráfico
     )
     return fig_mapa
 
+# Fábrica de mapas para una geometría y un zoom fijos. La figura (geometría, escala de colores, estilo
+# y diseño) se arma y valida una sola vez; cada mapa nuevo, por ejemplo para otra combinación de
+# filtros, solo cambia los arreglos de ubicaciones, valores y textos sobre esa plantilla y se entrega
+# como diccionario, que dcc.Graph acepta igual que una figura, sin volver a validar nada.
+class FabricaMapa:
+    def __init__(self, counties_geojson, zoom=3.4, featureidkey='id'):
+        plantilla = crear_mapa(counties_geojson, [], [], [], zoom=zoom, featureidkey=featureidkey)
+        self._traza = plantilla.data[0].to_plotly_json()
+        self._layout = plantilla.layout.to_plotly_json()
+
+    def mapa(self, locs, valores, textos):
+        traza = dict(self._traza, locations=np.asarray(locs), z=np.asarray(valores), text=np.asarray(textos))
+        return {'data': [traza], 'layout': self._layout}
+
 # Crear grafico de lineas
 def grafico_linea_muertes_mensuales(df_mensual):
     # Crear un gráfico de línea con Plotly Express
@@ -81,14 +97,14 @@ def grafico_barras_ciudades_mas_violentas(df_homicidios):
     return fig_barras
 
 # Crear grafico circular
-def grafico_circular_ciudades_menos_mortalidad(df_homicidios):
-    # Ordenar y tomar top 10 ciudades con menos homicidios
-    ciudades_menos_mortalidad = df_homicidios.sort_values('TOTAL_HOMICIDIOS', ascending=True).head(10)
+# Recibe las ciudades ya elegidas y en orden (ver procesar_datos.ciudades_menos_mortalidad); `valor_col`
+# es la columna que da el tamaño de cada porción (el conteo, o la tasa si se eligieron por tasa).
+def grafico_circular_ciudades_menos_mortalidad(df_homicidios, valor_col='TOTAL_HOMICIDIOS'):
     # Crear gráfico circular (pie chart)
     fig_circular = px.pie(
-        ciudades_menos_mortalidad,
+        df_homicidios,
         names='MUNICIPIO',
-        values='TOTAL_HOMICIDIOS',
+        values=valor_col,
         hole=0, 
     )
     # Configurar texto dentro del gráfico
@@ -127,7 +143,7 @@ def grafico_tabla_causas_muerte(df_causas):
                 df_causas['DESCRIPCION'], # descripción textual
                 df_causas['TOTAL_CASOS'] # total de casos
             ],
-            fill_color=[['#f5f8ff', '#e9f0ff'] * 5],  # colores alternados para filas
+            fill_color=[['#f5f8ff', '#e9f0ff'] * (len(df_causas) // 2) + ['#f5f8ff'] * (len(df_causas) % 2)],  # colores alternados para filas
             font=dict(family='Work Sans, sans-serif', size=13, color='#222'),  # formato texto celdas
             align='center', # centrar texto en celdas
             height=45, # altura de fila datos
@@ -159,32 +175,56 @@ def grafico_histograma_edad(conteo_edad):
     )
     return fig_histograma
 
+# Matriz densa [categoría del eje x, serie] con la suma de `valor_col` de cada par, armada en una sola
+# pasada: cada fila del formato largo se ubica por su posición en las dos listas de categorías, y los
+# pares sin filas quedan en cero. Por defecto el eje x va en orden ascendente y las series en el orden
+# en que aparecen; las categorías que no están en un orden dado se descartan, igual que las filas sin
+# categoría (NaN, como el departamento de un código que no está en la DIVIPOLA).
+def _matriz_categorias(df, x_col, serie_col, valor_col, orden_x=None, orden_series=None):
+    categorias_x = pd.Index(df[x_col].dropna().unique()).sort_values() if orden_x is None else pd.Index(orden_x)
+    series = pd.Index(df[serie_col].dropna().unique() if orden_series is None else orden_series)
+    filas = categorias_x.get_indexer(df[x_col])
+    columnas = series.get_indexer(df[serie_col])
+    validas = (filas >= 0) & (columnas >= 0)
+    valores = df[valor_col].to_numpy()
+    matriz = np.zeros((len(categorias_x), len(series)), dtype=valores.dtype)
+    np.add.at(matriz, (filas[validas], columnas[validas]), valores[validas])
+    return categorias_x, series, matriz
+
+# Crear grafico de barras apiladas o agrupadas para cualquier desglose en dos dimensiones (departamento
+# x sexo, mes x grupo de edad, municipio x capítulo de causa...) a partir de un DataFrame en formato
+# largo. Se pivota una sola vez a una matriz y cada serie es una columna de ella.
+def grafico_barras_categorias(df, x_col, serie_col, valor_col, orden_x=None, orden_series=None,
+                              barmode='stack', xaxis_title=None, yaxis_title=None):
+    categorias_x, series, matriz = _matriz_categorias(df, x_col, serie_col, valor_col, orden_x, orden_series)
+    fig_barras = go.Figure([
+        go.Bar(x=categorias_x.to_numpy(), y=matriz[:, posicion], name=str(serie))
+        for posicion, serie in enumerate(series)
+    ])
+    fig_barras.update_layout(
+        barmode=barmode,
+        xaxis_title=xaxis_title or x_col,
+        yaxis_title=yaxis_title or valor_col
+    )
+    return fig_barras
+
 # Crear grafico barras apiladas
 def grafico_barras_apiladas_sexo_departamento(conteo_df, depto_col='DEPARTAMENTO', sexo_col='SEXO', valor_col='TOTAL_MUERTES'):
-     # Obtener lista ordenada de departamentos y los sexos únicos
-    departamentos = sorted(conteo_df[depto_col].unique())
-    sexos = conteo_df[sexo_col].unique()
-
-    fig_barras_apiladas = go.Figure()
-    # Para cada sexo, agregar una serie de barras con el conteo por departamento
-    for sexo in sexos:
-        valores = []
-        for depto in departamentos:
-            fila = conteo_df[(conteo_df[depto_col] == depto) & (conteo_df[sexo_col] == sexo)]
-            if not fila.empty:
-                valores.append(fila[valor_col].values[0])
-            else:
-                valores.append(0)  # Si no hay datos, agregar 0 para esa categoría
-        fig_barras_apiladas.add_trace(go.Bar(
-            x=departamentos,
-            y=valores,
-            name=str(sexo)
-        ))
-    # Configurar gráfico para que las barras estén apiladas
-    fig_barras_apiladas.update_layout(
+    # Departamentos en orden alfabético y una serie por sexo, apiladas
+    return grafico_barras_categorias(
+        conteo_df, depto_col, sexo_col, valor_col,
         barmode='stack',
         xaxis_title='Departamento',
         yaxis_title='Número de Muertes'
     )
 
-    return fig_barras_apiladas
\ No newline at end of file
+
+# Arma y descarta una figura mínima de cada tipo que usa el dashboard. plotly carga sus validadores la
+# primera vez que se usa cada tipo de traza; hecho en el maestro de gunicorn antes del fork, esos
+# módulos quedan compartidos por los workers en lugar de cargarse en cada uno con su primera página.
+def precargar_plotly():
+    df = pd.DataFrame({'x': [1], 'y': [1]})
+    for figura in (px.line(df, x='x', y='y'), px.bar(df, x='x', y='y'), px.pie(df, names='x', values='y'),
+                   go.Figure([go.Table(), go.Bar()])):
+        figura.update_layout(title='')
+        figura.to_plotly_json()
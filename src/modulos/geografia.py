@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+from unidecode import unidecode
+
+from src.modulos import esquemas
+
+
+# Identificador de los códigos DANE o departamentales que no están en la DIVIPOLA
+SIN_UBICACION = -1
+# Mayor código DANE posible según el esquema; dimensiona las tablas de búsqueda
+_MAXIMO_COD_DANE = esquemas.DIVIPOLA['reglas']['COD_DANE']['rango'][1]
+_MAXIMO_COD_DEPARTAMENTO = esquemas.DIVIPOLA['reglas']['COD_DEPARTAMENTO']['rango'][1]
+
+
+# Sin acentos y en mayúsculas, calculado una vez por nombre distinto.
+def _normalizar(serie):
+    mapa = {valor: unidecode(str(valor)).strip().upper() for valor in pd.unique(serie.dropna())}
+    return serie.map(mapa).astype(object)
+
+
+# Dimensión geográfica construida una vez a partir de la DIVIPOLA. Municipios y departamentos
+# reciben un identificador entero (su posición por código) y las tablas densas `municipio_de` y
+# `departamento_de`, indexadas directamente por COD_DANE y COD_DEPARTAMENTO, traducen los códigos
+# del registro sin ningún merge. Los nombres ya normalizados están en `municipios` y `departamentos`
+# y solo se pegan a las pocas filas que se muestran; los municipios se agrupan por identificador,
+# así que dos municipios con el mismo nombre (como los varios BOLIVAR) siguen siendo distintos.
+class Geografia:
+    def __init__(self, df_division):
+        division = df_division.drop_duplicates('COD_DANE').sort_values('COD_DANE')
+
+        # Departamentos: el nombre más frecuente entre sus municipios
+        nombres = _normalizar(division['DEPARTAMENTO'])
+        frecuentes = (
+            pd.DataFrame({'COD_DEPARTAMENTO': division['COD_DEPARTAMENTO'].to_numpy(dtype=np.int64), 'DEPARTAMENTO': nombres.to_numpy()})
+            .value_counts()
+            .reset_index()
+            .sort_values(['COD_DEPARTAMENTO', 'count', 'DEPARTAMENTO'], ascending=[True, False, True])
+            .drop_duplicates('COD_DEPARTAMENTO')
+        )
+        self.departamentos = pd.DataFrame({
+            'COD_DEPARTAMENTO': frecuentes['COD_DEPARTAMENTO'].to_numpy(),
+            'CODIGO': [f'{codigo:02d}' for codigo in frecuentes['COD_DEPARTAMENTO']],
+            'DEPARTAMENTO': frecuentes['DEPARTAMENTO'].to_numpy(),
+        }).rename_axis('ID_DEPARTAMENTO')
+        self.departamento_de = np.full(_MAXIMO_COD_DEPARTAMENTO + 1, SIN_UBICACION, dtype=np.int32)
+        self.departamento_de[self.departamentos['COD_DEPARTAMENTO'].to_numpy()] = np.arange(len(self.departamentos))
+
+        # Municipios; la etiqueta agrega el departamento cuando el nombre se repite en otro departamento
+        municipios = pd.DataFrame({
+            'COD_DANE': division['COD_DANE'].to_numpy(dtype=np.int64),
+            'MUNICIPIO': _normalizar(division['MUNICIPIO']).to_numpy(),
+            'ID_DEPARTAMENTO': self.departamento_de[division['COD_DEPARTAMENTO'].to_numpy(dtype=np.int64)],
+        })
+        repetidos = municipios['MUNICIPIO'].duplicated(keep=False).to_numpy()
+        nombre_departamento = self.departamentos['DEPARTAMENTO'].to_numpy()[municipios['ID_DEPARTAMENTO'].to_numpy()]
+        municipios['ETIQUETA'] = np.where(repetidos, municipios['MUNICIPIO'] + ' (' + nombre_departamento + ')', municipios['MUNICIPIO'])
+        self.municipios = municipios.rename_axis('ID_MUNICIPIO')
+        self.municipio_de = np.full(_MAXIMO_COD_DANE + 1, SIN_UBICACION, dtype=np.int32)
+        self.municipio_de[municipios['COD_DANE'].to_numpy()] = np.arange(len(municipios))
+
+    # Identificador de municipio de cada COD_DANE (SIN_UBICACION si no está en la DIVIPOLA).
+    def ids_municipio(self, cod_dane):
+        return _buscar(self.municipio_de, cod_dane)
+
+    # Identificador de departamento de cada COD_DEPARTAMENTO (SIN_UBICACION si no está en la DIVIPOLA).
+    def ids_departamento(self, cod_departamento):
+        return _buscar(self.departamento_de, cod_departamento)
+
+
+# Índice en una tabla densa; los códigos fuera de la tabla dan SIN_UBICACION.
+def _buscar(tabla, codigos):
+    codigos = np.asarray(codigos, dtype=np.int64)
+    dentro = (codigos >= 0) & (codigos < len(tabla))
+    return np.where(dentro, tabla[np.where(dentro, codigos, 0)], SIN_UBICACION)
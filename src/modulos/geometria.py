@@ -0,0 +1,240 @@
+import hashlib
+import json
+import math
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from src.modulos import almacen_columnar
+
+
+# Paso de la grilla (en grados, ~1 m) a la que se ajustan todas las coordenadas antes de simplificar.
+# Los bordes compartidos entre departamentos no coinciden exactamente en el archivo original; al
+# cuantizarlos quedan con los mismos vértices y se pueden simplificar una sola vez para ambos lados.
+PASO_GRILLA = 1e-5
+# Niveles de zoom para los que se genera una variante simplificada
+ZOOMS = (4, 6, 8, 10)
+# Propiedades de cada departamento que se conservan en las variantes
+PROPIEDADES = ('DPTO', 'NOMBRE_DPT')
+# Propiedad que se copia al `id` de cada feature: el código del departamento, con el que el mapa
+# ubica los valores sin que nadie tenga que recorrer las features al dibujarlo
+PROPIEDAD_ID = 'DPTO'
+# Versión del algoritmo; al cambiarla se regeneran las variantes guardadas
+VERSION_GEOMETRIA = 2
+
+
+# Tolerancia de simplificación para un zoom: medio píxel de una tesela de 512 px en el ecuador, en grados.
+def tolerancia_zoom(zoom):
+    return 360 / (512 * 2 ** zoom) / 2
+
+# Decimales necesarios para que el redondeo de la salida quede muy por debajo de la tolerancia.
+def decimales_zoom(zoom):
+    return min(5, max(1, math.ceil(-math.log10(tolerancia_zoom(zoom) / 10))))
+
+# Variante que corresponde a un zoom: la menos detallada que sigue siendo fiel a ese zoom.
+def zoom_variante(zoom):
+    for nivel in ZOOMS:
+        if zoom <= nivel:
+            return nivel
+    return ZOOMS[-1]
+
+# Polígonos de una geometría como lista de listas de anillos, sea Polygon o MultiPolygon.
+def _poligonos(geometria):
+    if geometria['type'] == 'Polygon':
+        return [geometria['coordinates']]
+    return geometria['coordinates']
+
+# Anillo en coordenadas enteras de la grilla, sin vértices consecutivos repetidos y cerrado.
+def _cuantizar_anillo(anillo):
+    puntos = np.rint(np.asarray(anillo, dtype=float) / PASO_GRILLA).astype(np.int64)
+    distintos = np.ones(len(puntos), dtype=bool)
+    distintos[1:] = np.any(puntos[1:] != puntos[:-1], axis=1)
+    puntos = puntos[distintos]
+    if len(puntos) > 1 and np.array_equal(puntos[0], puntos[-1]):
+        puntos = puntos[:-1]
+    return [tuple(p) for p in puntos.tolist()]
+
+# Vértices donde se encuentran tres o más regiones, o donde un borde deja de ser compartido: en
+# ellos se cortan los anillos en arcos. Un vértice lo es si sus vecinos no son los mismos en
+# todos los anillos que lo contienen.
+def _uniones(anillos):
+    vecinos = {}
+    uniones = set()
+    for anillo in anillos:
+        n = len(anillo)
+        for i, punto in enumerate(anillo):
+            par = frozenset((anillo[i - 1], anillo[(i + 1) % n]))
+            anterior = vecinos.setdefault(punto, par)
+            if anterior != par:
+                uniones.add(punto)
+    return uniones
+
+# Douglas-Peucker sobre un arco abierto; devuelve la máscara de vértices que se conservan.
+# Los extremos siempre se conservan.
+def _douglas_peucker(puntos, tolerancia):
+    conservar = np.zeros(len(puntos), dtype=bool)
+    conservar[0] = conservar[-1] = True
+    pendientes = [(0, len(puntos) - 1)]
+    while pendientes:
+        inicio, fin = pendientes.pop()
+        if fin - inicio < 2:
+            continue
+        a, b = puntos[inicio], puntos[fin]
+        intermedios = puntos[inicio + 1:fin]
+        direccion = b - a
+        largo = math.hypot(*direccion)
+        if largo == 0:
+            distancias = np.hypot(*(intermedios - a).T)
+        else:
+            distancias = np.abs(direccion[0] * (intermedios[:, 1] - a[1]) - direccion[1] * (intermedios[:, 0] - a[0])) / largo
+        mayor = int(np.argmax(distancias))
+        if distancias[mayor] > tolerancia:
+            medio = inicio + 1 + mayor
+            conservar[medio] = True
+            pendientes.append((inicio, medio))
+            pendientes.append((medio, fin))
+    return conservar
+
+# Simplifica un arco recorriéndolo siempre en el mismo sentido, para que los dos departamentos que
+# lo comparten obtengan exactamente los mismos vértices. Guarda el resultado en `memoria`.
+def _simplificar_arco(arco, tolerancia, memoria):
+    inverso = arco[::-1]
+    canonico = min(tuple(arco), tuple(inverso))
+    if canonico not in memoria:
+        puntos = np.array(canonico, dtype=float)
+        memoria[canonico] = [canonico[i] for i in np.flatnonzero(_douglas_peucker(puntos, tolerancia / PASO_GRILLA))]
+    simplificado = memoria[canonico]
+    return simplificado if canonico == tuple(arco) else simplificado[::-1]
+
+# Simplifica un anillo cuantizado: lo corta en arcos en sus uniones y simplifica cada arco.
+# Un anillo sin uniones (una isla, o un enclave cuyo borde entero es compartido) se rota y orienta
+# de forma canónica y se parte en su vértice más lejano al inicio.
+def _simplificar_anillo(anillo, uniones, tolerancia, memoria):
+    cortes = [i for i, punto in enumerate(anillo) if punto in uniones]
+    if not cortes:
+        inicio = anillo.index(min(anillo))
+        anillo = anillo[inicio:] + anillo[:inicio]
+        invertido = anillo[1] > anillo[-1]
+        if invertido:
+            anillo = anillo[:1] + anillo[:0:-1]
+        puntos = np.array(anillo, dtype=float)
+        lejano = int(np.argmax(np.hypot(*(puntos - puntos[0]).T)))
+        cortes = [0, lejano] if lejano else [0]
+    resultado = []
+    for k, inicio in enumerate(cortes):
+        fin = cortes[k + 1] if k + 1 < len(cortes) else cortes[0] + len(anillo)
+        arco = (anillo + anillo)[inicio:fin + 1]
+        resultado.extend(_simplificar_arco(arco, tolerancia, memoria)[:-1])
+    return resultado
+
+# Pasa un anillo simplificado de la grilla a grados con los decimales de la variante y lo cierra.
+# Devuelve None si el anillo colapsó a menos de tres vértices distintos.
+def _a_coordenadas(anillo, decimales):
+    coordenadas = []
+    for x, y in anillo:
+        punto = [round(x * PASO_GRILLA, decimales), round(y * PASO_GRILLA, decimales)]
+        if not coordenadas or punto != coordenadas[-1]:
+            coordenadas.append(punto)
+    while len(coordenadas) > 1 and coordenadas[-1] == coordenadas[0]:
+        coordenadas.pop()
+    if len(coordenadas) < 3:
+        return None
+    return coordenadas + [coordenadas[0]]
+
+# Genera la variante de un zoom. Los polígonos que colapsan al simplificar se descartan; si a un
+# departamento no le queda ninguno, conserva su anillo exterior más grande sin simplificar.
+def _variante(features, uniones, zoom):
+    tolerancia = tolerancia_zoom(zoom)
+    decimales = decimales_zoom(zoom)
+    memoria = {}
+    resultado = []
+    for propiedades, poligonos in features:
+        salida = []
+        for poligono in poligonos:
+            exterior = _a_coordenadas(_simplificar_anillo(poligono[0], uniones, tolerancia, memoria), decimales)
+            if exterior is None:
+                continue
+            huecos = [_a_coordenadas(_simplificar_anillo(hueco, uniones, tolerancia, memoria), decimales) for hueco in poligono[1:]]
+            salida.append([exterior] + [hueco for hueco in huecos if hueco is not None])
+        if not salida:
+            mayor = max((poligono[0] for poligono in poligonos), key=len)
+            salida.append([_a_coordenadas(mayor, 5)])
+        geometria = {'type': 'Polygon', 'coordinates': salida[0]} if len(salida) == 1 else {'type': 'MultiPolygon', 'coordinates': salida}
+        resultado.append({'type': 'Feature', 'id': propiedades.get(PROPIEDAD_ID), 'properties': propiedades, 'geometry': geometria})
+    return {'type': 'FeatureCollection', 'features': resultado}
+
+# GeoJSON con el `id` de cada feature tomado de PROPIEDAD_ID. Se hace una vez al cargar la geometría;
+# devuelve features nuevas y deja intacto el GeoJSON recibido.
+def con_ids(geojson):
+    features = [dict(feature, id=feature['properties'].get(PROPIEDAD_ID)) for feature in geojson['features']]
+    return dict(geojson, features=features)
+
+# Genera las variantes simplificadas de un GeoJSON, una por zoom de ZOOMS. Todas parten de la misma
+# cuantización y de los mismos arcos, así que los bordes compartidos siguen coincidiendo.
+def generar_variantes(geojson, zooms=ZOOMS):
+    features = []
+    for feature in geojson['features']:
+        propiedades = {clave: feature['properties'][clave] for clave in PROPIEDADES if clave in feature['properties']}
+        poligonos = [[_cuantizar_anillo(anillo) for anillo in poligono] for poligono in _poligonos(feature['geometry'])]
+        poligonos = [[anillo for anillo in poligono if len(anillo) >= 3] for poligono in poligonos]
+        features.append((propiedades, [poligono for poligono in poligonos if poligono]))
+    uniones = _uniones(anillo for _, poligonos in features for poligono in poligonos for anillo in poligono)
+    return {zoom: _variante(features, uniones, zoom) for zoom in zooms}
+
+# Escribe un archivo de forma atómica, para que otro proceso nunca lea una variante a medio escribir.
+def _escribir_atomico(ruta, texto):
+    descriptor, temporal = tempfile.mkstemp(prefix=f'.{ruta.name}-', dir=ruta.parent)
+    with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+        f.write(texto)
+    os.replace(temporal, ruta)
+
+# Archivo de la variante de un zoom en `directorio_cache`, nombrado con la huella del archivo fuente
+# y de los parámetros de simplificación, y esa huella.
+def _destino(ruta, directorio_cache, zoom):
+    firma = hashlib.sha256(repr((VERSION_GEOMETRIA, PASO_GRILLA, ZOOMS, PROPIEDADES, PROPIEDAD_ID)).encode('utf-8')).hexdigest()
+    huella = almacen_columnar.huella_archivo(ruta, firma)[:16]
+    return directorio_cache / f'{ruta.stem}-{huella}-z{zoom_variante(zoom)}.json', huella
+
+# Guarda las variantes de `ruta` en `directorio_cache` y borra las de versiones anteriores.
+def _guardar_variantes(variantes, ruta, directorio_cache, huella):
+    directorio_cache.mkdir(parents=True, exist_ok=True)
+    for z, variante in variantes.items():
+        _escribir_atomico(directorio_cache / f'{ruta.stem}-{huella}-z{z}.json', json.dumps(variante, separators=(',', ':')))
+    for anterior in directorio_cache.glob(f'{ruta.stem}-*-z*.json'):
+        if huella not in anterior.name:
+            anterior.unlink(missing_ok=True)
+
+def _generar(ruta):
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return generar_variantes(json.load(f))
+
+# Devuelve la variante del GeoJSON `ruta` para el zoom indicado, leyéndola de `directorio_cache`.
+# Si no existe o el archivo fuente cambió, genera todas las variantes, las guarda y borra las anteriores.
+def cargar_variante(ruta, directorio_cache, zoom):
+    ruta = Path(ruta)
+    directorio_cache = Path(directorio_cache)
+    destino, huella = _destino(ruta, directorio_cache, zoom)
+    try:
+        with open(destino, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    variantes = _generar(ruta)
+    try:
+        _guardar_variantes(variantes, ruta, directorio_cache, huella)
+    except OSError:
+        pass
+    return variantes[zoom_variante(zoom)]
+
+# Ruta del archivo de la variante de un zoom, generándola si hace falta; para servirla tal cual
+# (ver estaticos.py). A diferencia de cargar_variante, falla con OSError si no se puede guardar.
+def ruta_variante(ruta, directorio_cache, zoom):
+    ruta = Path(ruta)
+    directorio_cache = Path(directorio_cache)
+    destino, huella = _destino(ruta, directorio_cache, zoom)
+    if not destino.exists():
+        _guardar_variantes(_generar(ruta), ruta, directorio_cache, huella)
+    return destino
@@ -0,0 +1,106 @@
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.modulos import esquemas
+
+
+# Tamaño aproximado de cada rango de bytes; hay más rangos que procesos para repartir bien la carga
+# y para que cada proceso tenga en memoria solo un rango crudo a la vez.
+TAMAÑO_RANGO = 32 * 1024 * 1024
+# Por debajo de este tamaño el costo de arrancar los procesos no compensa y se lee en un solo proceso
+UMBRAL_PARALELO = 64 * 1024 * 1024
+# Procesos para la lectura en paralelo; PROCESOS_INGESTA=1 la desactiva
+PROCESOS = int(os.environ.get('PROCESOS_INGESTA', os.cpu_count() or 1))
+
+
+# Divide el archivo en rangos [inicio, fin) que empiezan y terminan en un salto de línea.
+# Supone, como en los archivos del DANE, que ningún campo entre comillas contiene saltos de línea.
+def dividir_en_rangos(ruta, tamaño_rango=TAMAÑO_RANGO):
+    tamaño = os.path.getsize(ruta)
+    with open(ruta, 'rb') as f:
+        encabezado = f.readline()
+        rangos = []
+        inicio = f.tell()
+        while inicio < tamaño:
+            f.seek(min(inicio + tamaño_rango, tamaño))
+            f.readline()
+            fin = min(f.tell(), tamaño)
+            rangos.append((inicio, fin))
+            inicio = fin
+    return encabezado, rangos
+
+# Trabajo de cada proceso: lee su rango, lo interpreta con el esquema y lo valida. Devuelve solo
+# arreglos compactos por columna (códigos y categorías para las categóricas) en vez de un DataFrame.
+def _parsear_rango(ruta, inicio, fin, encabezado, esquema):
+    with open(ruta, 'rb') as f:
+        f.seek(inicio)
+        datos = f.read(fin - inicio)
+    columnas = esquema['columnas']
+    df = pd.read_csv(
+        io.BytesIO(encabezado + datos),
+        encoding=esquema['codificacion'],
+        usecols=list(columnas),
+        dtype=columnas,
+    )
+    esquemas.validar(df, esquema)
+    partes = {}
+    for nombre in df.columns:
+        serie = df[nombre]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            partes[nombre] = (serie.cat.codes.to_numpy(), serie.cat.categories.to_numpy())
+        else:
+            partes[nombre] = (serie.to_numpy(), None)
+    return partes
+
+# Une las categóricas de todos los rangos: arma la unión de categorías y traduce los códigos de cada parte.
+def _unir_categoricas(partes):
+    union = pd.Index(np.concatenate([categorias for _, categorias in partes])).unique().sort_values()
+    tipo = np.int8 if len(union) < 2 ** 7 else np.int16 if len(union) < 2 ** 15 else np.int32
+    codigos = np.empty(sum(len(c) for c, _ in partes), dtype=tipo)
+    posicion = 0
+    for codigos_parte, categorias in partes:
+        traductor = np.append(union.get_indexer(categorias), -1).astype(tipo)
+        # El código -1 (faltante) toma el último elemento del traductor, que también es -1
+        codigos[posicion:posicion + len(codigos_parte)] = traductor[codigos_parte]
+        posicion += len(codigos_parte)
+    return pd.Categorical.from_codes(codigos, categories=union)
+
+# Lee un CSV repartiendo sus rangos de bytes entre varios procesos. Cada columna se arma con una
+# sola concatenación de los arreglos que devuelve cada proceso.
+def leer_csv_paralelo(ruta, esquema, procesos=PROCESOS, tamaño_rango=TAMAÑO_RANGO):
+    encabezado, rangos = dividir_en_rangos(ruta, tamaño_rango)
+    if not rangos:
+        return esquemas.leer_csv(ruta, esquema)
+    # spawn y no fork: el proceso web puede tener hilos (refresco, calentamiento) al momento de leer
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(procesos, len(rangos)), mp_context=contexto) as ejecutor:
+        resultados = list(ejecutor.map(
+            _parsear_rango,
+            *zip(*[(ruta, inicio, fin, encabezado, esquema) for inicio, fin in rangos]),
+        ))
+
+    datos = {}
+    for nombre in resultados[0]:
+        partes = [resultado[nombre] for resultado in resultados]
+        if partes[0][1] is not None:
+            datos[nombre] = _unir_categoricas(partes)
+        else:
+            datos[nombre] = np.concatenate([valores for valores, _ in partes])
+    df = pd.DataFrame(datos, copy=False)
+    if 'renombrar' in esquema:
+        df = df.rename(columns=esquema['renombrar'])
+    return df
+
+# Lee el CSV en paralelo cuando es grande, sin comprimir, sin preámbulo y hay más de un proceso;
+# en cualquier otro caso lo lee con esquemas.leer_csv.
+def leer_csv(ruta, esquema):
+    if (PROCESOS > 1 and Path(ruta).suffix == '.csv' and not esquema.get('filas_preambulo')
+            and os.path.getsize(ruta) >= UMBRAL_PARALELO):
+        return leer_csv_paralelo(ruta, esquema)
+    return esquemas.leer_csv(ruta, esquema)
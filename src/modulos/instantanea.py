@@ -0,0 +1,43 @@
+from collections.abc import Mapping
+
+import pandas as pd
+
+
+# Copy-on-write de pandas: un DataFrame derivado de otro (un filtro, un assign, un copy(deep=False))
+# comparte los arreglos con el original hasta que alguno de los dos se modifica, y en ese momento se
+# copia solo lo que cambió. Así ninguna operación sobre un resultado puede escribir en los datos
+# compartidos, y compartirlos no cuesta ninguna copia. procesar_datos lo activa también, porque
+# filtrar_año depende de él aunque se use sin instantánea.
+pd.set_option('mode.copy_on_write', True)
+
+
+# Instantánea de solo lectura de los datos de una versión. Se consulta como un diccionario, pero no
+# admite asignaciones, y cada DataFrame se entrega como una copia superficial: con copy-on-write no
+# copia datos, y si quien la recibe la modifica (agrega columnas, asigna valores) solo cambia su
+# copia. Varios hilos pueden leer la misma instantánea sin candados y el resultado de cada función
+# no depende del orden en que se llamen. Los valores se toman de `fuente`, que puede ser un dict o
+# un paginas.Perezosos para que cada tabla se siga construyendo recién cuando se pide.
+class Instantanea(Mapping):
+    def __init__(self, fuente):
+        object.__setattr__(self, '_fuente', fuente)
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("La instantánea de datos es de solo lectura")
+
+    def __delattr__(self, nombre):
+        raise AttributeError("La instantánea de datos es de solo lectura")
+
+    def __getitem__(self, clave):
+        valor = self._fuente[clave]
+        if isinstance(valor, (pd.DataFrame, pd.Series)):
+            return valor.copy(deep=False)
+        return valor
+
+    def __contains__(self, clave):
+        return clave in self._fuente
+
+    def __iter__(self):
+        return iter(self._fuente)
+
+    def __len__(self):
+        return sum(1 for _ in self._fuente)
@@ -0,0 +1,59 @@
+import logging
+import os
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+# Conjunto de valores que se calculan bajo demanda: cada clave se construye la primera vez que se
+# pide, protegida por su propio candado, y luego se reutiliza. Sirve tanto para los datos que
+# comparten las páginas como para las páginas mismas.
+class Perezosos:
+    # `constructores` es {clave: función(contexto)}; el contexto por defecto es este mismo conjunto,
+    # de modo que un valor puede pedir otros valores del conjunto.
+    def __init__(self, constructores, contexto=None):
+        self._constructores = dict(constructores)
+        self.contexto = self if contexto is None else contexto
+        self._valores = {}
+        self._candados = {clave: threading.Lock() for clave in self._constructores}
+        self._pid_calentamiento = None
+        self._candado_calentamiento = threading.Lock()
+
+    def __contains__(self, clave):
+        return clave in self._constructores
+
+    def __iter__(self):
+        return iter(self._constructores)
+
+    # Devuelve el valor de la clave, construyéndolo si es la primera vez. Dos peticiones simultáneas
+    # por la misma clave la construyen una sola vez; claves distintas se construyen en paralelo.
+    def __getitem__(self, clave):
+        try:
+            return self._valores[clave]
+        except KeyError:
+            pass
+        with self._candados[clave]:
+            if clave not in self._valores:
+                self._valores[clave] = self._constructores[clave](self.contexto)
+            return self._valores[clave]
+
+    # Construye todas las claves que aún no estén listas.
+    def calentar(self):
+        for clave in self._constructores:
+            self[clave]
+
+    # Lanza una sola vez por proceso un hilo que construye el resto de las claves en segundo plano.
+    def calentar_en_segundo_plano(self):
+        if self._pid_calentamiento == os.getpid():
+            return
+        with self._candado_calentamiento:
+            if self._pid_calentamiento != os.getpid():
+                self._pid_calentamiento = os.getpid()
+                threading.Thread(target=self._calentar_registrando, name='calentar-paginas', daemon=True).start()
+
+    def _calentar_registrando(self):
+        try:
+            self.calentar()
+        except Exception:
+            logger.exception("Falló el calentamiento en segundo plano")
@@ -1,180 +1,152 @@
 from unidecode import unidecode # Para normalizar texto eliminando acentos y caracteres especiales
 import pandas as pd  # Biblioteca principal para manipulación de datos en DataFrames
 import calendar  # Para obtener nombres de meses y funciones relacionadas con fechas
+import numpy as np  # Para traducir identificadores con índices de arreglo
 
-# Normaliza una columna convirtiendo sus valores a texto, sin espacios y en mayúsculas.
-def normalizar_codigo_columna(df, columna):
-    df[columna] = df[columna].astype(str).str.strip().str.upper()
-    return df
+from src.modulos import causas, edades, ranking
 
-#Renombra columnas para los códigos y descripciones estandarizados.
-def renombrar_columnas_codigos(df_codigos):
-    return df_codigos.rename(columns={
-        'Codigo de la CIE-10 cuatro caracteres': 'COD_MUERTE',
-        'Descripcion  de codigos mortalidad a cuatro caracteres': 'DESCRIPCION'
-    })
+# filtrar_año comparte los arreglos del original; con copy-on-write modificar el resultado nunca lo toca
+pd.set_option('mode.copy_on_write', True)
 
-#Filtra filas donde la longitud del código en la columna sea mayor o igual a min_len.
-def filtrar_codigos_min_length(df, columna, min_len=4):
-    return df[df[columna].str.len() >= min_len]
+# Grupo de causas (ver causas.GRUPOS_CAUSAS) de los códigos de muerte considerados homicidios
+GRUPO_HOMICIDIO = 'homicidios'
 
 #Filtra filas por año
 def filtrar_año(df, año):
-    return df[df['AÑO'] == año].copy()
-
-# Agrupa y cuenta el total de muertes por departamento, normalizando el código departamental.
-def agrupar_muertes_por_departamento(df):
-    muertes = (
-        df
-        .groupby('COD_DEPARTAMENTO')
-        .size()
-        .reset_index(name='TotalMuertes')
-    )
-    muertes['COD_DEPARTAMENTO'] = muertes['COD_DEPARTAMENTO'].astype(int).astype(str).str.zfill(2)
-    return muertes
-
-# Obtiene una lista única de departamentos usando el nombre más frecuente por código departamental.
-def obtener_departamentos_mas_frecuentes(df_division):
-    frecuencias = (
-        df_division
-        .groupby(['COD_DEPARTAMENTO', 'DEPARTAMENTO'])
-        .size()
-        .reset_index(name='Frecuencia')
-        .sort_values(['COD_DEPARTAMENTO', 'Frecuencia'], ascending=[True, False])
-    )
-    vista = (
-        frecuencias
-        .drop_duplicates(subset='COD_DEPARTAMENTO', keep='first')
-        .drop(columns='Frecuencia')
-        .sort_values('COD_DEPARTAMENTO')
-    )
-    vista['DEPARTAMENTO'] = vista['DEPARTAMENTO'].apply(unidecode).str.upper()
-    vista['COD_DEPARTAMENTO'] = vista['COD_DEPARTAMENTO'].astype(int).astype(str).str.zfill(2)
-    return vista
-
-# Une los datos de muertes con los nombres de departamentos usando el código departamental.
-def merge_muertes_departamentos(muertes, departamentos):
-    return muertes.merge(departamentos, on='COD_DEPARTAMENTO', how='left')[['COD_DEPARTAMENTO', 'DEPARTAMENTO', 'TotalMuertes']]
-
-# Agrupa y cuenta las muertes por mes, asegurando que todos los meses del año estén representados.
-def agrupar_muertes_por_mes(muertes):
-    muertes = muertes.copy()
-    muertes['MES'] = pd.to_numeric(muertes['MES'], errors='coerce')
-    
+    mascara = df['AÑO'] == año
+    if mascara.all():
+        # Todas las filas son del año: se comparten los arreglos (mapeados o del proceso maestro) sin copiarlos;
+        # con copy-on-write (activado arriba) modificar el resultado nunca toca el original
+        return df.copy(deep=False)
+    return df[mascara]
+
+# Total de muertes por departamento según el motor de consultas (ver consultas.MotorConsultas).
+def agrupar_muertes_por_departamento(motor, geografia):
+    return muertes_por_departamento_desde_conteos(motor.conteo('COD_DEPARTAMENTO'), geografia)
+
+# Arma la vista por departamento a partir de conteos indexados por código departamental. El código
+# de dos dígitos y el nombre se toman de la dimensión geográfica (ver geografia.py), ya normalizados.
+def muertes_por_departamento_desde_conteos(conteo, geografia):
+    ids = geografia.ids_departamento(conteo.index)
+    return pd.DataFrame({
+        'COD_DEPARTAMENTO': _atributo(geografia.departamentos['CODIGO'], ids),
+        'DEPARTAMENTO': _atributo(geografia.departamentos['DEPARTAMENTO'], ids),
+        'TotalMuertes': conteo.to_numpy(),
+    })
+
+# Valor de un atributo de la dimensión para cada identificador; NaN donde no hay ubicación.
+def _atributo(columna, ids):
+    valores = np.append(columna.to_numpy(dtype=object), np.nan)
+    return valores[np.where(ids >= 0, ids, len(valores) - 1)]
+
+# Muertes por mes, asegurando que todos los meses del año estén representados.
+def agrupar_muertes_por_mes(motor):
+    return muertes_por_mes_desde_conteos(motor.conteo('MES'))
+
+# Arma la vista mensual a partir de conteos indexados por número de mes.
+def muertes_por_mes_desde_conteos(conteo):
     meses = pd.Index(range(1, 13), name='MES')
     muertes_mensuales = (
-        muertes.groupby('MES')
-               .size()
-               .reindex(meses, fill_value=0)
-               .reset_index(name='TOTAL_MUERTES')
+        conteo
+        .reindex(meses, fill_value=0)
+        .reset_index(name='TOTAL_MUERTES')
     )
     muertes_mensuales['MES_NOMBRE'] = muertes_mensuales['MES'].apply(
         lambda x: unidecode(calendar.month_name[x]).upper()
     )
     return muertes_mensuales
 
-# Retorna las ciudades con mayor cantidad de homicidios, filtrando por un código específico de causa de muerte.
-def ciudades_mas_violentas(df_muertes, df_division, top_n=5):
-    df_filtrado = df_muertes[df_muertes['COD_MUERTE'].astype(str).str.lower().str.startswith('x95')]
-    df_unido = df_filtrado.merge(df_division[['COD_DANE', 'MUNICIPIO']], on='COD_DANE', how='left')
-    homicidios_ciudades_mas = (
-        df_unido
-        .groupby('MUNICIPIO')
-        .size()
-        .reset_index(name='TOTAL_HOMICIDIOS')
-        .sort_values('TOTAL_HOMICIDIOS', ascending=False)
-        .head(top_n)
-    )
-    return homicidios_ciudades_mas
+# Retorna las ciudades con mayor cantidad de muertes por un grupo de causas (por defecto, homicidios),
+# según el ranking de municipios del motor de consultas (ver consultas.MotorConsultas.ranking).
+def ciudades_mas_violentas(motor, top_n=5, grupo=GRUPO_HOMICIDIO, empates='cortar'):
+    return _ciudades(motor.ranking('municipio', top_n, descendente=True, empates=empates, causa=grupo))
 
 # Retorna las ciudades con menor cantidad de muertes, basándose en los registros disponibles.
-def ciudades_menos_mortalidad(df_muertes, df_division, top_n=10):
-    df_unido = df_muertes.merge(df_division[['COD_DANE', 'MUNICIPIO']], on='COD_DANE', how='left')
-    homicidios_ciudades_menos = (
-        df_unido
-        .groupby('MUNICIPIO')
-        .size()
-        .reset_index(name='TOTAL_HOMICIDIOS')
-        .sort_values('TOTAL_HOMICIDIOS', ascending=True)
-        .head(top_n)
-    )
-    return homicidios_ciudades_menos
-
-# Retorna las principales causas de muerte según su frecuencia, uniendo con su descripción y mostrando las más comunes.
-def causas_principales_muerte(df_muertes, df_codigos, top_n=10):
-    # Normalizar código en df_muertes
-    df_muertes = normalizar_codigo_columna(df_muertes, 'COD_MUERTE')
-    df_muertes = filtrar_codigos_min_length(df_muertes, 'COD_MUERTE', 4)
-
-    # Preparar df_codigos
-    df_codigos = renombrar_columnas_codigos(df_codigos)
-    df_codigos = normalizar_codigo_columna(df_codigos, 'COD_MUERTE')
-
-    conteo = (
-        df_muertes
-        .groupby('COD_MUERTE')
-        .size()
-        .reset_index(name='TOTAL_CASOS')
-    )
+def ciudades_menos_mortalidad(motor, top_n=10, empates='cortar'):
+    return _ciudades(motor.ranking('municipio', top_n, descendente=False, empates=empates))
+
+# Vista de ciudades a partir de un ranking de municipios. Los empates se resuelven por código DANE,
+# así que el resultado no depende del orden de las filas; los municipios homónimos se distinguen por
+# su departamento y los códigos que no están en la DIVIPOLA quedan fuera.
+def _ciudades(elegidas):
+    return pd.DataFrame({
+        'MUNICIPIO': elegidas['MUNICIPIO'].to_numpy(),
+        'TOTAL_HOMICIDIOS': elegidas['MUERTES'].to_numpy(),
+        'RANGO': elegidas['RANGO'].to_numpy(),
+    })
+
+# Retorna las ciudades con menor tasa de mortalidad (por defecto, ajustada por edad) por cada 100.000
+# habitantes, según los denominadores de población del año (ver tasas.Denominadores). Solo entran los
+# municipios con población; el resultado trae la tasa, las muertes y el rango.
+def ciudades_menor_tasa(cubo, denominadores, top_n=10, tasa='TASA_AJUSTADA'):
+    tasas_municipio = denominadores.tasas(cubo, por='municipio')
+    tasas_municipio = tasas_municipio[tasas_municipio['POBLACION'] > 0]
+    elegidas = ranking.rankear(tasas_municipio[tasa], top_n, descendente=False)
+    ids = elegidas['ID_MUNICIPIO'].to_numpy()
+    return pd.DataFrame({
+        'MUNICIPIO': denominadores.geografia.municipios['ETIQUETA'].to_numpy()[ids],
+        tasa: elegidas['VALOR'].to_numpy(),
+        'MUERTES': tasas_municipio['MUERTES'].reindex(ids).to_numpy(),
+        'RANGO': elegidas['RANGO'].to_numpy(),
+    })
 
-    resultado = conteo.merge(df_codigos[['COD_MUERTE', 'DESCRIPCION']], on='COD_MUERTE', how='left')
-    resultado = resultado[['COD_MUERTE', 'DESCRIPCION', 'TOTAL_CASOS']]
-    resultado = resultado.sort_values('TOTAL_CASOS', ascending=False).head(top_n)
-    resultado['RANK'] = range(1, len(resultado) + 1)
+# Retorna las principales causas de muerte según su frecuencia, con su código y descripción.
+# El código y la descripción se toman del diccionario solo para las filas que se muestran.
+# RANK es el rango de competición: dos causas empatadas comparten puesto.
+def causas_principales_muerte(motor, diccionario, top_n=10, empates='cortar'):
+    elegidas = motor.ranking('causa', top_n, descendente=True, empates=empates)
+    ids = diccionario.codigos.get_indexer(elegidas['CAUSA'])
+    resultado = diccionario.tabla.iloc[ids][['COD_MUERTE', 'DESCRIPCION']].reset_index(drop=True)
+    resultado['TOTAL_CASOS'] = elegidas['MUERTES'].to_numpy()
+    resultado['RANK'] = elegidas['RANGO'].to_numpy()
 
     return resultado
-# Agrupa las muertes por rangos quinquenales de edad
-def conteo_muertes_por_rango_edad(df, columna='GRUPO_EDAD1'):
-    # Convertir a numérico
-    df[columna] = pd.to_numeric(df[columna], errors='coerce')
-    df = df.dropna(subset=[columna])
-
-    # Función para asignar rangos quinquenales
-    def asignar_rango_edad(edad):
-        if edad >= 85:
-            return '85+'
-        else:
-            inicio = (edad // 5) * 5
-            fin = inicio + 4
-            return f'{int(inicio)}-{int(fin)}'
-
-    df['RANGO_EDAD'] = df[columna].apply(asignar_rango_edad)
-
-    conteo = df.groupby('RANGO_EDAD').size().reset_index(name='TOTAL_MUERTES')
-
-    # Ordenar rangos correctamente
-    def ordenar_rangos(rango):
-        if rango == '85+':
-            return 999
-        return int(rango.split('-')[0])
-    
-    conteo['ORDEN'] = conteo['RANGO_EDAD'].apply(ordenar_rangos)
-    conteo = conteo.sort_values('ORDEN').drop(columns='ORDEN')
-
-    return conteo
+
+# Retorna todas las causas del catálogo CIE-10, hayan tenido muertes o no, con su capítulo, su total
+# de casos y su rango (de competición, por total descendente), en el orden del ranking. Es la tabla
+# que recorre el explorador de causas (ver explorador.TablaIndexada).
+def tabla_causas(motor, diccionario):
+    return tabla_causas_desde_conteos(motor.conteo('ID_CAUSA'), diccionario)
+
+# Arma la tabla del explorador a partir de conteos indexados por identificador de causa.
+def tabla_causas_desde_conteos(conteo, diccionario):
+    conteo = conteo[conteo.index != causas.SIN_CAUSA]
+    totales = np.zeros(len(diccionario), dtype=np.int64)
+    totales[conteo.index.to_numpy()] = conteo.to_numpy()
+    posiciones, _, competicion = ranking.seleccionar(totales, len(totales), descendente=True)
+    resultado = diccionario.tabla.iloc[posiciones][['COD_MUERTE', 'DESCRIPCION', 'CAPITULO']].reset_index(drop=True)
+    resultado.insert(0, 'RANK', competicion)
+    resultado['TOTAL_CASOS'] = totales[posiciones]
+    return resultado
+
+# Agrupa las muertes por rangos de edad del esquema indicado (ver edades.ESQUEMAS_EDAD; por defecto quinquenal)
+def conteo_muertes_por_rango_edad(motor, esquema='quinquenal'):
+    return rangos_edad_desde_conteos(motor.conteo('GRUPO_EDAD1'), esquema)
+
+# Arma la distribución por rangos de edad a partir de conteos indexados por código GRUPO_EDAD1 del DANE.
+# Los códigos se traducen con la tabla del esquema y se suman con un solo bincount, ya en orden natural;
+# las muertes de edad desconocida quedan fuera.
+def rangos_edad_desde_conteos(conteo, esquema='quinquenal'):
+    totales = edades.contar_grupos_edad(conteo.index.to_numpy(), esquema, pesos=conteo.to_numpy())
+    return pd.DataFrame({'RANGO_EDAD': edades.etiquetas(esquema), 'TOTAL_MUERTES': totales})
 
 # Agrupa las muertes por departamento y sexo, asigna nombres legibles a los sexos y añade el nombre del departamento.
-def conteo_muertes_por_departamento_y_sexo(df_muertes, df_division, depto_col='COD_DEPARTAMENTO', sexo_col='SEXO', nombre_col='DEPARTAMENTO'):
-    df_filtered = df_muertes[[depto_col, sexo_col]].dropna()
-    df_filtered[depto_col] = df_filtered[depto_col].astype(str).str.zfill(2)
-    df_division[depto_col] = df_division[depto_col].astype(str).str.zfill(2)
-    conteo = (
-        df_filtered
-        .groupby([depto_col, sexo_col])
-        .size()
-        .reset_index(name='TOTAL_MUERTES')
-    )
+def conteo_muertes_por_departamento_y_sexo(motor, geografia):
+    return departamento_y_sexo_desde_conteos(motor.conteo(['COD_DEPARTAMENTO', 'SEXO']), geografia)
 
-    conteo = conteo.merge(
-        df_division[[depto_col, nombre_col]].drop_duplicates(),
-        on=depto_col,
-        how='left'
-    )
+# Arma la vista por departamento y sexo a partir de conteos indexados por (departamento, sexo).
+# El nombre del departamento sale de la dimensión geográfica por identificador, sin merge.
+def departamento_y_sexo_desde_conteos(conteo, geografia, depto_col='COD_DEPARTAMENTO', sexo_col='SEXO', nombre_col='DEPARTAMENTO'):
+    ids = geografia.ids_departamento(conteo.index.get_level_values(depto_col))
 
     # Mapear valores de sexo a nombres
     mapa_sexo = {1: 'Masculino', 2: 'Femenino', 3: 'Otro'}
-    conteo[sexo_col] = conteo[sexo_col].map(mapa_sexo).fillna('Desconocido')
+    sexos = pd.Series(conteo.index.get_level_values(sexo_col)).map(mapa_sexo).fillna('Desconocido')
 
-    resultado = conteo[[nombre_col, sexo_col, 'TOTAL_MUERTES']]
+    resultado = pd.DataFrame({
+        nombre_col: _atributo(geografia.departamentos['DEPARTAMENTO'], ids),
+        sexo_col: sexos.to_numpy(),
+        'TOTAL_MUERTES': conteo.to_numpy(),
+    })
 
-    return resultado
\ No newline at end of file
+    return resultado
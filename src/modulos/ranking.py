@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+
+# Políticas de empate en el último puesto: 'cortar' devuelve exactamente n filas, desempatando por
+# clave; 'incluir' agrega todas las filas empatadas con el último puesto.
+EMPATES = ('cortar', 'incluir')
+
+
+# Elige los n primeros de `valores` sin ordenar el arreglo completo: una selección parcial
+# (argpartition) encuentra el valor del n-ésimo puesto y solo se ordenan los candidatos que lo
+# alcanzan, por valor y luego por `claves` (por defecto, la posición), así que el orden entre
+# empatados es siempre el mismo. Los NaN van al final. Devuelve las posiciones elegidas en orden y
+# sus rangos denso (1, 2, 2, 3) y de competición (1, 2, 2, 4), que valen para el arreglo completo.
+def seleccionar(valores, n, descendente=True, claves=None, empates='cortar'):
+    if empates not in EMPATES:
+        raise ValueError(f"Política de empates no válida: {empates}; use una de {EMPATES}")
+    orden = np.asarray(valores, dtype=float)
+    orden = -orden if descendente else orden.copy()
+    orden[np.isnan(orden)] = np.inf
+    claves = np.arange(len(orden)) if claves is None else np.asarray(claves)
+
+    if n <= 0 or len(orden) == 0:
+        posiciones = np.array([], dtype=np.int64)
+    elif n >= len(orden):
+        posiciones = np.arange(len(orden))
+    else:
+        umbral = orden[np.argpartition(orden, n - 1)[:n]].max()
+        posiciones = np.flatnonzero(orden <= umbral)
+    posiciones = posiciones[np.lexsort((claves[posiciones], orden[posiciones]))]
+    if empates == 'cortar':
+        posiciones = posiciones[:max(n, 0)]
+
+    elegidos = orden[posiciones]
+    denso = np.cumsum(np.r_[True, elegidos[1:] != elegidos[:-1]]) if len(elegidos) else np.array([], dtype=np.int64)
+    competicion = np.searchsorted(elegidos, elegidos, side='left') + 1
+    return posiciones, denso.astype(np.int64), competicion.astype(np.int64)
+
+# Ranking de una serie de conteos indexada por la dimensión: las n filas extremas con su valor en
+# VALOR y sus rangos en RANGO (competición) y RANGO_DENSO. Los empates se desempatan por el índice.
+def rankear(conteo, n, descendente=True, empates='cortar'):
+    posiciones, denso, competicion = seleccionar(conteo.to_numpy(), n, descendente, conteo.index.to_numpy(), empates)
+    return pd.DataFrame({
+        conteo.index.name or 'CLAVE': conteo.index.to_numpy()[posiciones],
+        'VALOR': conteo.to_numpy()[posiciones],
+        'RANGO': competicion,
+        'RANGO_DENSO': denso,
+    })
+
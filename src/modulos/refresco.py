@@ -0,0 +1,90 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+# Versión de los datos ya construida: la huella del directorio y lo que devolvió `construir`
+VersionDatos = namedtuple('VersionDatos', ['huella', 'contenido'])
+
+
+# Huella barata del directorio de datos: nombre, tamaño y fecha de modificación de cada archivo fuente
+# y del manifiesto de cada subdirectorio publicado (como los artefactos de servicio).
+# Se ignoran los archivos y directorios ocultos, como el almacén columnar (.cache).
+def huella_directorio(directorio):
+    entradas = []
+    for ruta in sorted(Path(directorio).iterdir()):
+        if ruta.name.startswith('.'):
+            continue
+        if ruta.is_dir():
+            ruta = ruta / 'manifiesto.json'
+        if ruta.is_file():
+            estado = ruta.stat()
+            entradas.append((str(ruta.relative_to(directorio)), estado.st_size, estado.st_mtime_ns))
+    return hashlib.sha256(repr(entradas).encode('utf-8')).hexdigest()[:16]
+
+
+# Vigila el directorio de datos y, cuando cambian o aparecen archivos fuente, vuelve a ejecutar
+# `construir` en segundo plano, y luego `preparar` sobre el resultado si se indicó. La versión nueva
+# reemplaza a la anterior con una sola asignación, así que una petición que ya tomó la versión
+# anterior la sigue usando hasta terminar.
+class VigilanteDatos:
+    def __init__(self, directorio, construir, intervalo=60, preparar=None):
+        self.directorio = directorio
+        self.construir = construir
+        self.intervalo = intervalo
+        self.preparar = preparar
+        self._actual = VersionDatos(huella_directorio(directorio), construir())
+        self._pendiente = None
+        self._pid = None
+        self._candado = threading.Lock()
+
+    # Devuelve la versión vigente; quien la use debe tomarla una vez por petición.
+    def actual(self):
+        self._asegurar_hilo()
+        return self._actual
+
+    # Versión vigente sin arrancar el hilo de vigilancia, para prepararla en un proceso que no atiende
+    # peticiones (como el maestro de gunicorn antes del fork).
+    def vigente(self):
+        return self._actual
+
+    # Los hilos no sobreviven al fork de gunicorn: cada proceso arranca el suyo en su primera petición.
+    def _asegurar_hilo(self):
+        if not self.intervalo or self._pid == os.getpid():
+            return
+        with self._candado:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                threading.Thread(target=self._vigilar, name='vigilante-datos', daemon=True).start()
+
+    def _vigilar(self):
+        while True:
+            time.sleep(self.intervalo)
+            try:
+                self.revisar()
+            except Exception:
+                logger.exception("No se pudo refrescar los datos de %s", self.directorio)
+
+    # Reconstruye si la huella cambió y se mantuvo igual durante dos revisiones seguidas,
+    # para no leer un archivo que todavía se está copiando. Devuelve True si cambió de versión.
+    def revisar(self):
+        huella = huella_directorio(self.directorio)
+        if huella == self._actual.huella:
+            self._pendiente = None
+            return False
+        if huella != self._pendiente:
+            self._pendiente = huella
+            return False
+        contenido = self.construir()
+        if self.preparar is not None:
+            self.preparar(contenido)
+        self._actual = VersionDatos(huella, contenido)
+        self._pendiente = None
+        logger.info("Datos actualizados a la versión %s", huella)
+        return True
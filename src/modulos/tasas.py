@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+from src.modulos import edades
+
+
+# Tasas por cada 100.000 habitantes
+POR_HABITANTES = 100_000
+# Esquema de edad sobre el que se alinean población, muertes y población estándar
+ESQUEMA = 'quinquenal'
+# Población estándar mundial de la OMS (2000-2025), en porcentaje, por grupo quinquenal; el último
+# grupo (85+) suma los de 85-89, 90-94, 95-99 y 100+. Se normaliza una sola vez a pesos que suman 1.
+_ESTANDAR_OMS = [8.86, 8.69, 8.60, 8.47, 8.22, 7.93, 7.61, 7.15, 6.59, 6.04, 5.37, 4.55, 3.72, 2.96, 2.21, 1.52, 0.91, 0.635]
+PESOS_ESTANDAR = np.array(_ESTANDAR_OMS) / sum(_ESTANDAR_OMS)
+# Sexos con población proyectada; las muertes con SEXO=3 no tienen denominador
+SEXOS = (1, 2)
+
+
+# Denominadores de población de un año: un arreglo denso población[municipio, sexo, grupo de edad]
+# alineado con la dimensión geográfica (ver geografia.py) y con el esquema quinquenal de edades.py.
+# Las muertes del cubo se vuelcan a un arreglo de la misma forma con un solo bincount, y de ahí las
+# tasas crudas y ajustadas por edad de todos los municipios (o departamentos, o del país) salen con
+# operaciones sobre arreglos completos.
+class Denominadores:
+    def __init__(self, df_poblacion, geografia, año):
+        self.geografia = geografia
+        self.año = año
+        poblacion = df_poblacion[df_poblacion['AÑO'] == año]
+        self.forma = (len(geografia.municipios), len(SEXOS), len(edades.etiquetas(ESQUEMA)))
+        self.poblacion = self._volcar(
+            geografia.ids_municipio(poblacion['COD_DANE']),
+            poblacion['SEXO'].to_numpy(),
+            edades.rangos_edad(poblacion['EDAD'].to_numpy(), ESQUEMA),
+            poblacion['POBLACION'].to_numpy(),
+        )
+
+    # Suma `pesos` en un arreglo denso de la `forma` indicada (por defecto, la de la población); las
+    # filas sin municipio, sexo o edad reconocidos quedan fuera.
+    def _volcar(self, municipios, sexos, rangos, pesos, forma=None):
+        forma = self.forma if forma is None else forma
+        sexos = np.asarray(sexos, dtype=np.int64) - 1
+        validas = (municipios >= 0) & (sexos >= 0) & (sexos < len(SEXOS)) & (rangos >= 0)
+        clave = np.ravel_multi_index((municipios[validas], sexos[validas], rangos[validas]), forma)
+        suma = np.bincount(clave, weights=np.asarray(pesos)[validas], minlength=int(np.prod(forma)))
+        return suma.reshape(forma)
+
+    # Muertes del cubo (opcionalmente solo las celdas donde `mascara` es True) en la forma de la
+    # población, más un último grupo de edad con las de edad desconocida (GRUPO_EDAD1 29).
+    def muertes(self, cubo, mascara=None):
+        celdas = cubo.celdas if mascara is None else cubo.celdas[mascara]
+        grupos = celdas['GRUPO_EDAD1'].to_numpy()
+        rangos = edades.rangos_grupo_edad(grupos, ESQUEMA)
+        rangos = np.where(grupos == edades.EDAD_DESCONOCIDA, self.forma[-1], rangos)
+        return self._volcar(
+            self.geografia.ids_municipio(celdas['COD_DANE']),
+            celdas['SEXO'].to_numpy(),
+            rangos,
+            celdas['MUERTES'].to_numpy(),
+            forma=self.forma[:-1] + (self.forma[-1] + 1,),
+        )
+
+    # Tasas crudas y ajustadas por edad (método directo, población estándar de la OMS) por cada
+    # POR_HABITANTES, agrupando por 'municipio', 'departamento', 'sexo' o 'pais'. Solo se cuentan las
+    # muertes de municipios con población, para que numerador y denominador cubran lo mismo; las tasas
+    # específicas de un grupo de edad sin población se toman como cero. Las muertes de edad desconocida
+    # entran en MUERTES y en la tasa cruda, pero no en la ajustada, que necesita el grupo de edad.
+    # Devuelve MUERTES, POBLACION, TASA_CRUDA y TASA_AJUSTADA indexadas por el identificador del grupo
+    # (ver geografia.Geografia).
+    def tasas(self, cubo, por='municipio', mascara=None):
+        muertes = self.muertes(cubo, mascara)
+        muertes[self.poblacion.sum(axis=(1, 2)) == 0] = 0
+        muertes, poblacion = self._agrupar(muertes, por), self._agrupar(self.poblacion, por)
+        conocidas = muertes[:, :-1]
+        especificas = np.divide(conocidas, poblacion, out=np.zeros_like(conocidas), where=poblacion > 0)
+        total_muertes, total_poblacion = muertes.sum(axis=-1), poblacion.sum(axis=-1)
+        cruda = np.divide(total_muertes, total_poblacion, out=np.full_like(total_muertes, np.nan), where=total_poblacion > 0)
+        ajustada = np.where(total_poblacion > 0, especificas @ PESOS_ESTANDAR, np.nan)
+        nombre_indice = {'municipio': 'ID_MUNICIPIO', 'departamento': 'ID_DEPARTAMENTO', 'sexo': 'SEXO', 'pais': 'PAIS'}[por]
+        indice = pd.RangeIndex(len(total_muertes), name=nombre_indice)
+        if por == 'sexo':
+            indice = pd.Index(SEXOS, name=nombre_indice)
+        return pd.DataFrame({
+            'MUERTES': total_muertes.astype(np.int64),
+            'POBLACION': total_poblacion.astype(np.int64),
+            'TASA_CRUDA': cruda * POR_HABITANTES,
+            'TASA_AJUSTADA': ajustada * POR_HABITANTES,
+        }, index=indice)
+
+    # Reduce un arreglo [municipio, sexo, edad] a [grupo, edad].
+    def _agrupar(self, arreglo, por):
+        if por == 'municipio':
+            return arreglo.sum(axis=1)
+        if por == 'sexo':
+            return arreglo.sum(axis=0)
+        if por == 'pais':
+            return arreglo.sum(axis=(0, 1))[np.newaxis, :]
+        if por == 'departamento':
+            departamentos = self.geografia.municipios['ID_DEPARTAMENTO'].to_numpy()
+            resultado = np.zeros((len(self.geografia.departamentos), arreglo.shape[-1]))
+            validos = departamentos >= 0
+            np.add.at(resultado, departamentos[validos], arreglo.sum(axis=1)[validos])
+            return resultado
+        raise ValueError(f"Agrupación de tasas no válida: {por}")
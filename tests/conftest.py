@@ -0,0 +1,44 @@
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.modulos import causas, esquemas
+
+# Raíz del proyecto; las pruebas leen la DIVIPOLA y el catálogo CIE-10 versionados en el repositorio
+RAIZ = Path(__file__).parent.parent
+DATOS = RAIZ / 'src' / 'data'
+
+
+@pytest.fixture(scope='session')
+def division():
+    return esquemas.leer_csv(DATOS / esquemas.DIVIPOLA['archivo'], esquemas.DIVIPOLA)
+
+@pytest.fixture(scope='session')
+def diccionario():
+    return causas.DiccionarioCausas(esquemas.leer_csv(DATOS / esquemas.CODIGOS_MUERTE['archivo'], esquemas.CODIGOS_MUERTE))
+
+
+# Registros de mortalidad sintéticos con municipios de la DIVIPOLA y códigos del catálogo, con las
+# columnas del registro del DANE que declara esquemas.MORTALIDAD.
+def registros_mortalidad(division, diccionario, filas, años=(2019,), semilla=0):
+    azar = np.random.default_rng(semilla)
+    municipios = division.iloc[azar.integers(0, len(division), filas)]
+    return pd.DataFrame({
+        'COD_DEPARTAMENTO': municipios['COD_DEPARTAMENTO'].to_numpy(),
+        'AÑO': azar.choice(años, filas),
+        'MES': azar.integers(1, 13, filas),
+        'SEXO': azar.integers(1, 4, filas),
+        'GRUPO_EDAD1': azar.integers(0, 30, filas),
+        'COD_MUERTE': azar.choice(diccionario.tabla['COD_MUERTE'].to_numpy()[:300], filas),
+        'COD_DANE': municipios['COD_DANE'].to_numpy(),
+    })
+
+# Escribe los registros como los publica el DANE (latin1) y devuelve la ruta.
+def escribir_mortalidad(ruta, registros):
+    registros.to_csv(ruta, index=False, encoding=esquemas.MORTALIDAD['codificacion'])
+    return ruta
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from src.modulos import agregacion_paralela, agregados, cargar_datos, causas
+
+from conftest import escribir_mortalidad, registros_mortalidad
+
+
+def _cubo_serial(registros, diccionario):
+    return agregados.construir_cubo([causas.codificar_registros(registros, diccionario)])
+
+
+@pytest.mark.parametrize('partes', [1, 3, 7])
+def test_el_cubo_repartido_coincide_con_el_serial(division, diccionario, partes):
+    registros = registros_mortalidad(division, diccionario, 2000, años=(2018, 2019))
+    por_año = {año: grupo.reset_index(drop=True) for año, grupo in registros.groupby('AÑO')}
+    paralelo = agregacion_paralela.construir_cubo(por_año, por_año.get, diccionario, procesos=1, partes=partes)
+    pd.testing.assert_frame_equal(paralelo.celdas, _cubo_serial(registros, diccionario).celdas)
+
+
+def test_los_fragmentos_reparten_cada_fila_una_sola_vez(division, diccionario):
+    registros = registros_mortalidad(division, diccionario, 101)
+    fragmentos = agregacion_paralela.fragmentos(registros, 4)
+    assert sum(len(fragmento['COD_DANE']) for fragmento in fragmentos) == 101
+    assert set(fragmentos[0]) == set(agregacion_paralela.COLUMNAS)
+
+
+def test_agregar_mortalidad_en_paralelo_coincide_con_el_serial(tmp_path, monkeypatch, division, diccionario):
+    monkeypatch.setattr(cargar_datos, 'DATA_DIR', tmp_path)
+    monkeypatch.setattr(cargar_datos, 'CACHE_DIR', tmp_path / '.cache')
+    monkeypatch.setattr(cargar_datos, 'ARTEFACTOS_DIR', tmp_path / 'artefactos')
+    registros = registros_mortalidad(division, diccionario, 3000, años=(2018, 2019))
+    for año, grupo in registros.groupby('AÑO'):
+        escribir_mortalidad(tmp_path / f'datosmortalidad_{año}.csv', grupo)
+
+    paralelo = cargar_datos.agregar_mortalidad_en_paralelo(diccionario=diccionario, procesos=2)
+    serial = agregados.construir_cubo(
+        causas.codificar_registros(cargar_datos.cargar_mortalidad_año(año), diccionario) for año in (2018, 2019))
+    pd.testing.assert_frame_equal(paralelo.celdas, serial.celdas)
+    assert paralelo.total() == 3000
@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+from src.modulos import agregados, causas
+
+from conftest import registros_mortalidad
+
+
+@pytest.fixture
+def registros(division, diccionario):
+    return causas.codificar_registros(registros_mortalidad(division, diccionario, 3000, años=(2018, 2019)), diccionario)
+
+
+@pytest.fixture
+def cubo(registros):
+    return agregados.construir_cubo([registros])
+
+
+def test_el_cubo_guarda_solo_celdas_no_vacias(cubo, registros):
+    assert cubo.total() == len(registros)
+    assert len(cubo) == len(registros.drop_duplicates(agregados.DIMENSIONES_CUBO))
+    assert (cubo.celdas['MUERTES'] > 0).all()
+
+
+@pytest.mark.parametrize('por', [['COD_DEPARTAMENTO'], ['MES'], ['ID_CAUSA'], ['COD_DEPARTAMENTO', 'SEXO'], ['AÑO', 'GRUPO_EDAD1']])
+def test_sumar_igual_a_groupby_de_los_registros(cubo, registros, por):
+    esperado = registros.groupby(por[0] if len(por) == 1 else por).size()
+    pd.testing.assert_series_equal(cubo.sumar(por), esperado, check_names=False, check_dtype=False)
+
+
+def test_sumar_y_filtrar_con_mascara(cubo, registros, diccionario):
+    mascara = diccionario.mascara(cubo.celdas['ID_CAUSA'], 'capitulo:1')
+    del_grupo = registros[diccionario.mascara(registros['ID_CAUSA'], 'capitulo:1')]
+    esperado = del_grupo.groupby('COD_DANE').size()
+    pd.testing.assert_series_equal(cubo.sumar(['COD_DANE'], mascara=mascara), esperado, check_names=False, check_dtype=False)
+    assert cubo.filtrar(mascara).total() == cubo.total(mascara) == len(del_grupo)
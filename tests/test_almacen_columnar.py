@@ -0,0 +1,41 @@
+import pandas as pd
+
+from src.modulos import almacen_columnar, esquemas
+
+from conftest import escribir_mortalidad, registros_mortalidad
+
+
+# Lector que cuenta cuántas veces se leyó el CSV
+class Lector:
+    def __init__(self):
+        self.lecturas = 0
+
+    def __call__(self, ruta):
+        self.lecturas += 1
+        return esquemas.leer_csv(ruta, esquemas.MORTALIDAD)
+
+
+def test_reutiliza_el_almacen_mientras_no_cambie_el_archivo(tmp_path, division, diccionario):
+    ruta = escribir_mortalidad(tmp_path / 'datosmortalidad.csv', registros_mortalidad(division, diccionario, 500))
+    lector = Lector()
+    primero = almacen_columnar.cargar_con_cache(ruta, lector, tmp_path / '.cache')
+    segundo = almacen_columnar.cargar_con_cache(ruta, lector, tmp_path / '.cache')
+    assert lector.lecturas == 1
+    # Las columnas del almacén vienen mapeadas en memoria; se copian para compararlas
+    pd.testing.assert_frame_equal(primero.copy(), segundo.copy())
+    pd.testing.assert_frame_equal(segundo.copy(), esquemas.leer_csv(ruta, esquemas.MORTALIDAD))
+
+
+def test_la_clave_cambia_con_el_contenido_y_con_la_firma(tmp_path, division, diccionario):
+    ruta = escribir_mortalidad(tmp_path / 'datosmortalidad.csv', registros_mortalidad(division, diccionario, 500))
+    lector = Lector()
+    almacen_columnar.cargar_con_cache(ruta, lector, tmp_path / '.cache', firma='a')
+    almacen_columnar.cargar_con_cache(ruta, lector, tmp_path / '.cache', firma='b')
+    assert lector.lecturas == 2
+
+    escribir_mortalidad(ruta, registros_mortalidad(division, diccionario, 200, semilla=1))
+    df = almacen_columnar.cargar_con_cache(ruta, lector, tmp_path / '.cache', firma='b')
+    assert lector.lecturas == 3
+    assert len(df) == 200
+    # Solo queda el almacén vigente del archivo
+    assert len(list((tmp_path / '.cache').glob('datosmortalidad-*'))) == 1
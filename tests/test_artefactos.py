@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from src.modulos import cargar_datos, construccion
+
+from conftest import RAIZ, escribir_mortalidad, registros_mortalidad
+
+
+@pytest.fixture
+def datos(tmp_path, monkeypatch, division, diccionario):
+    monkeypatch.setattr(cargar_datos, 'DATA_DIR', tmp_path)
+    monkeypatch.setattr(cargar_datos, 'CACHE_DIR', tmp_path / '.cache')
+    monkeypatch.setattr(cargar_datos, 'ARTEFACTOS_DIR', tmp_path / 'artefactos')
+    escribir_mortalidad(tmp_path / 'datosmortalidad.csv', registros_mortalidad(division, diccionario, 400))
+    construccion.construir_artefactos(RAIZ / 'data', tmp_path, tmp_path / 'artefactos')
+    return tmp_path
+
+
+# Impide leer los CSV: si la carga pasa, salió del artefacto
+def _sin_csv(monkeypatch):
+    def falla(*args, **kwargs):
+        raise AssertionError("se leyó el CSV en lugar del artefacto")
+    monkeypatch.setattr(cargar_datos, '_cargar_con_esquema', falla)
+
+
+def test_usa_el_artefacto_mientras_las_fuentes_no_cambien(datos, monkeypatch):
+    _sin_csv(monkeypatch)
+    assert len(cargar_datos.cargar_mortalidad_año(2019)) == 400
+    assert len(cargar_datos.cargar_division_politico_administrativa()) > 0
+    assert cargar_datos.catalogo.años_artefactos(datos / 'artefactos') == [2019]
+
+
+def test_vuelve_al_csv_si_la_fuente_cambia(datos, division, diccionario):
+    ruta = datos / 'datosmortalidad.csv'
+    antes = ruta.stat()
+    escribir_mortalidad(ruta, registros_mortalidad(division, diccionario, 150, semilla=1))
+    # Con la misma fecha de modificación que antes, el tamaño basta para notar el cambio
+    os.utime(ruta, ns=(antes.st_atime_ns, antes.st_mtime_ns))
+    assert len(cargar_datos.cargar_mortalidad_año(2019)) == 150
+
+
+def test_vuelve_al_csv_si_aparece_una_particion_del_año(datos, division, diccionario):
+    escribir_mortalidad(datos / 'datosmortalidad_2019.csv', registros_mortalidad(division, diccionario, 90, semilla=2))
+    assert len(cargar_datos.cargar_mortalidad_año(2019)) == 90
+
+
+def test_no_confia_en_artefactos_sin_estado_de_fuentes(datos, monkeypatch):
+    manifiesto = cargar_datos.catalogo.leer_manifiesto_artefactos(datos / 'artefactos')
+    info = dict(manifiesto['artefactos']['mortalidad_2019'])
+    del info['estado_fuentes']
+    assert not cargar_datos.catalogo.artefacto_al_dia(info)
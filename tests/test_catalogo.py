@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from src.modulos import cargar_datos, catalogo, esquemas
+
+from conftest import escribir_mortalidad, registros_mortalidad
+
+
+@pytest.fixture
+def registros(division, diccionario):
+    return registros_mortalidad(division, diccionario, 900, años=(2017, 2018, 2019))
+
+
+@pytest.fixture
+def particiones(tmp_path, monkeypatch, registros):
+    monkeypatch.setattr(cargar_datos, 'DATA_DIR', tmp_path)
+    monkeypatch.setattr(cargar_datos, 'CACHE_DIR', tmp_path / '.cache')
+    monkeypatch.setattr(cargar_datos, 'ARTEFACTOS_DIR', tmp_path / 'artefactos')
+    escribir_mortalidad(tmp_path / 'datosmortalidad_2017.csv', registros[registros['AÑO'] == 2017])
+    registros[registros['AÑO'] == 2018].to_csv(tmp_path / 'datosmortalidad_2018.csv.gz', index=False, encoding='latin1')
+    return tmp_path
+
+
+def test_descubre_solo_las_particiones_anuales(particiones):
+    (particiones / 'datosmortalidad_19.csv').write_text('')
+    (particiones / 'otros_2019.csv').write_text('')
+    (particiones / 'datosmortalidad_2020.csv').mkdir()
+    encontradas = catalogo.descubrir_particiones(particiones)
+    assert list(encontradas) == [2017, 2018]
+    assert encontradas[2018].name == 'datosmortalidad_2018.csv.gz'
+    assert catalogo.ruta_particion(particiones, 2019) is None
+
+
+def test_cada_año_sale_de_su_particion_igual_que_filtrando_con_pandas(particiones, registros):
+    for año in (2017, 2018):
+        df = cargar_datos.cargar_mortalidad_año(año)
+        esperado = registros[registros['AÑO'] == año].reset_index(drop=True)
+        assert len(df) == len(esperado)
+        for columna in esperado.columns:
+            assert df[columna].astype(esperado[columna].dtype).tolist() == esperado[columna].tolist()
+
+
+def test_las_particiones_conviven_con_el_archivo_unico(particiones, registros):
+    escribir_mortalidad(particiones / esquemas.MORTALIDAD['archivo'], registros[registros['AÑO'] == 2019])
+    assert cargar_datos.años_disponibles() == [2017, 2018, 2019]
+    df = cargar_datos.cargar_mortalidad_año(2019)
+    assert (df['AÑO'] == 2019).all() and len(df) == (registros['AÑO'] == 2019).sum()
+    # Un año con partición no lee el archivo único
+    assert set(cargar_datos.cargar_mortalidad_año(2017)['AÑO']) == {2017}
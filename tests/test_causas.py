@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.modulos import causas
+
+from conftest import registros_mortalidad
+
+
+# Códigos del catálogo que pertenecen a un grupo
+def _codigos(diccionario, grupo):
+    return set(diccionario.codigos[diccionario.mascara(np.arange(len(diccionario)), grupo)])
+
+
+def test_prefijo(diccionario):
+    assert _codigos(diccionario, 'X95') == {codigo for codigo in diccionario.codigos if codigo.startswith('X95')}
+    assert _codigos(diccionario, 'homicidios') == _codigos(diccionario, 'X95')
+
+
+def test_rango_incluye_todos_los_subcodigos_del_extremo(diccionario):
+    agresiones = _codigos(diccionario, 'X85-Y09')
+    esperado = {codigo for codigo in diccionario.codigos if 'X85' <= codigo[:3] <= 'Y09'}
+    assert agresiones == esperado
+    assert {'X850', 'Y090', 'Y099'} <= agresiones
+    assert 'Y100' not in agresiones and 'X849' not in agresiones
+
+
+def test_capitulo_por_codigo_y_por_numero(diccionario):
+    capitulo = diccionario.capitulos[diccionario.capitulos['DESDE'] == 'V01']
+    externas = _codigos(diccionario, 'capitulo:V01')
+    assert externas == _codigos(diccionario, f'capitulo:{capitulo.index[0]}')
+    assert externas == set(diccionario.tabla.loc[diccionario.tabla['CAPITULO'] == capitulo['CAPITULO'].iloc[0], 'COD_MUERTE'])
+    assert _codigos(diccionario, 'X85-Y09') <= externas
+
+
+def test_varias_partes_y_sin_causa(diccionario):
+    grupo = _codigos(diccionario, 'X95, V01-V99')
+    assert grupo == _codigos(diccionario, 'X95') | _codigos(diccionario, 'V01-V99')
+    # SIN_CAUSA (-1) nunca pertenece a un grupo
+    assert not diccionario.mascara(np.array([-1]), 'capitulo:V01')[0]
+
+
+def test_definiciones_no_validas(diccionario):
+    for definicion in ('Y09-X85', 'capitulo:99', 'capitulo:Ñ00', ''):
+        with pytest.raises(ValueError):
+            diccionario.mascara(np.array([0]), definicion)
+
+
+def test_codificar_igual_a_buscar_el_codigo_con_pandas(diccionario, division):
+    registros = registros_mortalidad(division, diccionario, 500)
+    codigos = registros['COD_MUERTE'].astype(object)
+    # Minúsculas, espacios, un código fuera del catálogo y un faltante
+    codigos.iloc[:3] = [' ' + codigos.iloc[0].lower(), codigos.iloc[1] + ' ', 'Z999X']
+    codigos.iloc[3] = None
+    esperado = codigos.str.strip().str.upper().map(
+        pd.Series(diccionario.tabla.index, index=diccionario.tabla['COD_MUERTE'])).fillna(causas.SIN_CAUSA)
+
+    for serie in (codigos, codigos.astype('category')):
+        ids = diccionario.codificar(serie)
+        assert ids.tolist() == esperado.astype(int).tolist()
+    assert diccionario.tabla['COD_MUERTE'].iloc[ids[0]] == codigos.iloc[0].strip().upper()
+
+
+def test_codificar_registros_agrega_id_causa(diccionario, division):
+    registros = registros_mortalidad(division, diccionario, 100)
+    codificados = causas.codificar_registros(registros, diccionario)
+    assert 'ID_CAUSA' not in registros
+    assert (diccionario.tabla['COD_MUERTE'].to_numpy()[codificados['ID_CAUSA']] == registros['COD_MUERTE'].to_numpy()).all()
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.modulos import agregados, causas, consultas, geografia
+
+from conftest import registros_mortalidad
+
+
+@pytest.fixture
+def dimension():
+    return geografia.Geografia(pd.DataFrame({
+        'COD_DANE': [5001, 5002, 8001, 8002],
+        'COD_DEPARTAMENTO': [5, 5, 8, 8],
+        'DEPARTAMENTO': ['ANTIOQUIA', 'ANTIOQUIA', 'ATLANTICO', 'ATLANTICO'],
+        'MUNICIPIO': ['MEDELLIN', 'ABEJORRAL', 'BARRANQUILLA', 'BARANOA'],
+    }))
+
+
+# Muertes por municipio: 5001 -> 9, 5002 -> 4, 8001 -> 4, 8002 -> 1. Las de 8001 son homicidios (X95).
+@pytest.fixture
+def motor(dimension, diccionario):
+    homicidio = diccionario.codigos.get_indexer(['X950'])[0]
+    celdas = [(5001, 0, 9), (5002, 0, 4), (8001, homicidio, 4), (8002, 0, 1)]
+    cod_dane, causa, muertes = map(np.array, zip(*celdas))
+    cubo = agregados.CuboMortalidad(pd.DataFrame({
+        'AÑO': 2019, 'COD_DEPARTAMENTO': cod_dane // 1000, 'COD_DANE': cod_dane, 'MES': 1,
+        'SEXO': 1, 'GRUPO_EDAD1': 10, 'ID_CAUSA': causa, 'MUERTES': muertes,
+    }))
+    return consultas.MotorConsultas({'cubo': cubo, 'geografia': dimension, 'causas': diccionario})
+
+
+def test_ranking_descendente_desempata_por_clave(motor):
+    resultado = motor.ranking('municipio', 2)
+    assert resultado['MUNICIPIO'].tolist() == ['MEDELLIN', 'ABEJORRAL']
+    assert resultado['MUERTES'].tolist() == [9, 4]
+    assert resultado['RANGO'].tolist() == [1, 2]
+
+
+def test_ranking_incluye_los_empatados_con_el_ultimo_puesto(motor):
+    resultado = motor.ranking('municipio', 2, empates='incluir')
+    assert resultado['MUERTES'].tolist() == [9, 4, 4]
+    assert resultado['RANGO'].tolist() == [1, 2, 2]
+    assert resultado['RANGO_DENSO'].tolist() == [1, 2, 2]
+
+
+def test_ranking_ascendente(motor):
+    resultado = motor.ranking('municipio', 3, descendente=False)
+    assert resultado['MUERTES'].tolist() == [1, 4, 4]
+    assert resultado['RANGO'].tolist() == [1, 2, 2]
+    assert resultado['MUNICIPIO'].iloc[0] == 'BARANOA'
+
+
+def test_ranking_con_filtro_y_politica_no_valida(motor):
+    resultado = motor.ranking('municipio', 5, causa='homicidios')
+    assert resultado['MUNICIPIO'].tolist() == ['BARRANQUILLA']
+    with pytest.raises(ValueError):
+        motor.ranking('municipio', 2, empates='azar')
+
+
+# Registros codificados del conftest con causas de todo el catálogo, y un motor con su cubo y sus registros
+@pytest.fixture
+def registros(division, diccionario):
+    registros = registros_mortalidad(division, diccionario, 3000, años=(2018, 2019))
+    registros['COD_MUERTE'] = np.random.default_rng(1).choice(diccionario.tabla['COD_MUERTE'].to_numpy(), len(registros))
+    return causas.codificar_registros(registros, diccionario)
+
+
+@pytest.fixture
+def motor_registros(registros, division, diccionario):
+    return consultas.MotorConsultas({
+        'cubo': agregados.construir_cubo([registros]),
+        'mortalidad': registros,
+        'geografia': geografia.Geografia(division),
+        'causas': diccionario,
+    })
+
+
+def test_conteo_igual_a_groupby(motor_registros, registros):
+    esperado = registros.groupby(['MES', 'SEXO']).size()
+    pd.testing.assert_series_equal(motor_registros.conteo(['MES', 'SEXO']), esperado, check_names=False)
+
+
+def test_conteo_filtrado_igual_a_groupby(motor_registros, registros, diccionario):
+    filtro = (registros['AÑO'] == 2019) & diccionario.mascara(registros['ID_CAUSA'], 'capitulo:V01')
+    esperado = registros[filtro].groupby('COD_DEPARTAMENTO').size()
+    obtenido = motor_registros.conteo('COD_DEPARTAMENTO', año=2019, causa='capitulo:V01')
+    pd.testing.assert_series_equal(obtenido, esperado, check_names=False)
+
+
+def test_ejecutar_por_capitulo_igual_a_groupby(motor_registros, registros, diccionario):
+    capitulos = diccionario.tabla['CAPITULO'].to_numpy()[registros['ID_CAUSA'].to_numpy()]
+    esperado = pd.Series(capitulos).value_counts().sort_index()
+    resultado = motor_registros.ejecutar(consultas.consulta('capitulo'))
+    assert motor_registros.planificar(consultas.consulta('capitulo')).fuente == 'cubo'
+    assert resultado.set_index('CAPITULO')['MUERTES'].sort_index().to_dict() == esperado.to_dict()
+
+
+def test_columna_fuera_del_cubo_se_cuenta_en_los_registros(motor_registros, registros):
+    pregunta = consultas.consulta('COD_MUERTE', sexo=[1, 2])
+    assert motor_registros.planificar(pregunta).fuente == 'registros'
+    esperado = registros[registros['SEXO'].isin([1, 2])].groupby('COD_MUERTE').size()
+    obtenido = motor_registros.ejecutar(pregunta).set_index('COD_MUERTE')['MUERTES']
+    pd.testing.assert_series_equal(obtenido, esperado, check_names=False, check_index_type=False)
+
+
+def test_medida_que_no_esta_en_los_datos(motor_registros):
+    with pytest.raises(ValueError):
+        motor_registros.conteo('MES', medida='EDAD')
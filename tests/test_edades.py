@@ -0,0 +1,30 @@
+import numpy as np
+
+from src.modulos import edades
+
+
+def test_tabla_de_grupo_edad1_a_quinquenios():
+    rangos = edades.rangos_grupo_edad(np.arange(30), 'quinquenal')
+    # 0 a 8 (de menos de 1 hora a 2-4 años) son 0-4; 9 a 24 son 5-9 ... 80-84; 25 a 28 son 85+
+    esperado = [0] * 9 + list(range(1, 17)) + [17] * 4 + [-1]
+    assert rangos.tolist() == esperado
+    assert edades.etiquetas('quinquenal')[rangos[24]] == '80-84'
+    assert edades.etiquetas('quinquenal')[rangos[28]] == '85+'
+
+
+def test_edad_desconocida_y_codigos_fuera_de_la_tabla():
+    for esquema in edades.ESQUEMAS_EDAD:
+        assert edades.rangos_grupo_edad([edades.EDAD_DESCONOCIDA, 30, -1], esquema).tolist() == [-1, -1, -1]
+
+
+def test_otros_esquemas():
+    assert edades.rangos_grupo_edad([8, 9, 10, 28], 'decenal').tolist() == [0, 0, 1, 9]
+    assert edades.rangos_grupo_edad([8, 9, 11, 23], 'oms').tolist() == [0, 1, 2, 5]
+    # El esquema infantil solo cubre a los menores de un año
+    assert edades.rangos_grupo_edad([0, 3, 6, 7], 'infantil').tolist() == [0, 3, 6, -1]
+
+
+def test_contar_grupos_edad_deja_fuera_la_edad_desconocida():
+    conteo = edades.contar_grupos_edad([0, 8, 9, 29, 28], pesos=[1, 2, 3, 50, 4])
+    assert conteo.tolist() == [3, 3] + [0] * 15 + [4]
+    assert edades.contar_grupos_edad([0, 29]).tolist() == [1] + [0] * 17
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+from src.modulos import esquemas
+
+from conftest import escribir_mortalidad, registros_mortalidad
+
+
+def test_leer_csv_da_los_mismos_valores_que_pandas_con_los_tipos_declarados(tmp_path, division, diccionario):
+    ruta = escribir_mortalidad(tmp_path / 'datosmortalidad.csv', registros_mortalidad(division, diccionario, 1000))
+    df = esquemas.leer_csv(ruta, esquemas.MORTALIDAD)
+    base = pd.read_csv(ruta, encoding='latin1')
+
+    assert list(df.columns) == list(base.columns)
+    assert df.dtypes.astype(str).to_dict() == esquemas.MORTALIDAD['columnas']
+    for columna in df.columns:
+        assert df[columna].astype(base[columna].dtype).tolist() == base[columna].tolist()
+
+
+def test_leer_por_bloques_es_igual_a_leer_completo(tmp_path, division, diccionario):
+    ruta = escribir_mortalidad(tmp_path / 'datosmortalidad.csv', registros_mortalidad(division, diccionario, 1000))
+    completo = esquemas.leer_csv(ruta, esquemas.MORTALIDAD)
+    bloques = list(esquemas.leer_csv_por_bloques(ruta, esquemas.MORTALIDAD, 300))
+    assert [len(bloque) for bloque in bloques] == [300, 300, 300, 100]
+    unidos = pd.concat(bloques, ignore_index=True)
+    # Las categorías de COD_MUERTE dependen de cada bloque; se comparan los valores
+    unidos['COD_MUERTE'] = unidos['COD_MUERTE'].astype(str)
+    pd.testing.assert_frame_equal(unidos, completo.assign(COD_MUERTE=completo['COD_MUERTE'].astype(str)))
+
+
+def test_validar_reporta_todas_las_violaciones(division, diccionario):
+    registros = registros_mortalidad(division, diccionario, 50)
+    registros.loc[:2, 'MES'] = 13
+    registros.loc[:1, 'SEXO'] = 7
+    registros['COD_MUERTE'] = registros['COD_MUERTE'].astype(object)
+    registros.loc[0, 'COD_MUERTE'] = '999'
+    with pytest.raises(ValueError) as error:
+        esquemas.validar(registros, esquemas.MORTALIDAD)
+    mensaje = str(error.value)
+    assert 'MES: 3 valores fuera del rango [1, 12]' in mensaje
+    assert 'SEXO: 2 valores no permitidos' in mensaje
+    assert 'COD_MUERTE: 1 valores no cumplen el formato esperado' in mensaje
+
+
+def test_divipola_con_codigos_duplicados(division):
+    duplicada = pd.concat([division, division.iloc[:2]], ignore_index=True)
+    with pytest.raises(ValueError, match='COD_DANE: 2 valores duplicados'):
+        esquemas.validar(duplicada, esquemas.DIVIPOLA)
+
+
+def test_la_firma_cambia_con_el_esquema():
+    otro = {**esquemas.MORTALIDAD, 'columnas': {**esquemas.MORTALIDAD['columnas'], 'MES': 'int16'}}
+    assert esquemas.firma(esquemas.MORTALIDAD) == esquemas.firma(dict(esquemas.MORTALIDAD))
+    assert esquemas.firma(otro) != esquemas.firma(esquemas.MORTALIDAD)
@@ -0,0 +1,30 @@
+import stat
+
+import flask
+
+from src.modulos import estaticos
+
+
+def test_publica_con_el_hash_en_el_nombre_y_legible_por_todos(tmp_path):
+    fuente = tmp_path / 'colombia.geo.json'
+    fuente.write_text('{"type": "FeatureCollection", "features": []}')
+    nombre = estaticos.publicar(fuente, tmp_path / 'estaticos')
+    assert nombre.startswith('colombia.geo-') and nombre.endswith('.json')
+    publicado = tmp_path / 'estaticos' / nombre
+    assert publicado.read_bytes() == fuente.read_bytes()
+    assert stat.S_IMODE(publicado.stat().st_mode) == 0o644
+    # Publicar de nuevo el mismo contenido no cambia el nombre; otro contenido sí
+    assert estaticos.publicar(fuente, tmp_path / 'estaticos') == nombre
+    fuente.write_text('{}')
+    assert estaticos.publicar(fuente, tmp_path / 'estaticos') != nombre
+
+
+def test_sirve_los_archivos_con_cache_inmutable(tmp_path):
+    fuente = tmp_path / 'mapa.json'
+    fuente.write_text('{}')
+    nombre = estaticos.publicar(fuente, tmp_path)
+    servidor = flask.Flask(__name__)
+    estaticos.registrar(servidor, tmp_path)
+    respuesta = servidor.test_client().get(estaticos.url(nombre))
+    assert respuesta.status_code == 200
+    assert respuesta.headers['Cache-Control'] == estaticos.CACHE_INMUTABLE
@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+
+from src.modulos import explorador
+
+
+@pytest.mark.parametrize('consulta, esperado', [
+    ('{COD_MUERTE} icontains I2', (('COD_MUERTE', 'contains', 'I2'),)),
+    ('{COD_MUERTE} scontains i2', (('COD_MUERTE', 'contains', 'i2'),)),
+    ('{TOTAL_CASOS} s> 5', (('TOTAL_CASOS', '>', '5'),)),
+    ('{TOTAL_CASOS} >= 5', (('TOTAL_CASOS', '>=', '5'),)),
+    ('{RANK} le 3', (('RANK', '<=', '3'),)),
+    ('{RANK} ieq 3', (('RANK', '=', '3'),)),
+    ('{RANK} ne 3', (('RANK', '!=', '3'),)),
+    ('{DESCRIPCION} contains "Angina de pecho"', (('DESCRIPCION', 'contains', 'Angina de pecho'),)),
+    ('{CAPITULO} datestartswith Enf', (('CAPITULO', 'startswith', 'Enf'),)),
+    ('{COD_MUERTE} icontains X9 && {TOTAL_CASOS} gt 10',
+     (('COD_MUERTE', 'contains', 'X9'), ('TOTAL_CASOS', '>', '10'))),
+])
+def test_condiciones_filtro(consulta, esperado):
+    assert explorador.condiciones_filtro(consulta) == esperado
+
+
+@pytest.mark.parametrize('consulta', [None, '', 'TOTAL_CASOS > 5', '{TOTAL_CASOS} between 5', '{RANK} is blank'])
+def test_condiciones_que_no_se_entienden_se_ignoran(consulta):
+    assert explorador.condiciones_filtro(consulta) == ()
+
+
+def test_clave_orden():
+    assert explorador.clave_orden(None) == ()
+    assert explorador.clave_orden([
+        {'column_id': 'TOTAL_CASOS', 'direction': 'desc'},
+        {'column_id': 'COD_MUERTE', 'direction': 'asc'},
+    ]) == (('TOTAL_CASOS', True), ('COD_MUERTE', False))
+
+
+@pytest.fixture
+def tabla():
+    return explorador.TablaIndexada(pd.DataFrame({
+        'RANK': [1, 2, 2, 4, 5],
+        'COD_MUERTE': ['X954', 'I219', 'I200', 'J189', 'I64X'],
+        'DESCRIPCION': ['Agresión', 'Infarto agudo', 'Angina inestable', 'Neumonía', 'Accidente vascular'],
+        'TOTAL_CASOS': [50, 30, 30, 10, 5],
+    }))
+
+
+def test_pagina_filtra_sin_acentos_ni_mayusculas_y_ordena(tabla):
+    filas, paginas = tabla.pagina(0, 10, [{'column_id': 'COD_MUERTE', 'direction': 'asc'}], '{COD_MUERTE} icontains i2')
+    assert [fila['COD_MUERTE'] for fila in filas] == ['I200', 'I219']
+    assert paginas == 1
+    filas, _ = tabla.pagina(0, 10, filter_query='{DESCRIPCION} contains neumonia')
+    assert [fila['COD_MUERTE'] for fila in filas] == ['J189']
+
+
+def test_pagina_corta_y_conserva_el_orden_original_en_empates(tabla):
+    orden = [{'column_id': 'TOTAL_CASOS', 'direction': 'desc'}]
+    filas, paginas = tabla.pagina(1, 2, orden)
+    assert paginas == 3
+    assert [fila['COD_MUERTE'] for fila in filas] == ['I200', 'J189']
+    filas, _ = tabla.pagina(0, 10, orden, '{TOTAL_CASOS} >= 30 && {RANK} ne 1')
+    assert [fila['COD_MUERTE'] for fila in filas] == ['I219', 'I200']
+    # Una página fuera de rango devuelve la última
+    filas, _ = tabla.pagina(9, 2, orden)
+    assert [fila['COD_MUERTE'] for fila in filas] == ['I64X']
+
+
+def test_la_memoria_se_vacia_al_llenarse(tabla, monkeypatch):
+    monkeypatch.setattr(explorador, '_MAXIMO_MEMORIA', 2)
+    totales = tabla.tabla['TOTAL_CASOS'].to_numpy()
+    for minimo in (5, 10, 30, 50, 5):
+        mascara = tabla.mascara((('TOTAL_CASOS', '>=', str(minimo)),))
+        assert mascara.sum() == (totales >= minimo).sum()
+        assert len(tabla._mascaras) <= 2
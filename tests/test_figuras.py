@@ -0,0 +1,37 @@
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+from src.modulos import figuras, generar_graficos
+
+
+# Valores de un arreglo de la figura, sea lista o arreglo tipado de plotly.js ({'dtype', 'bdata'})
+def _valores(arreglo):
+    if isinstance(arreglo, dict):
+        return np.frombuffer(base64.b64decode(arreglo['bdata']), dtype=arreglo['dtype']).tolist()
+    return list(arreglo)
+
+
+def test_la_figura_precodificada_es_la_misma_figura():
+    ciudades = pd.DataFrame({'MUNICIPIO': ['CALI', 'MEDELLIN', 'BOGOTA'], 'TOTAL_HOMICIDIOS': [1200, 900, 70000]})
+    figura = generar_graficos.grafico_barras_ciudades_mas_violentas(ciudades)
+    precodificada = figuras.precodificar(figura)
+
+    original = figura.to_plotly_json()
+    assert len(precodificada['data']) == len(original['data'])
+    for traza, esperada in zip(precodificada['data'], original['data']):
+        assert _valores(traza['x']) == _valores(esperada['x'])
+        assert _valores(traza['y']) == _valores(esperada['y'])
+    # Igual a lo que escribe el codificador estándar de plotly
+    assert precodificada == json.loads(pio.to_json(figura, validate=False, engine='json'))
+
+
+def test_los_arreglos_de_una_figura_en_diccionario_se_tipan_con_el_menor_entero():
+    figura = {'data': [{'type': 'bar', 'y': np.array([3, 70000, 5], dtype=np.int64), 'x': ['a', 'b', 'c']}]}
+    traza = figuras.precodificar(figura)['data'][0]
+    assert traza['y']['dtype'] == 'i4'
+    assert _valores(traza['y']) == [3, 70000, 5]
+    assert traza['x'] == ['a', 'b', 'c']
@@ -0,0 +1,18 @@
+import pandas as pd
+
+from src.modulos import generar_graficos, geografia, procesar_datos
+
+
+def test_barras_por_categoria_descartan_codigos_fuera_de_la_divipola(division):
+    conteo = pd.Series(
+        [10, 4, 7, 3],
+        index=pd.MultiIndex.from_tuples([(5, 1), (5, 2), (77, 1), (8, 2)], names=['COD_DEPARTAMENTO', 'SEXO']),
+    )
+    vista = procesar_datos.departamento_y_sexo_desde_conteos(conteo, geografia.Geografia(division))
+    assert vista['DEPARTAMENTO'].isna().sum() == 1
+
+    figura = generar_graficos.grafico_barras_apiladas_sexo_departamento(vista)
+    assert [traza.name for traza in figura.data] == ['Masculino', 'Femenino']
+    assert list(figura.data[0].x) == ['ANTIOQUIA', 'ATLANTICO']
+    assert list(figura.data[0].y) == [10, 0]
+    assert list(figura.data[1].y) == [4, 3]
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from unidecode import unidecode
+
+from src.modulos import geografia, procesar_datos
+
+from conftest import registros_mortalidad
+
+
+@pytest.fixture(scope='module')
+def dimension(division):
+    return geografia.Geografia(division)
+
+
+def _normalizar(nombre):
+    return unidecode(str(nombre)).strip().upper()
+
+
+def test_ids_de_municipio_igual_que_unir_con_la_divipola(dimension, division, diccionario):
+    registros = registros_mortalidad(division, diccionario, 2000)
+    unidos = registros.merge(division[['COD_DANE', 'MUNICIPIO']], on='COD_DANE', how='left')
+    ids = dimension.ids_municipio(registros['COD_DANE'])
+    assert (ids >= 0).all()
+    assert dimension.municipios['MUNICIPIO'].to_numpy()[ids].tolist() == unidos['MUNICIPIO'].map(_normalizar).tolist()
+    assert (dimension.municipios['COD_DANE'].to_numpy()[ids] == registros['COD_DANE'].to_numpy()).all()
+
+
+def test_codigos_fuera_de_la_divipola(dimension):
+    assert dimension.ids_municipio([1, 123456, -5]).tolist() == [geografia.SIN_UBICACION] * 3
+    assert dimension.ids_departamento([0, 77, 100, -1]).tolist() == [geografia.SIN_UBICACION] * 4
+
+
+def test_muertes_por_departamento_igual_que_con_merge(dimension, division, diccionario):
+    registros = registros_mortalidad(division, diccionario, 2000)
+    conteo = registros.groupby('COD_DEPARTAMENTO').size()
+    vista = procesar_datos.muertes_por_departamento_desde_conteos(conteo, dimension)
+
+    nombres = division.assign(DEPARTAMENTO=division['DEPARTAMENTO'].map(_normalizar))
+    nombres = nombres.groupby('COD_DEPARTAMENTO')['DEPARTAMENTO'].agg(lambda serie: serie.mode().iloc[0])
+    esperado = conteo.rename('TotalMuertes').reset_index().merge(nombres.reset_index(), on='COD_DEPARTAMENTO')
+    assert vista['DEPARTAMENTO'].tolist() == esperado['DEPARTAMENTO'].tolist()
+    assert vista['TotalMuertes'].tolist() == esperado['TotalMuertes'].tolist()
+    assert vista['COD_DEPARTAMENTO'].tolist() == [f'{codigo:02d}' for codigo in esperado['COD_DEPARTAMENTO']]
+
+
+def test_los_homonimos_se_distinguen_por_departamento(dimension):
+    municipios = dimension.municipios
+    repetidos = municipios[municipios['MUNICIPIO'].duplicated(keep=False)]
+    assert len(repetidos) > 0
+    assert repetidos.drop_duplicates(['MUNICIPIO', 'ID_DEPARTAMENTO'])['ETIQUETA'].is_unique
+    unico = municipios[~municipios['MUNICIPIO'].duplicated(keep=False)].iloc[0]
+    assert unico['ETIQUETA'] == unico['MUNICIPIO']
+    assert np.all(repetidos['ETIQUETA'].str.endswith(')'))
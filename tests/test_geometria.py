@@ -0,0 +1,34 @@
+import numpy as np
+
+from src.modulos import geometria
+
+
+# Dos departamentos vecinos con un borde ondulado en común. Como en el archivo original, cada uno
+# trae su propia copia del borde, que difiere de la otra por debajo del paso de la grilla.
+def _vecinos():
+    y = np.linspace(0, 1, 60)
+    x = 1 + 0.01 * np.sin(y * 40)
+    borde = [[round(float(a), 5), round(float(b), 5)] for a, b in zip(x, y)]
+    izquierdo = [[0, 0]] + borde + [[0, 1], [0, 0]]
+    derecho = [[2, 1]] + [[a + 1e-6, b] for a, b in reversed(borde)] + [[2, 0], [2, 1]]
+    return {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': {'DPTO': '05', 'NOMBRE_DPT': 'A'}, 'geometry': {'type': 'Polygon', 'coordinates': [izquierdo]}},
+        {'type': 'Feature', 'properties': {'DPTO': '08', 'NOMBRE_DPT': 'B'}, 'geometry': {'type': 'Polygon', 'coordinates': [derecho]}},
+    ]}
+
+
+# Vértices de una feature sobre el borde común (x cerca de 1)
+def _borde(feature):
+    return {tuple(punto) for punto in feature['geometry']['coordinates'][0] if abs(punto[0] - 1) < 0.05}
+
+
+def test_los_bordes_compartidos_coinciden_en_cada_variante():
+    variantes = geometria.generar_variantes(_vecinos())
+    vertices = {}
+    for zoom, variante in variantes.items():
+        izquierdo, derecho = variante['features']
+        assert _borde(izquierdo) == _borde(derecho)
+        assert [feature['id'] for feature in variante['features']] == ['05', '08']
+        vertices[zoom] = len(_borde(izquierdo))
+    # A menor zoom, menos detalle
+    assert vertices[4] < vertices[10]
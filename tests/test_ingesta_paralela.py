@@ -0,0 +1,24 @@
+import pandas as pd
+
+from src.modulos import esquemas, ingesta_paralela
+
+from conftest import escribir_mortalidad, registros_mortalidad
+
+
+def test_los_rangos_cubren_el_archivo_y_terminan_en_salto_de_linea(tmp_path, division, diccionario):
+    ruta = escribir_mortalidad(tmp_path / 'datosmortalidad.csv', registros_mortalidad(division, diccionario, 1000))
+    encabezado, rangos = ingesta_paralela.dividir_en_rangos(ruta, tamaño_rango=1000)
+    contenido = ruta.read_bytes()
+    assert len(rangos) > 1
+    assert rangos[0][0] == len(encabezado)
+    assert rangos[-1][1] == len(contenido)
+    for (_, fin), (inicio, _) in zip(rangos[:-1], rangos[1:]):
+        assert fin == inicio
+        assert contenido[fin - 1:fin] == b'\n'
+
+
+def test_la_lectura_en_paralelo_coincide_con_la_serial(tmp_path, division, diccionario):
+    ruta = escribir_mortalidad(tmp_path / 'datosmortalidad.csv', registros_mortalidad(division, diccionario, 3000))
+    paralelo = ingesta_paralela.leer_csv_paralelo(ruta, esquemas.MORTALIDAD, procesos=2, tamaño_rango=16 * 1024)
+    serial = esquemas.leer_csv(ruta, esquemas.MORTALIDAD)
+    pd.testing.assert_frame_equal(paralelo, serial)
@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from src.modulos import agregados, cargar_datos, causas
+
+from conftest import escribir_mortalidad, registros_mortalidad
+
+
+@pytest.fixture
+def registros(tmp_path, monkeypatch, division, diccionario):
+    monkeypatch.setattr(cargar_datos, 'DATA_DIR', tmp_path)
+    registros = registros_mortalidad(division, diccionario, 2000, años=(2018, 2019))
+    escribir_mortalidad(tmp_path / 'datosmortalidad.csv', registros)
+    return causas.codificar_registros(registros, diccionario)
+
+
+def test_el_cubo_por_bloques_es_igual_al_groupby_de_los_registros(registros, diccionario):
+    cubo = cargar_datos.agregar_mortalidad_por_bloques(año=2019, filas_por_bloque=300, diccionario=diccionario)
+    del_año = registros[registros['AÑO'] == 2019]
+    assert cubo.total() == len(del_año)
+    esperado = del_año.groupby(agregados.DIMENSIONES_CUBO).size()
+    obtenido = cubo.celdas.set_index(agregados.DIMENSIONES_CUBO)['MUERTES']
+    pd.testing.assert_series_equal(obtenido, esperado, check_names=False, check_index_type=False, check_dtype=False)
+
+
+def test_el_cubo_no_depende_del_tamaño_de_bloque(registros, diccionario):
+    pequeños = cargar_datos.agregar_mortalidad_por_bloques(filas_por_bloque=97, diccionario=diccionario)
+    uno = cargar_datos.agregar_mortalidad_por_bloques(filas_por_bloque=10_000, diccionario=diccionario)
+    pd.testing.assert_frame_equal(pequeños.celdas, uno.celdas)
+    assert pequeños.total() == len(registros)
+
+
+def test_conteo_incremental_igual_a_groupby(registros):
+    esperado = registros[registros['SEXO'] == 1].groupby(['AÑO', 'MES']).size()
+    primero = agregados.ConteoIncremental(['AÑO', 'MES'], filtro=lambda bloque: bloque['SEXO'] == 1)
+    segundo = agregados.ConteoIncremental(['AÑO', 'MES'], filtro=lambda bloque: bloque['SEXO'] == 1)
+    for inicio in range(0, 1000, 250):
+        primero.actualizar(registros.iloc[inicio:inicio + 250])
+    segundo.actualizar(registros.iloc[1000:])
+    primero.combinar(segundo)
+    pd.testing.assert_series_equal(primero.resultado(), esperado, check_names=False)
@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+
+from src.modulos import instantanea, procesar_datos
+
+from conftest import registros_mortalidad
+
+
+def test_la_instantanea_es_de_solo_lectura(division, diccionario):
+    registros = registros_mortalidad(division, diccionario, 100)
+    datos = instantanea.Instantanea({'mortalidad': registros})
+    with pytest.raises(AttributeError):
+        datos.mortalidad = None
+    with pytest.raises(TypeError):
+        datos['mortalidad'] = None
+
+    copia = datos['mortalidad']
+    copia['MES'] = 0
+    assert (datos['mortalidad']['MES'] > 0).all()
+    assert (registros['MES'] > 0).all()
+
+
+def test_modificar_el_filtro_del_año_no_toca_el_original(division, diccionario):
+    registros = registros_mortalidad(division, diccionario, 100)
+    original = registros.copy()
+    filtrado = procesar_datos.filtrar_año(registros, 2019)
+    filtrado.loc[:, 'SEXO'] = 9
+    assert pd.get_option('mode.copy_on_write')
+    pd.testing.assert_frame_equal(registros, original)
@@ -0,0 +1,40 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.modulos import figuras, generar_graficos, geografia, geometria
+
+from conftest import DATOS
+
+
+@pytest.fixture(scope='module')
+def geojson():
+    with open(DATOS / 'Colombia.geo.json', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_con_ids_toma_el_codigo_del_departamento_sin_tocar_el_original(geojson):
+    con_ids = geometria.con_ids(geojson)
+    assert [feature['id'] for feature in con_ids['features']] == [feature['properties']['DPTO'] for feature in geojson['features']]
+    assert all('id' not in feature for feature in geojson['features'])
+
+
+def test_cada_departamento_de_la_divipola_tiene_feature(geojson, division):
+    ids = {feature['id'] for feature in geometria.con_ids(geojson)['features']}
+    assert set(geografia.Geografia(division).departamentos['CODIGO']) <= ids
+
+
+def test_la_fabrica_da_el_mismo_mapa_que_crear_mapa(geojson):
+    geojson = geometria.con_ids(geojson)
+    locs, valores, textos = ['05', '08', '11'], np.array([120, 45, 300]), ['ANTIOQUIA', 'ATLANTICO', 'BOGOTA, D.C.']
+    esperado = generar_graficos.crear_mapa(geojson, locs, valores, textos)
+    # Con el mismo id por feature, ubicar por `id` es lo mismo que ubicar por la propiedad DPTO
+    por_propiedad = generar_graficos.crear_mapa(geojson, locs, valores, textos, featureidkey='properties.DPTO')
+
+    mapa = generar_graficos.FabricaMapa(geojson).mapa(locs, valores, textos)
+    assert figuras.precodificar(mapa) == figuras.precodificar(esperado)
+    assert figuras.precodificar(mapa)['data'][0]['locations'] == figuras.precodificar(por_propiedad)['data'][0]['locations']
+    # Cada mapa nuevo parte de la misma plantilla sin modificarla
+    otro = generar_graficos.FabricaMapa(geojson).mapa(locs[:1], valores[:1], textos[:1])
+    assert len(otro['data'][0]['locations']) == 1
@@ -0,0 +1,49 @@
+import threading
+import time
+
+from src.modulos import paginas
+
+
+# Constructor que cuenta cuántas veces se llamó
+class Constructor:
+    def __init__(self, valor, espera=0):
+        self.valor = valor
+        self.espera = espera
+        self.llamadas = 0
+
+    def __call__(self, contexto):
+        self.llamadas += 1
+        time.sleep(self.espera)
+        return self.valor
+
+
+def test_cada_valor_se_construye_al_pedirlo_y_una_sola_vez():
+    datos = Constructor(41)
+    perezosos = paginas.Perezosos({'datos': datos, 'pagina': lambda r: r['datos'] + 1})
+    assert datos.llamadas == 0
+    assert perezosos['pagina'] == 42
+    assert perezosos['pagina'] == 42 and perezosos['datos'] == 41
+    assert datos.llamadas == 1
+
+
+def test_peticiones_simultaneas_construyen_una_vez():
+    lenta = Constructor('listo', espera=0.05)
+    perezosos = paginas.Perezosos({'pagina': lenta})
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(perezosos['pagina'])) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert resultados == ['listo'] * 8
+    assert lenta.llamadas == 1
+
+
+def test_las_paginas_leen_los_datos_de_su_contexto():
+    cubo = Constructor(7)
+    datos = paginas.Perezosos({'cubo': cubo})
+    paginas_ = paginas.Perezosos({'/mapa': lambda r: r['cubo'] * 2, '/lineas': lambda r: r['cubo'] * 3}, contexto=datos)
+    assert paginas_['/mapa'] == 14
+    paginas_.calentar()
+    assert paginas_['/lineas'] == 21
+    assert cubo.llamadas == 1
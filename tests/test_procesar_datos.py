@@ -0,0 +1,19 @@
+import numpy as np
+
+from src.modulos import procesar_datos
+
+from conftest import registros_mortalidad
+
+
+def test_filtrar_año_comparte_los_arreglos_si_todas_las_filas_son_del_año(division, diccionario):
+    registros = registros_mortalidad(division, diccionario, 300)
+    filtrado = procesar_datos.filtrar_año(registros, 2019)
+    assert len(filtrado) == len(registros)
+    assert np.shares_memory(filtrado['COD_DANE'].to_numpy(), registros['COD_DANE'].to_numpy())
+
+
+def test_filtrar_año_separa_los_años(division, diccionario):
+    registros = registros_mortalidad(division, diccionario, 300, años=(2018, 2019))
+    filtrado = procesar_datos.filtrar_año(registros, 2018)
+    assert len(filtrado) == (registros['AÑO'] == 2018).sum()
+    assert (filtrado['AÑO'] == 2018).all()
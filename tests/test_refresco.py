@@ -0,0 +1,36 @@
+from src.modulos import refresco
+
+
+# Construcción que cuenta sus versiones
+class Contador:
+    def __init__(self):
+        self.versiones = 0
+
+    def __call__(self):
+        self.versiones += 1
+        return self.versiones
+
+
+def test_reconstruye_cuando_la_huella_se_mantiene_dos_revisiones(tmp_path):
+    (tmp_path / 'datosmortalidad.csv').write_text('a\n')
+    construir = Contador()
+    preparadas = []
+    vigilante = refresco.VigilanteDatos(tmp_path, construir, intervalo=0, preparar=preparadas.append)
+    assert vigilante.revisar() is False
+    assert vigilante.vigente().contenido == 1
+
+    (tmp_path / 'datosmortalidad.csv').write_text('a\nb\n')
+    # La primera revisión solo anota la huella nueva, por si el archivo se está copiando
+    assert vigilante.revisar() is False
+    assert vigilante.vigente().contenido == 1
+    assert vigilante.revisar() is True
+    assert vigilante.vigente().contenido == 2
+    assert preparadas == [2]
+
+
+def test_ignora_los_archivos_ocultos(tmp_path):
+    (tmp_path / 'datosmortalidad.csv').write_text('a\n')
+    huella = refresco.huella_directorio(tmp_path)
+    (tmp_path / '.cache').mkdir()
+    (tmp_path / '.cache' / 'almacen').write_text('x')
+    assert refresco.huella_directorio(tmp_path) == huella
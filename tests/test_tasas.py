@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.modulos import agregados, geografia, tasas
+
+
+@pytest.fixture
+def dimension():
+    return geografia.Geografia(pd.DataFrame({
+        'COD_DANE': [5001, 5002, 8001],
+        'COD_DEPARTAMENTO': [5, 5, 8],
+        'DEPARTAMENTO': ['ANTIOQUIA', 'ANTIOQUIA', 'ATLANTICO'],
+        'MUNICIPIO': ['MEDELLIN', 'ABEJORRAL', 'BARRANQUILLA'],
+    }))
+
+
+@pytest.fixture
+def denominadores(dimension):
+    poblacion = pd.DataFrame({
+        'COD_DANE': [5001, 5001, 5001, 8001, 8001],
+        'AÑO': [2019, 2019, 2019, 2019, 2018],
+        'SEXO': [1, 1, 2, 2, 2],
+        'EDAD': [0, 85, 0, 40, 40],
+        'POBLACION': [1000, 500, 1000, 2000, 9999],
+    })
+    return tasas.Denominadores(poblacion, dimension, 2019)
+
+
+# Celdas del cubo: (COD_DANE, SEXO, GRUPO_EDAD1, MUERTES). GRUPO_EDAD1 8 es 2-4 años, 0 menos de una
+# hora (ambos en 0-4), 25 es 85-89 (85+) y 16 es 40-44.
+@pytest.fixture
+def cubo():
+    celdas = [(5001, 1, 8, 3), (5001, 1, 25, 10), (5001, 2, 0, 2), (5001, 3, 8, 6), (5002, 1, 8, 7), (8001, 2, 16, 4)]
+    cod_dane, sexo, grupo, muertes = map(np.array, zip(*celdas))
+    return agregados.CuboMortalidad(pd.DataFrame({
+        'AÑO': 2019, 'COD_DEPARTAMENTO': cod_dane // 1000, 'COD_DANE': cod_dane, 'MES': 1,
+        'SEXO': sexo, 'GRUPO_EDAD1': grupo, 'ID_CAUSA': 0, 'MUERTES': muertes,
+    }))
+
+
+# Peso de la población estándar de la OMS de un grupo quinquenal
+def _peso(grupo):
+    return tasas._ESTANDAR_OMS[grupo] / sum(tasas._ESTANDAR_OMS)
+
+
+def test_tasas_por_municipio(denominadores, cubo):
+    resultado = denominadores.tasas(cubo, por='municipio')
+    medellin, abejorral, barranquilla = resultado.to_dict('records')
+
+    # Las muertes con SEXO=3 no tienen denominador
+    assert medellin['MUERTES'] == 15
+    assert medellin['POBLACION'] == 2500
+    assert medellin['TASA_CRUDA'] == pytest.approx(15 / 2500 * 100_000)
+    assert medellin['TASA_AJUSTADA'] == pytest.approx((5 / 2000 * _peso(0) + 10 / 500 * _peso(17)) * 100_000)
+
+    # Sin población, sus muertes no se cuentan y no tiene tasa
+    assert abejorral['MUERTES'] == 0
+    assert np.isnan(abejorral['TASA_CRUDA']) and np.isnan(abejorral['TASA_AJUSTADA'])
+
+    assert barranquilla['TASA_CRUDA'] == pytest.approx(200)
+    assert barranquilla['TASA_AJUSTADA'] == pytest.approx(4 / 2000 * _peso(8) * 100_000)
+
+
+def test_tasas_por_departamento_pais_y_sexo(denominadores, cubo):
+    departamentos = denominadores.tasas(cubo, por='departamento')
+    municipios = denominadores.tasas(cubo, por='municipio')
+    assert departamentos.loc[0].equals(municipios.loc[0])
+    assert departamentos.loc[1].equals(municipios.loc[2])
+
+    pais = denominadores.tasas(cubo, por='pais').iloc[0]
+    assert pais['MUERTES'] == 19 and pais['POBLACION'] == 4500
+    assert pais['TASA_AJUSTADA'] == pytest.approx((5 / 2000 * _peso(0) + 4 / 2000 * _peso(8) + 10 / 500 * _peso(17)) * 100_000)
+
+    sexos = denominadores.tasas(cubo, por='sexo')
+    assert list(sexos.index) == [1, 2]
+    assert sexos['MUERTES'].tolist() == [13, 6]
+    assert sexos['TASA_CRUDA'].tolist() == pytest.approx([13 / 1500 * 100_000, 6 / 3000 * 100_000])
+
+
+def test_los_pesos_estandar_suman_uno():
+    assert tasas.PESOS_ESTANDAR.sum() == pytest.approx(1)
+    assert len(tasas.PESOS_ESTANDAR) == 18
+
+
+def test_las_muertes_de_edad_desconocida_solo_cuentan_en_la_tasa_cruda(denominadores, cubo):
+    desconocida = cubo.celdas.iloc[[0]].assign(GRUPO_EDAD1=29, MUERTES=5)
+    con_desconocida = agregados.CuboMortalidad(pd.concat([cubo.celdas, desconocida], ignore_index=True))
+    antes = denominadores.tasas(cubo, por='municipio').iloc[0]
+    medellin = denominadores.tasas(con_desconocida, por='municipio').iloc[0]
+
+    assert medellin['MUERTES'] == antes['MUERTES'] + 5 == 20
+    assert medellin['TASA_CRUDA'] == pytest.approx(20 / 2500 * 100_000)
+    assert medellin['TASA_AJUSTADA'] == pytest.approx(antes['TASA_AJUSTADA'])